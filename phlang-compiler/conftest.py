@@ -0,0 +1,2 @@
+# The compiler is imported as the `src` package, as phlang_ide.py does, so
+# this directory goes on sys.path for the tests
@@ -0,0 +1,368 @@
+import ast
+import gc
+from contextlib import contextmanager
+
+from ..lexer.tokens import LineIndex
+from ..error.error_handler import CompilerError
+from ..parser.ast import String, Identifier
+from ..optimizer.constant_folder import is_negation
+from .generator import (
+    CodeGenerator, RANGE_ENDS, CHAIN_SEGMENT, CHAIN_VARIABLE, counting_range,
+    range_end, concatenated_parts, operation_chain
+)
+from .checked_generator import CheckedCodeGenerator
+
+BINARY_OPERATORS = {
+    '+': ast.Add(),
+    '-': ast.Sub(),
+    '*': ast.Mult(),
+    '/': ast.Div(),
+    '%': ast.Mod()
+}
+
+COMPARISON_OPERATORS = {
+    '==': ast.Eq(),
+    '!=': ast.NotEq(),
+    '<': ast.Lt(),
+    '>': ast.Gt(),
+    '<=': ast.LtE(),
+    '>=': ast.GtE()
+}
+
+BOOLEAN_OPERATORS = {
+    'at': ast.And(),
+    'o': ast.Or()
+}
+
+UNARY_OPERATORS = {
+    '-': ast.USub(),
+    'hindi': ast.Not()
+}
+
+# The !s of an f-string
+STR_CONVERSION = ord('s')
+
+# Contexts carry no state, so one of each does for every name
+LOAD = ast.Load()
+STORE = ast.Store()
+
+
+# A statement is given no extent of its own, only where it starts
+def position_at(line, column):
+    return {'lineno': line, 'col_offset': column - 1, 'end_lineno': line, 'end_col_offset': column - 1}
+
+
+# Python nodes are tracked by the garbage collector, and building or
+# compiling this many of them sets off collections that scan the whole PHLang
+# tree as well, over and over, without finding any garbage
+@contextmanager
+def collection_paused():
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if collecting:
+            gc.enable()
+
+
+# Python will not compile a compound statement with an empty body
+def padded(body, position):
+    return body or [ast.Pass(**position)]
+
+
+# Builds the program as a Python ast.Module instead of source text, so it can
+# go straight to compile() without Python lexing and parsing it again. Every
+# node gets the position of the PHLang statement it came from, found from
+# the statement's offset in source_code, so tracebacks point into the PHLang
+# file.
+#
+# The walk is CodeGenerator's: the same visitors, suite() and
+# generate_<NodeClass> hooks, with emit() in place of write() and a new body
+# list in place of each indent. The tree is followed as it is, so there is no
+# quoting to get wrong. Operations still read as CodeGenerator writes them,
+# `hindi` included (see operation()), so the two backends run a program the
+# same way.
+class PythonASTGenerator(CodeGenerator):
+    def __init__(self, ast, source_code=None):
+        super().__init__(ast)
+        self.lines = LineIndex(source_code) if source_code is not None else None
+        self.body = []
+        # Keyword arguments giving a Python node the current statement's position
+        self.position = position_at(1, 1)
+        self.filename = '<phlang>'
+
+    def dispatch(self, node):
+        self.position = self.position_of(node)
+        return super().dispatch(node)
+
+    def position_of(self, node):
+        offset = getattr(node, 'offset', None)
+        if offset is None or self.lines is None:
+            return self.position
+        return position_at(*self.lines.position(offset))
+
+    # Compound statements are emitted after their bodies, so the position
+    # is worked out again from the node
+    def emit(self, statement, node):
+        for name, value in self.position_of(node).items():
+            setattr(statement, name, value)
+        self.body.append(statement)
+
+    # Runs task and returns the statements it emitted
+    def body_of(self, task):
+        body = self.body
+        self.body = []
+        yield task
+        statements, self.body = self.body, body
+        return statements
+
+    def generate(self):
+        position = position_at(1, 1)
+        alias = ast.alias('translate_error', **position)
+        self.body = [ast.ImportFrom('src.error.error_handler', [alias], 0, **position)]
+        with collection_paused():
+            self.visit(self.ast)
+        return ast.Module(self.body, [])
+
+    # Python compiles a module by recursion, so past a few hundred levels of
+    # nesting compile() gives up, however the tree is handed to it
+    def compile(self, filename='<phlang>'):
+        self.filename = filename
+        with collection_paused():
+            module = self.generate()
+            try:
+                return compile(module, filename, 'exec')
+            except RecursionError:
+                raise CompilerError("Masyadong malalim ang pagkakapugad ng programa para sa Python") from None
+
+    def load(self, name):
+        return ast.Name(name, LOAD, **self.position)
+
+    def store(self, name):
+        return ast.Name(name, STORE, **self.position)
+
+    def call(self, name, args):
+        return ast.Call(self.load(name), args, [], **self.position)
+
+    def visit_VariableDeclaration(self, node):
+        value = ast.Constant(None, **self.position)
+        if node.initial_value:
+            value = yield self.generate_expression(node.initial_value)
+        self.emit(ast.Assign([self.store(node.var_name)], value), node)
+
+    def visit_Assignment(self, node):
+        value = yield self.generate_expression(node.value)
+        self.emit(ast.Assign([self.store(node.var_name)], value), node)
+
+    def visit_FunctionDefinition(self, node):
+        position = self.position
+        params = [ast.arg(param, **position) for param in node.parameters]
+        arguments = ast.arguments([], params, None, [], [], None, [])
+        body = yield self.body_of(node.body)
+        function = ast.FunctionDef(node.name, arguments, padded(body, position), [], None)
+        # Python 3.12 added type parameters; earlier versions have no such field
+        if 'type_params' in ast.FunctionDef._fields:
+            function.type_params = []
+        self.emit(function, node)
+
+    def visit_ReturnStatement(self, node):
+        value = None
+        if node.value:
+            value = yield self.generate_expression(node.value)
+        self.emit(ast.Return(value), node)
+
+    def visit_IfStatement(self, node):
+        position = self.position
+        condition = yield self.generate_expression(node.condition)
+        body = yield self.body_of(self.suite(node.then_block))
+        orelse = []
+        if node.else_block:
+            # An elif is an if alone in the else
+            orelse = yield self.body_of(self.suite(node.else_block))
+        self.emit(ast.If(condition, padded(body, position), orelse), node)
+
+    def visit_WhileLoop(self, node):
+        position = self.position
+        condition = yield self.generate_expression(node.condition)
+        body = yield self.body_of(self.loop_body(node.body, None))
+        self.emit(ast.While(condition, padded(body, position), []), node)
+
+    def visit_ForLoop(self, node):
+        position = self.position
+        iterable = yield self.generate_expression(node.iterable)
+        target = self.store(node.variable)
+        body = yield self.body_of(self.loop_body(node.body, None, node.variable))
+        self.emit(ast.For(target, iterable, padded(body, position), []), node)
+
+    def visit_CStyleForLoop(self, node):
+        position = self.position
+        yield node.init
+        self.position = position
+        condition = yield self.generate_expression(node.condition)
+        counting = counting_range(node)
+
+        if counting is None:
+            body = yield self.body_of(self.loop_body(node.body, node.update))
+            body.extend((yield self.body_of(node.update)))
+            self.emit(ast.While(condition, body, []), node)
+            return
+
+        variable, stop, bound, step = counting
+        self.position = position
+        if isinstance(stop, Identifier):
+            end = self.parse_expression(RANGE_ENDS[bound].format(stop.name))
+        else:
+            end = ast.Constant(range_end(stop.value, bound), **position)
+        arguments = [self.load(variable), end]
+        if step != 1:
+            arguments.append(ast.Constant(step, **position))
+        iterable = self.call('range', arguments)
+
+        body = yield self.body_of(self.loop_body(node.body, None))
+        update = yield self.body_of(node.update)
+        orelse = [ast.If(condition, update, [], **position)]
+        self.emit(ast.For(self.store(variable), iterable, padded(body, position), orelse), node)
+
+    def visit_Expression(self, node):
+        value = yield self.generate_expression(node)
+        self.emit(ast.Expr(value), node)
+
+    def visit_PrintStatement(self, node):
+        value = yield self.generate_expression(node.expression)
+        self.emit(ast.Expr(self.call('print', [value])), node)
+
+    def visit_BreakStatement(self, node):
+        self.emit(ast.Break(), node)
+
+    def visit_ContinueStatement(self, node):
+        update = self.loop_updates[-1] if self.loop_updates else None
+        if update is not None:
+            yield self.repeat(update)
+        self.emit(ast.Continue(), node)
+
+    def visit_TryExcept(self, node):
+        position = self.position
+        body = yield self.body_of(self.suite(node.try_block))
+        name = node.exception_var
+        self.position = position
+        translate = ast.Assign([self.store(name)], self.call('translate_error', [self.load(name)]), **position)
+        handler = [translate]
+        handler.extend((yield self.body_of(self.suite(node.except_block, name))))
+        handlers = [ast.ExceptHandler(self.load('Exception'), name, handler, **position)]
+        self.emit(ast.Try(padded(body, position), handlers, [], []), node)
+
+    def generate_Number(self, node):
+        return ast.Constant(node.value, **self.position)
+
+    def generate_String(self, node):
+        return ast.Constant(node.value, **self.position)
+
+    def generate_Identifier(self, node):
+        return self.load(node.name)
+
+    def generate_BinaryOp(self, node):
+        first, operations = operation_chain(node)
+        if not operations:
+            return (yield self.generate_concatenation(concatenated_parts(node)))
+
+        value = yield self.generate_expression(first)
+        segments = []
+        for count, (operation, parts) in enumerate(operations, 1):
+            if parts is None:
+                right = yield self.generate_expression(operation.right)
+                value = self.operation(value, operation, right)
+            else:
+                value = yield self.generate_concatenation(parts, value)
+            if count % CHAIN_SEGMENT == 0 and count < len(operations):
+                segments.append(ast.NamedExpr(self.store(CHAIN_VARIABLE), value, **self.position))
+                value = self.load(CHAIN_VARIABLE)
+
+        if not segments:
+            return value
+        segments.append(value)
+        last = ast.Constant(-1, **self.position)
+        return ast.Subscript(ast.Tuple(segments, LOAD, **self.position), last, LOAD, **self.position)
+
+    # CodeGenerator writes an operation as `(left op right)` and hindi x as
+    # `not (x)`. Python reads `not (x) == y` in that as `not (x == y)`, and
+    # does not take `y == not (x)` at all, so neither does this backend.
+    def operation(self, left, node, right):
+        op = node.operator
+        if op in BOOLEAN_OPERATORS:
+            return ast.BoolOp(BOOLEAN_OPERATORS[op], [left, right], **self.position)
+        if is_negation(node.right):
+            line, column = self.position['lineno'], self.position['col_offset'] + 1
+            raise SyntaxError("invalid syntax", (self.filename, line, column, None))
+        if is_negation(node.left):
+            return ast.UnaryOp(ast.Not(), self.comparison_or_arithmetic(left.operand, op, right), **self.position)
+        return self.comparison_or_arithmetic(left, op, right)
+
+    def comparison_or_arithmetic(self, left, op, right):
+        if op in COMPARISON_OPERATORS:
+            return ast.Compare(left, [COMPARISON_OPERATORS[op]], [right], **self.position)
+        return ast.BinOp(left, BINARY_OPERATORS[op], right, **self.position)
+
+    # The f-string as a JoinedStr, which has no quoting to worry about
+    def generate_concatenation(self, parts, first=None):
+        values = []
+        text = []
+        for index, part in enumerate(parts):
+            if index == 0 and first is not None:
+                value = first
+            elif isinstance(part, String):
+                text.append(part.value)
+                continue
+            else:
+                value = yield self.generate_expression(part)
+            if text:
+                values.append(ast.Constant(''.join(text), **self.position))
+                text = []
+            values.append(ast.FormattedValue(value, STR_CONVERSION, None, **self.position))
+        if text:
+            values.append(ast.Constant(''.join(text), **self.position))
+        return ast.JoinedStr(values, **self.position)
+
+    def generate_UnaryOp(self, node):
+        operand = yield self.generate_expression(node.operand)
+        return ast.UnaryOp(UNARY_OPERATORS[node.operator], operand, **self.position)
+
+    def generate_FunctionCall(self, node):
+        args = []
+        for arg in node.arguments:
+            args.append((yield self.generate_expression(arg)))
+
+        if node.name == 'saklaw':
+            return self.call('range', args)
+        return self.call(node.name, args)
+
+    def generate_ArrayLiteral(self, node):
+        elements = []
+        for element in node.elements:
+            elements.append((yield self.generate_expression(element)))
+        return ast.List(elements, LOAD, **self.position)
+
+    def generate_ArrayIndexing(self, node):
+        array = yield self.generate_expression(node.array)
+        index = yield self.generate_expression(node.index)
+        return ast.Subscript(array, index, LOAD, **self.position)
+
+    def generate_other(self, node):
+        return self.parse_expression(str(node))
+
+    # Python source for an expression, as nodes at the current position
+    def parse_expression(self, source):
+        expression = ast.parse(source, mode='eval').body
+        for child in ast.walk(expression):
+            if 'lineno' in child._attributes:
+                for name, value in self.position.items():
+                    setattr(child, name, value)
+        return expression
+
+
+# PythonASTGenerator with CheckedCodeGenerator's semantic checks run in the
+# same walk
+class CheckedPythonASTGenerator(CheckedCodeGenerator, PythonASTGenerator):
+    def __init__(self, ast, source_code=None):
+        super().__init__(ast)
+        self.lines = LineIndex(source_code) if source_code is not None else None
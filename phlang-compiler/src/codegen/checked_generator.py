@@ -0,0 +1,82 @@
+from ..semantic.analyzer import SemanticAnalyzer
+from ..semantic.symbol_table import VariableSymbol
+from .generator import CodeGenerator
+
+
+# Generates code and runs SemanticAnalyzer's checks in the same walk over
+# the tree. errors ends up exactly as SemanticAnalyzer().analyze() would
+# leave it: the checks are the analyzer's own methods, run in the same
+# order, with its scopes opened around the same blocks.
+#
+# Where the analyzer stops looking into a node after an error (a call to an
+# undeclared function, say), the code for the rest of the node is still
+# generated, just with checking switched off until it is done.
+class CheckedCodeGenerator(CodeGenerator):
+    def __init__(self, ast):
+        super().__init__(ast)
+        self.analyzer = SemanticAnalyzer()
+        self.errors = self.analyzer.errors
+        self.checking = True
+
+    def unchecked(self, task):
+        checking = self.checking
+        self.checking = False
+        result = yield task
+        self.checking = checking
+        return result
+
+    def scoped(self, block, names):
+        analyzer = self.analyzer
+        analyzer.enter_scope()
+        for name in names:
+            analyzer.symbols.define(name, VariableSymbol(name, None))
+        yield block
+        analyzer.exit_scope()
+
+    def suite(self, block, *names):
+        if not self.checking:
+            return block
+        return self.scoped(block, names)
+
+    def repeat(self, task):
+        return self.unchecked(task)
+
+    def finish_function(self, task):
+        yield task
+        self.analyzer.end_function()
+
+    def finish_assignment(self, task, node):
+        yield task
+        self.analyzer.check_assignment(node)
+
+    def visit_VariableDeclaration(self, node):
+        if self.checking and not self.analyzer.check_variable_declaration(node):
+            return self.unchecked(super().visit_VariableDeclaration(node))
+        return super().visit_VariableDeclaration(node)
+
+    def visit_Assignment(self, node):
+        if not self.checking:
+            return super().visit_Assignment(node)
+        return self.finish_assignment(super().visit_Assignment(node), node)
+
+    def visit_FunctionDefinition(self, node):
+        if not self.checking:
+            return super().visit_FunctionDefinition(node)
+        if not self.analyzer.begin_function(node):
+            return self.unchecked(super().visit_FunctionDefinition(node))
+        return self.finish_function(super().visit_FunctionDefinition(node))
+
+    def visit_ReturnStatement(self, node):
+        if self.checking and not self.analyzer.check_return(node):
+            return self.unchecked(super().visit_ReturnStatement(node))
+        return super().visit_ReturnStatement(node)
+
+    def generate_Identifier(self, node):
+        if self.checking:
+            self.analyzer.check_identifier(node)
+        return super().generate_Identifier(node)
+
+    def generate_FunctionCall(self, node):
+        if self.checking and not self.analyzer.check_function_call(node):
+            return self.unchecked(super().generate_FunctionCall(node))
+        return super().generate_FunctionCall(node)
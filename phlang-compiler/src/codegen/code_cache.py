@@ -0,0 +1,84 @@
+import hashlib
+import marshal
+import os
+from importlib.util import MAGIC_NUMBER
+
+from ..parser.ast_cache import source_fingerprint, write_atomically, evict_least_recent
+
+MAGIC = b'PHC1\n'
+SUFFIX = '.phc'
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'phlang', 'code')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# The code depends on every stage of the compiler, from the lexer to the
+# code generator, and the warnings on the semantic checks. Code objects only
+# load in the Python version that marshalled them, which MAGIC_NUMBER stands
+# for, as it does in .pyc files.
+CACHE_SALT = repr((
+    source_fingerprint('lexer', 'parser', 'semantic', 'optimizer', 'codegen', 'error'),
+    MAGIC_NUMBER,
+)).encode()
+
+
+# Compiled programs on disk, like .pyc files: one file per .ph file, named by
+# a hash of its path, holding the code object that compiling it gave along
+# with the semantic warnings. The file starts with a hash of the source it
+# was compiled from, the compiler's own sources, the passes that ran and the
+# Python version; it is only used while all of them are still the same, so
+# an unchanged program goes straight from here to exec().
+#
+# prune, fold and check say whether the program went through
+# CallGraph.prune, ConstantFolder and the semantic checks before code was
+# generated, as they do in the IDE.
+#
+# Writing and eviction work as in ASTCache: files are renamed into place
+# whole, a file's modification time is its last use, and past max_bytes the
+# least recently used ones go.
+class CodeCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 prune=True, fold=True, check=True):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.salt = CACHE_SALT + repr((prune, fold, check)).encode()
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, filename):
+        name = hashlib.sha256(os.path.abspath(filename).encode('utf-8', 'surrogatepass'))
+        return os.path.join(self.directory, name.hexdigest() + SUFFIX)
+
+    def source_hash(self, source_code):
+        digest = hashlib.sha256(self.salt)
+        digest.update(source_code.encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+
+    # Returns (code, warnings) for `filename` if it was compiled from
+    # `source_code` by this compiler, else None
+    def get(self, filename, source_code):
+        path = self.path(filename)
+        header = MAGIC + self.source_hash(source_code)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            if not data.startswith(header):
+                raise ValueError("Luma o hindi kilalang anyo ng cache")
+            code, warnings = marshal.loads(data[len(header):])
+        except (OSError, ValueError, EOFError, TypeError):
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return code, warnings
+
+    def put(self, filename, source_code, code, warnings):
+        data = MAGIC + self.source_hash(source_code) + marshal.dumps((code, list(warnings)))
+        if write_atomically(self.path(filename), data):
+            self.evict()
+
+    def evict(self):
+        evict_least_recent(self.directory, SUFFIX, self.max_bytes)
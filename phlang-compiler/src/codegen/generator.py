@@ -1,19 +1,196 @@
+import json
+import math
+
 from ..parser.ast import (
     Program, Statement, Expression, BinaryOp, UnaryOp,
     Number, String, Identifier, Assignment, VariableDeclaration,
     FunctionDefinition, FunctionCall, ReturnStatement,
-    IfStatement, WhileLoop, ForLoop, 
+    IfStatement, WhileLoop, ForLoop, CStyleForLoop,
     PrintStatement, BreakStatement, ContinueStatement,
     Block, TryExcept, ArrayLiteral, ArrayIndexing
 )
+from ..parser.ast_walker import ASTWalker
+from ..optimizer.constant_folder import BindingCounter
 from ..error.error_handler import translate_error
 
-class CodeGenerator:
+BINARY_OPERATORS = {
+    'at': 'and',
+    'o': 'or',
+    '==': '==',
+    '!=': '!=',
+    '<': '<',
+    '>': '>',
+    '<=': '<=',
+    '>=': '>=',
+    '+': '+',
+    '-': '-',
+    '*': '*',
+    '/': '/',
+    '%': '%'
+}
+
+UNARY_OPERATORS = {
+    '-': '-',
+    'hindi': 'not '
+}
+
+# The comparison the other way round: i < n is n > i
+MIRRORED = {'<': '>', '<=': '>=', '>': '<', '>=': '<='}
+
+# Where range() has to stop for a count going up (<, <=) or down (>, >=) to
+# cover the same integers as the comparison with a bound that is a name. The
+# bound may be a float, which range() will not take.
+RANGE_ENDS = {
+    '<': '-int(-{} // 1)',
+    '<=': 'int({} // 1) + 1',
+    '>': 'int({} // 1)',
+    '>=': '-int(-{} // 1) - 1',
+}
+
+
+# The same, worked out now for a bound that is a literal
+def range_end(stop, bound):
+    if bound == '<':
+        return math.ceil(stop)
+    if bound == '<=':
+        return math.floor(stop) + 1
+    if bound == '>':
+        return math.floor(stop)
+    return math.ceil(stop) - 1
+
+
+def is_int(node):
+    return isinstance(node, Number) and node.value.__class__ is int
+
+
+# If a C-style para is a plain count that a Python for over range() runs the
+# same way, returns (variable, stop, bound, step): the loop runs while
+# `variable bound stop` holds, with stop a literal or a name, adding the
+# nonzero int step each time. That takes an int literal to start from, an
+# update of variable = variable +/- an int literal in the direction of the
+# bound, and a body that binds neither the variable nor the bound. Else None.
+def counting_range(node):
+    init, condition, update = node.init, node.condition, node.update
+    if not is_int(init.value):
+        return None
+    variable = init.var_name
+
+    if not (isinstance(update, Assignment) and update.var_name == variable):
+        return None
+    change = update.value
+    if not (isinstance(change, BinaryOp) and change.operator in ('+', '-')):
+        return None
+    left, right = change.left, change.right
+    if isinstance(left, Identifier) and left.name == variable and is_int(right):
+        step = right.value
+    elif change.operator == '+' and isinstance(right, Identifier) and right.name == variable and is_int(left):
+        step = left.value
+    else:
+        return None
+    if change.operator == '-':
+        step = -step
+
+    if not (isinstance(condition, BinaryOp) and condition.operator in MIRRORED):
+        return None
+    bound, stop = condition.operator, condition.right
+    if not (isinstance(condition.left, Identifier) and condition.left.name == variable):
+        bound, stop = MIRRORED[bound], condition.left
+        if not (isinstance(condition.right, Identifier) and condition.right.name == variable):
+            return None
+    if step == 0 or (step > 0) != (bound in ('<', '<=')):
+        return None
+
+    bound_names = {variable}
+    if isinstance(stop, Identifier):
+        if stop.name == variable:
+            return None
+        bound_names.add(stop.name)
+    elif not (isinstance(stop, Number) and stop.value.__class__ in (int, float)):
+        return None
+    elif stop.value - stop.value != 0:
+        # inf and nan
+        return None
+
+    counter = BindingCounter()
+    counter.visit(node.body)
+    if bound_names & (counter.assignments.keys() | counter.other_bindings):
+        return None
+    return variable, stop, bound, step
+
+
+# A + with a string literal on either side, which joins its operands as
+# strings whatever they are
+def is_concatenation(node):
+    return isinstance(node, BinaryOp) and node.operator == '+' and (
+        isinstance(node.left, String) or isinstance(node.right, String)
+    )
+
+
+# The operands a chain of such joins ends up joining, left to right:
+# "a" + x + "b" gives the String "a", x and the String "b". An operand that
+# is itself a join is already a string, so its own operands take its place.
+def concatenated_parts(node):
+    parts = []
+    pending = [node]
+    while pending:
+        part = pending.pop()
+        if is_concatenation(part):
+            pending.append(part.right)
+            pending.append(part.left)
+        else:
+            parts.append(part)
+    return parts
+
+
+# Python compiles an expression by recursion and will not take one nested
+# too deeply, so a long chain of operations, a + b + c + ..., is worked out
+# this many operations at a time, each result kept in CHAIN_VARIABLE for
+# the next. The segments are := assignments inside the expression, so a
+# chain in a habang condition is still worked out on every test; that is
+# what needs Python 3.8.
+CHAIN_SEGMENT = 50
+CHAIN_VARIABLE = '_phlang_chain'
+
+
+# A chain of operations each nested in the left operand of the next, as the
+# operand the chain starts from and the operations, innermost first. Each
+# comes with the parts it joins if it is a join, else None; the first of
+# those parts is the operation before it in the chain. The chain ends at a
+# join whose parts do not start with an operation, which has no chain of its
+# own to run on.
+def operation_chain(node):
+    operations = []
+    while isinstance(node, BinaryOp):
+        if not is_concatenation(node):
+            operations.append((node, None))
+            node = node.left
+            continue
+        parts = concatenated_parts(node)
+        if not isinstance(parts[0], BinaryOp):
+            break
+        operations.append((node, parts))
+        node = parts[0]
+    operations.reverse()
+    return node, operations
+
+
+# What an f-string can hold between braces in every Python version: until
+# 3.12 a quote of any kind, a backslash or a # ends the expression early
+def fits_in_fstring(code):
+    return not any(character in code for character in '"\'\\#\n')
+
+
+class CodeGenerator(ASTWalker):
+    tables = {'visit_': {}, 'generate_': {}}
+    
     def __init__(self, ast):
         self.ast = ast
         self.indent_level = 0
         self.output = []
         self.imports_added = False
+        # The update of each loop being generated, innermost last: None for
+        # any loop but a C-style para that runs as a while
+        self.loop_updates = []
     
     def indent(self):
         self.indent_level += 1
@@ -31,34 +208,23 @@ class CodeGenerator:
         self.visit(self.ast)
         return '\n'.join(self.output)
     
-    def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-    
-    def generic_visit(self, node):
-        if hasattr(node, 'children'):
-            for child in node.children:
-                if child is not None:
-                    self.visit(child)
-    
     def visit_Program(self, node):
         for statement in node.statements:
-            self.visit(statement)
+            yield statement
     
     def visit_Block(self, node):
         for stmt in node.statements:
-            self.visit(stmt)
+            yield stmt
     
     def visit_VariableDeclaration(self, node):
         initial_value = "None"
         if node.initial_value:
-            initial_value = self.generate_expression(node.initial_value)
+            initial_value = yield self.generate_expression(node.initial_value)
         
         self.write(f"{node.var_name} = {initial_value}")
     
     def visit_Assignment(self, node):
-        value = self.generate_expression(node.value)
+        value = yield self.generate_expression(node.value)
         self.write(f"{node.var_name} = {value}")
     
     def visit_FunctionDefinition(self, node):
@@ -69,163 +235,261 @@ class CodeGenerator:
         if not node.body.statements:
             self.write("pass")
         else:
-            self.visit(node.body)
+            yield node.body
         
         self.dedent()
         self.write("")
     
     def visit_ReturnStatement(self, node):
         if node.value:
-            value = self.generate_expression(node.value)
+            value = yield self.generate_expression(node.value)
             self.write(f"return {value}")
         else:
             self.write("return")
     
+    # The block of a compound statement, as something to yield. names are
+    # the ones the statement declares for it: a loop or exception variable.
+    # CheckedCodeGenerator opens the analyzer's scope for it here.
+    def suite(self, block, *names):
+        return block
+    
     def visit_IfStatement(self, node):
-        condition = self.generate_expression(node.condition)
+        condition = yield self.generate_expression(node.condition)
         self.write(f"if {condition}:")
         self.indent()
         
-        self.visit(node.then_block)
+        yield self.suite(node.then_block)
         
         self.dedent()
         
         if node.else_block:
             if isinstance(node.else_block, IfStatement):
-                cond = self.generate_expression(node.else_block.condition)
-                self.write(f"elif {cond}:")
+                yield self.suite(self.elif_clause(node.else_block))
+            else:
+                self.write("else:")
                 self.indent()
-                self.visit(node.else_block.then_block)
+                yield self.suite(node.else_block)
                 self.dedent()
-                
-                if node.else_block.else_block:
-                    if isinstance(node.else_block.else_block, IfStatement):
-                        self.visit_IfStatement(node.else_block.else_block)
-                    else:
-                        self.write("else:")
-                        self.indent()
-                        self.visit(node.else_block.else_block)
-                        self.dedent()
+    
+    def elif_clause(self, node):
+        cond = yield self.generate_expression(node.condition)
+        self.write(f"elif {cond}:")
+        self.indent()
+        yield self.suite(node.then_block)
+        self.dedent()
+        
+        if node.else_block:
+            if isinstance(node.else_block, IfStatement):
+                yield self.suite(node.else_block)
             else:
                 self.write("else:")
                 self.indent()
-                self.visit(node.else_block)
+                yield self.suite(node.else_block)
                 self.dedent()
     
+    # A loop's block; update is what ituloy in it has to run first
+    def loop_body(self, block, update, *names):
+        self.loop_updates.append(update)
+        yield self.suite(block, *names)
+        self.loop_updates.pop()
+    
+    # Code generated a second time for the same node. CheckedCodeGenerator
+    # does not check it again.
+    def repeat(self, task):
+        return task
+    
     def visit_WhileLoop(self, node):
-        condition = self.generate_expression(node.condition)
+        condition = yield self.generate_expression(node.condition)
         self.write(f"while {condition}:")
         self.indent()
         
         if not node.body.statements:
             self.write("pass")
         else:
-            self.visit(node.body)
+            yield self.loop_body(node.body, None)
         
         self.dedent()
     
     def visit_ForLoop(self, node):
-        iterable = self.generate_expression(node.iterable)
+        iterable = yield self.generate_expression(node.iterable)
         self.write(f"for {node.variable} in {iterable}:")
         self.indent()
         
         if not node.body.statements:
             self.write("pass")
         else:
-            self.visit(node.body)
+            yield self.loop_body(node.body, None, node.variable)
         
         self.dedent()
     
+    # A plain count (see counting_range) becomes a for over range(), which
+    # leaves the variable at the last value it took; the else clause moves
+    # it on to where the while would have stopped. Any other C-style para is
+    # a while with the update at the end of the body and before each ituloy.
+    def visit_CStyleForLoop(self, node):
+        yield node.init
+        condition = yield self.generate_expression(node.condition)
+        counting = counting_range(node)
+        
+        if counting is None:
+            self.write(f"while {condition}:")
+            self.indent()
+            yield self.loop_body(node.body, node.update)
+            yield node.update
+            self.dedent()
+            return
+        
+        variable, stop, bound, step = counting
+        if isinstance(stop, Identifier):
+            end = RANGE_ENDS[bound].format(stop.name)
+        else:
+            end = range_end(stop.value, bound)
+        step = f", {step}" if step != 1 else ""
+        self.write(f"for {variable} in range({variable}, {end}{step}):")
+        self.indent()
+        
+        if not node.body.statements:
+            self.write("pass")
+        else:
+            yield self.loop_body(node.body, None)
+        
+        self.dedent()
+        self.write("else:")
+        self.indent()
+        self.write(f"if {condition}:")
+        self.indent()
+        yield node.update
+        self.dedent()
+        self.dedent()
+    
+    # An expression used as a statement, such as a call
+    def visit_Expression(self, node):
+        value = yield self.generate_expression(node)
+        self.write(value)
+    
     def visit_PrintStatement(self, node):
-        value = self.generate_expression(node.expression)
+        value = yield self.generate_expression(node.expression)
         self.write(f"print({value})")
     
     def visit_BreakStatement(self, node):
         self.write("break")
     
     def visit_ContinueStatement(self, node):
+        update = self.loop_updates[-1] if self.loop_updates else None
+        if update is not None:
+            yield self.repeat(update)
         self.write("continue")
     
     def visit_TryExcept(self, node):
         self.write("try:")
         self.indent()
-        self.visit(node.try_block)
+        yield self.suite(node.try_block)
         self.dedent()
         
         self.write(f"except Exception as {node.exception_var}:")
         self.indent()
         self.write(f"{node.exception_var} = translate_error({node.exception_var})")
-        self.visit(node.except_block)
+        yield self.suite(node.except_block, node.exception_var)
         self.dedent()
     
+    # Visitors yield the result to get the expression's code. Leaves are
+    # returned as is; anything with operands is a walker task. The method is
+    # found through the same per-class table as visitors, under generate_.
     def generate_expression(self, node):
-        if isinstance(node, Number):
-            return str(node.value)
-        
-        elif isinstance(node, String):
-            return f'"{node.value}"'
-        
-        elif isinstance(node, Identifier):
-            return node.name
-        
-        elif isinstance(node, BinaryOp):
-            left = self.generate_expression(node.left)
-            right = self.generate_expression(node.right)
-            
-            op_map = {
-                'at': 'and',
-                'o': 'or',
-                '==': '==',
-                '!=': '!=',
-                '<': '<',
-                '>': '>',
-                '<=': '<=',
-                '>=': '>=',
-                '+': '+',
-                '-': '-',
-                '*': '*',
-                '/': '/',
-                '%': '%'
-            }
-            
-            op = op_map.get(node.operator, node.operator)
-            
-            # Special case for string concatenation with +
-            if op == '+' and (
-                isinstance(node.left, String) or 
-                isinstance(node.right, String)
-            ):
-                return f"str({left}) + str({right})"
-            
-            return f"({left} {op} {right})"
-        
-        elif isinstance(node, UnaryOp):
-            operand = self.generate_expression(node.operand)
-            
-            op_map = {
-                '-': '-',
-                'hindi': 'not '
-            }
-            
-            op = op_map.get(node.operator, node.operator)
-            return f"{op}({operand})"
-        
-        elif isinstance(node, FunctionCall):
-            args = ", ".join(self.generate_expression(arg) for arg in node.arguments)
-            
-            if node.name == 'saklaw':
-                return f"range({args})"
-            
-            return f"{node.name}({args})"
-        
-        elif isinstance(node, ArrayLiteral):
-            elements = ", ".join(self.generate_expression(element) for element in node.elements)
-            return f"[{elements}]"
-        
-        elif isinstance(node, ArrayIndexing):
-            array = self.generate_expression(node.array)
-            index = self.generate_expression(node.index)
-            return f"{array}[{index}]"
+        generate = self.tables['generate_'].get(node.__class__)
+        if generate is None:
+            generate = self.handler('generate_', node.__class__, CodeGenerator.generate_other)
+        return generate(self, node)
+    
+    def generate_Number(self, node):
+        return str(node.value)
+    
+    def generate_String(self, node):
+        # The lexer has already turned escapes into the characters they stand for
+        return json.dumps(node.value, ensure_ascii=False)
+    
+    def generate_Identifier(self, node):
+        return node.name
+    
+    def generate_BinaryOp(self, node):
+        first, operations = operation_chain(node)
+        if not operations:
+            return (yield self.generate_concatenation(concatenated_parts(node)))
         
-        else:
-            return str(node)
\ No newline at end of file
+        code = yield self.generate_expression(first)
+        segments = []
+        for count, (operation, parts) in enumerate(operations, 1):
+            if parts is None:
+                right = yield self.generate_expression(operation.right)
+                op = BINARY_OPERATORS.get(operation.operator, operation.operator)
+                code = f"({code} {op} {right})"
+            else:
+                code = yield self.generate_concatenation(parts, code)
+            if count % CHAIN_SEGMENT == 0 and count < len(operations):
+                segments.append(f"{CHAIN_VARIABLE} := {code}")
+                code = CHAIN_VARIABLE
+        
+        if not segments:
+            return code
+        segments.append(code)
+        return f"({', '.join(segments)})[-1]"
+    
+    # A whole chain of joins as one f-string, each operand converted with
+    # !s, which is str(). The literals go into the f-string's text. If an
+    # operand's code cannot go between braces, a ''.join() of the str() of
+    # each operand does the same. `first`, if given, is the code already
+    # generated for the first part.
+    def generate_concatenation(self, parts, first=None):
+        codes = []
+        for index, part in enumerate(parts):
+            if index == 0 and first is not None:
+                codes.append((part, first))
+            elif isinstance(part, String):
+                codes.append((part, self.generate_String(part)))
+            else:
+                codes.append((part, (yield self.generate_expression(part))))
+        parts = codes
+        
+        if all(isinstance(part, String) or fits_in_fstring(code) for part, code in parts):
+            text = []
+            for part, code in parts:
+                if isinstance(part, String):
+                    text.append(code[1:-1].replace('{', '{{').replace('}', '}}'))
+                else:
+                    text.append(f"{{{code}!s}}")
+            return 'f"' + ''.join(text) + '"'
+        
+        codes = [code if isinstance(part, String) else f"str({code})" for part, code in parts]
+        return f"''.join(({', '.join(codes)},))"
+    
+    def generate_UnaryOp(self, node):
+        operand = yield self.generate_expression(node.operand)
+        op = UNARY_OPERATORS.get(node.operator, node.operator)
+        return f"{op}({operand})"
+    
+    def generate_FunctionCall(self, node):
+        args = []
+        for arg in node.arguments:
+            args.append((yield self.generate_expression(arg)))
+        args = ", ".join(args)
+        
+        if node.name == 'saklaw':
+            return f"range({args})"
+        
+        return f"{node.name}({args})"
+    
+    def generate_ArrayLiteral(self, node):
+        elements = []
+        for element in node.elements:
+            elements.append((yield self.generate_expression(element)))
+        elements = ", ".join(elements)
+        return f"[{elements}]"
+    
+    def generate_ArrayIndexing(self, node):
+        array = yield self.generate_expression(node.array)
+        index = yield self.generate_expression(node.index)
+        return f"{array}[{index}]"
+    
+    def generate_other(self, node):
+        return str(node)
+
@@ -13,6 +13,12 @@ class CompilerError(Exception):
         else:
             return f"Mali: {self.message}"
 
+class ParseError(CompilerError):
+    def format_message(self):
+        if self.line is not None:
+            return f"Mali sa pag-parse sa linya {self.line}, hanay {self.column}: {self.message}"
+        return f"Mali sa pag-parse: {self.message}"
+
 ERROR_TRANSLATIONS = {
     "ZeroDivisionError": "HindiMaaringHatiin",
     "TypeError": "MaliSaUri",
@@ -0,0 +1,212 @@
+from bisect import bisect_left
+
+from .tokens import Token, TokenKind
+from .regex_lexer import RegexLexer
+
+
+# A token of an IncrementalLexer. Its line is stored as is while it is
+# before the lexer's gap, and relative to the document's last line while it
+# is past it, so edits before it do not have to touch it.
+class EditedToken(Token):
+    def __init__(self, kind, value, lexer):
+        Token.__init__(self, kind, value, None)
+        self.lexer = lexer
+        self.stored_line = None
+        self.tail = False
+
+    @property
+    def line(self):
+        if self.tail:
+            return self.stored_line + self.lexer.line_count
+        return self.stored_line
+
+    @line.setter
+    def line(self, line):
+        self.stored_line = line
+        self.tail = False
+
+
+# Keeps the token stream of a document up to date as it is edited. Only the
+# damaged region is rescanned: scanning restarts at the token just before
+# the edit and stops as soon as a new token lands on the start of an old one
+# past the edit, after which both streams are known to be identical.
+#
+# The regex scanner carries no state from one token to the next, so every
+# token start is outside any string or /* */ comment and is a safe point to
+# restart or resynchronize at. Multi-line strings are stepped over when
+# picking the restart token, since their line number is where they end.
+#
+# Tokens here carry their line and column rather than resolving them from an
+# offset, since offsets move with every edit. The lexer keeps the offsets
+# itself, with a gap: entries before `gap` are absolute, entries from `gap`
+# on are stored relative to the end of the source, so an edit never has to
+# renumber the offsets of the tokens after it. Lines are kept the same way,
+# on the tokens (see EditedToken), counted back from the document's last
+# line past the gap. Only columns on the line the edit ends on are moved,
+# so an edit costs the same however much of the file comes after it.
+class IncrementalLexer:
+    def __init__(self, source_code):
+        self.source_code = source_code
+        self.tokens = None
+        self.relex()
+
+    def relex(self):
+        offsets = []
+        make = self.token_maker(offsets, 1, 0, 0)
+        self.tokens = None
+        self.line_count = self.source_code.count('\n')
+        self.tokens = list(RegexLexer(self.source_code).scan_chunks(make))
+        self.offsets = offsets
+        self.gap = len(offsets)
+        return self.tokens
+
+    # Returns a make() callback for the scanner that records offsets and
+    # works out positions as it goes, starting from a known line
+    def token_maker(self, offsets, line, line_start, position):
+        source = self.source_code
+
+        def make(kind, value, offset, length):
+            nonlocal line, line_start, position
+            newline = source.rfind('\n', position, offset)
+            if newline != -1:
+                line += source.count('\n', position, offset)
+                line_start = newline + 1
+
+            token = EditedToken(kind, value, self)
+            token.column = offset - line_start + 1
+            position = offset + length
+            if kind == TokenKind.STRING:
+                # A string spanning lines reports the line it ends on
+                newline = source.rfind('\n', offset, position)
+                if newline != -1:
+                    line += source.count('\n', offset, position)
+                    line_start = newline + 1
+            token.line = line
+            offsets.append(offset)
+            return token
+
+        return make
+
+    def token_offset(self, index):
+        offset = self.offsets[index]
+        if index >= self.gap:
+            offset += len(self.source_code)
+        return offset
+
+    # Replaces `deleted` characters at `offset` with `inserted` and updates
+    # self.tokens in place. Returns (index, removed, added): the slice of the
+    # old token list that was replaced and the number of tokens put there.
+    def edit(self, offset, deleted, inserted):
+        old_source = self.source_code
+        if offset < 0 or deleted < 0 or offset + deleted > len(old_source):
+            raise ValueError(f"Wala sa loob ng source ang pagbabago: {offset}, {deleted}")
+        self.source_code = old_source[:offset] + inserted + old_source[offset + deleted:]
+
+        if self.tokens is None:
+            self.relex()
+            return 0, 0, len(self.tokens)
+
+        line_count = self.line_count + inserted.count('\n') - old_source.count('\n', offset, offset + deleted)
+        try:
+            result = self.splice(old_source, offset, deleted, inserted)
+        except Exception:
+            # The scanner raised on the new text; start from scratch next time
+            self.tokens = None
+            raise
+        # The lines of the tokens past the gap follow the new count
+        self.line_count = line_count
+        return result
+
+    def find_token(self, offset, source_length):
+        offsets = self.offsets
+        gap = self.gap
+        if gap and offsets[gap - 1] >= offset:
+            return bisect_left(offsets, offset, 0, gap)
+        return bisect_left(offsets, offset - source_length, gap)
+
+    def move_gap(self, index, source_length):
+        offsets = self.offsets
+        tokens = self.tokens
+        line_count = self.line_count
+        for k in range(self.gap, index):
+            offsets[k] += source_length
+            tokens[k].stored_line += line_count
+            tokens[k].tail = False
+        for k in range(index, self.gap):
+            offsets[k] -= source_length
+            tokens[k].stored_line -= line_count
+            tokens[k].tail = True
+        self.gap = index
+
+    def splice(self, old_source, offset, deleted, inserted):
+        tokens = self.tokens
+        offsets = self.offsets
+        old_length = len(old_source)
+        delta = len(inserted) - deleted
+        edit_end = offset + len(inserted)
+
+        # Restart from the last token that starts before the edit
+        first = self.find_token(offset, old_length) - 1
+        while first >= 0 and tokens[first].kind == TokenKind.STRING:
+            first -= 1
+
+        if first < 0:
+            first = 0
+            self.move_gap(first, old_length)
+            restart, line, line_start = 0, 1, 0
+        else:
+            # From here on every old offset that is looked at is end-relative
+            self.move_gap(first, old_length)
+            restart = offsets[first] + old_length
+            line = tokens[first].line
+            line_start = restart - tokens[first].column + 1
+
+        new_tokens = []
+        new_offsets = []
+        make = self.token_maker(new_offsets, line, line_start, restart)
+
+        lexer = RegexLexer(self.source_code)
+        old_index = first
+        old_count = len(tokens)
+        resync = None
+        for token in lexer.scan_from(make, restart, line, line_start):
+            new_offset = new_offsets[-1]
+            if new_offset >= edit_end:
+                old_offset = new_offset - delta
+                while old_index < old_count and offsets[old_index] + old_length < old_offset:
+                    old_index += 1
+                if old_index < old_count and offsets[old_index] + old_length == old_offset:
+                    resync = token
+                    new_offsets.pop()
+                    break
+            new_tokens.append(token)
+        else:
+            old_index = old_count
+
+        if resync is not None:
+            self.shift_tail(old_source, old_index, resync)
+
+        # The tail is stored relative to the end of the source, which the
+        # edit did not touch, so its offsets stay as they are
+        tokens[first:old_index] = new_tokens
+        offsets[first:old_index] = new_offsets
+        self.gap = first + len(new_offsets)
+        return first, old_index - first, len(new_tokens)
+
+    # Lines past the gap follow the line count by themselves; only the
+    # tokens on the line the edit ends on can have moved sideways
+    def shift_tail(self, old_source, index, resync):
+        tokens = self.tokens
+        column_shift = resync.column - tokens[index].column
+
+        if column_shift:
+            # Only the tokens that start on the same line move sideways
+            old_offset = self.offsets[index] + len(old_source)
+            line_end = old_source.find('\n', old_offset)
+            if line_end == -1:
+                # The end of file token sits right at len(old_source)
+                line_end = len(old_source) + 1
+            for k in range(index, len(tokens)):
+                if self.offsets[k] + len(old_source) >= line_end:
+                    break
+                tokens[k].column += column_shift
@@ -1,23 +1,18 @@
-from .tokens import Token, TokenType, KEYWORDS, OPERATORS, DELIMITERS
+from .tokens import Token, TokenKind, LineIndex, KEYWORDS, OPERATORS, KINDS
+from .regex_lexer import RegexLexer
 
 class Lexer:
     def __init__(self, source_code):
         self.source_code = source_code
         self.position = 0
-        self.line = 1
-        self.column = 1
+        self.lines = LineIndex(source_code)
         self.current_char = self.source_code[self.position] if self.source_code else None
     
     def error(self):
-        raise Exception(f'Hindi wastong karakter: "{self.current_char}" sa linya {self.line}, hanay {self.column}')
+        line, column = self.lines.position(self.position)
+        raise Exception(f'Hindi wastong karakter: "{self.current_char}" sa linya {line}, hanay {column}')
     
     def advance(self):
-        if self.current_char == '\n':
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-            
         self.position += 1
         if self.position >= len(self.source_code):
             self.current_char = None
@@ -63,7 +58,7 @@ class Lexer:
             self.advance()
     
     def identifier(self):
-        start_column = self.column
+        start = self.position
         result = ''
         
         while self.current_char is not None and (self.current_char.isalnum() or self.current_char == '_'):
@@ -71,14 +66,14 @@ class Lexer:
             self.advance()
         
         if result in KEYWORDS:
-            return Token(TokenType.KEYWORD, result, self.line, start_column)
+            return Token(KINDS[result], result, start, self.lines)
         elif result in OPERATORS:
-            return Token(TokenType.OPERATOR, result, self.line, start_column)
+            return Token(KINDS[result], result, start, self.lines)
         else:
-            return Token(TokenType.IDENTIFIER, result, self.line, start_column)
+            return Token(TokenKind.IDENTIFIER, result, start, self.lines)
     
     def number(self):
-        start_column = self.column
+        start = self.position
         result = ''
         is_float = False
         
@@ -91,12 +86,12 @@ class Lexer:
             self.advance()
         
         if is_float:
-            return Token(TokenType.NUMBER, float(result), self.line, start_column)
+            return Token(TokenKind.NUMBER, float(result), start, self.lines)
         else:
-            return Token(TokenType.NUMBER, int(result), self.line, start_column)
+            return Token(TokenKind.NUMBER, int(result), start, self.lines)
     
     def string(self):
-        start_column = self.column
+        start = self.position
         quote_char = self.current_char  
         self.advance()  
         result = ''
@@ -119,13 +114,19 @@ class Lexer:
             self.advance()
         
         if self.current_char is None:
-            raise Exception(f'Hindi nakumpleto ang string sa linya {self.line}, hanay {start_column}')
+            line = self.lines.position(self.position)[0]
+            column = self.lines.position(start)[1]
+            raise Exception(f'Hindi nakumpleto ang string sa linya {line}, hanay {column}')
         
         self.advance() 
-        return Token(TokenType.STRING, result, self.line, start_column)
+        token = Token(TokenKind.STRING, result, start, self.lines)
+        if self.source_code.find('\n', start, self.position) != -1:
+            # A string spanning lines reports the line it ends on
+            token.line = self.lines.position(self.position - 1)[0]
+        return token
     
     def operator(self):
-        start_column = self.column
+        start = self.position
         op = self.current_char
         
         if (op in ['=', '!', '>', '<']) and self.peek() == '=':
@@ -135,17 +136,18 @@ class Lexer:
         else:
             self.advance()
         
-        return Token(TokenType.OPERATOR, op, self.line, start_column)
+        return Token(KINDS.get(op, TokenKind.OPERATOR), op, start, self.lines)
     
     def delimiter(self):
-        start_column = self.column
+        start = self.position
         delim = self.current_char
         self.advance()
-        return Token(TokenType.DELIMITER, delim, self.line, start_column)
+        return Token(KINDS.get(delim, TokenKind.DELIMITER), delim, start, self.lines)
     
     def tokenize(self):
-        tokens = []
-        
+        return list(self.iter_tokens())
+    
+    def iter_tokens(self):
         while self.current_char is not None:
             if self.current_char.isspace():
                 self.skip_whitespace()
@@ -164,26 +166,36 @@ class Lexer:
                 continue
             
             if self.current_char.isalpha() or self.current_char == '_':
-                tokens.append(self.identifier())
+                yield self.identifier()
                 continue
             
             if self.current_char.isdigit():
-                tokens.append(self.number())
+                yield self.number()
                 continue
             
             if self.current_char in ['\'', '\"']:
-                tokens.append(self.string())
+                yield self.string()
                 continue
             
             if self.current_char in '+-*/%=!><':
-                tokens.append(self.operator())
+                yield self.operator()
                 continue
             
             if self.current_char in '(){}[],.:;':
-                tokens.append(self.delimiter())
+                yield self.delimiter()
                 continue
             
             self.error()
         
-        tokens.append(Token(TokenType.EOF, None, self.line, self.column))
-        return tokens
\ No newline at end of file
+        yield Token(TokenKind.EOF, None, self.position, self.lines)
+
+
+LEXER_ENGINES = {
+    'regex': RegexLexer,
+    'char': Lexer,
+}
+
+def create_lexer(source_code, engine='regex'):
+    if engine not in LEXER_ENGINES:
+        raise ValueError(f"Hindi kilalang lexer engine: '{engine}'")
+    return LEXER_ENGINES[engine](source_code)
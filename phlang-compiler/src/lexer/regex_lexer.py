@@ -0,0 +1,204 @@
+import codecs
+import re
+
+from .tokens import Token, TokenKind, LineIndex, KEYWORDS, OPERATORS, DELIMITERS, KINDS
+from .token_buffer import TokenBuffer
+
+# Words that the character lexer reads as identifiers and then reclassifies
+WORD_KINDS = {word: KINDS[word] for word in KEYWORDS}
+WORD_KINDS.update((op, KINDS[op]) for op in OPERATORS if op.isalpha())
+
+
+# Group numbers of the master pattern, in the order the alternatives are tried
+WORD, DELIMITER, COMMENT, OPERATOR, NUMBER, STRING, OTHER = range(1, 8)
+
+
+def _build_master_pattern():
+    symbols = [op for op in OPERATORS if not op.isalpha()]
+    # Every character of a multi-character operator is also a token on its own
+    singles = {char for op in symbols for char in op}
+    operators = sorted(set(symbols) | singles, key=len, reverse=True)
+
+    alternatives = [
+        r'([^\W\d]\w*)',
+        '([' + re.escape(''.join(DELIMITERS)) + '])',
+        r'(#[^\n]*\n?|//[^\n]*\n?|/\*.*?(?:\*/|\Z))',
+        '(' + '|'.join(re.escape(op) for op in operators) + ')',
+        r'(\d[\d.]*)',
+        r'("[^"\\]*(?:\\.[^"\\]*)*"|\'[^\'\\]*(?:\\.[^\'\\]*)*\')',
+        r'(\S)',
+    ]
+    return re.compile(r'\s*(?:' + '|'.join(alternatives) + ')', re.DOTALL)
+
+
+MASTER_PATTERN = _build_master_pattern()
+ESCAPE_PATTERN = re.compile(r'\\(.?)', re.DOTALL)
+
+
+CHUNK_SIZE = 1 << 16
+
+
+def read_chunks(stream, chunk_size=CHUNK_SIZE):
+    decoder = None
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            return
+        if isinstance(data, bytes):
+            # Binary files and mmaps hand back raw bytes
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder('utf-8')()
+            data = decoder.decode(data)
+        yield data
+
+
+# Produces the same tokens, positions and errors as the character lexer,
+# but slices whole lexemes out of the source with one compiled pattern.
+# The source may be a string or anything with read(): a text or binary file
+# object, or an mmap.
+class RegexLexer:
+    def __init__(self, source_code, chunk_size=CHUNK_SIZE):
+        self.source_code = source_code
+        self.chunk_size = chunk_size
+        self.lines = None
+        # The text currently being scanned and its offset in the source
+        self.window = ''
+        self.window_offset = 0
+
+    def position_of(self, offset):
+        return self.lines.position(self.window_offset + offset)
+
+    def error(self, offset):
+        char = self.window[offset] if offset < len(self.window) else None
+        line, column = self.position_of(offset)
+        raise Exception(f'Hindi wastong karakter: "{char}" sa linya {line}, hanay {column}')
+
+    def number_value(self, lexeme, start):
+        dot = lexeme.find('.')
+        if dot == -1:
+            return int(lexeme)
+
+        second_dot = lexeme.find('.', dot + 1)
+        if second_dot != -1:
+            self.error(start + second_dot)
+        return float(lexeme)
+
+    def string_value(self, start, end):
+        window = self.window
+        quote_char = window[start]
+        body = window[start + 1:end - 1]
+        if '\\' not in body:
+            return body
+
+        escapes = {'n': '\n', 't': '\t', '\\': '\\', quote_char: quote_char}
+
+        def replace(match):
+            char = match.group(1)
+            if char not in escapes:
+                self.error(start + 1 + match.start(1))
+            return escapes[char]
+
+        return ESCAPE_PATTERN.sub(replace, body)
+
+    def unterminated_string(self, start):
+        window = self.window
+        quote_char = window[start]
+
+        # Report a bad escape first, the same way the character lexer would
+        escapes = ('n', 't', '\\', quote_char)
+        for match in ESCAPE_PATTERN.finditer(window, start + 1):
+            if match.group(1) not in escapes:
+                self.error(match.start(1))
+
+        line = self.position_of(len(window))[0]
+        column = self.position_of(start)[1]
+        raise Exception(f'Hindi nakumpleto ang string sa linya {line}, hanay {column}')
+
+    def make_token(self, kind, value, offset, length):
+        token = Token(kind, value, offset, self.lines)
+        if kind == TokenKind.STRING:
+            start = offset - self.window_offset
+            if self.window.find('\n', start, start + length) != -1:
+                # A string spanning lines reports the line it ends on
+                token.line = self.lines.position(offset + length - 1)[0]
+        return token
+
+    def tokenize(self):
+        return list(self.iter_tokens())
+
+    def tokenize_buffer(self):
+        buffer = TokenBuffer()
+        for _ in self.scan_chunks(buffer.append):
+            pass
+        buffer.lines = self.lines
+        return buffer
+
+    def iter_tokens(self):
+        return self.scan_chunks(self.make_token)
+
+    # Calls make(kind, value, offset, length) for every token and yields
+    # whatever it returns
+    def scan_chunks(self, make):
+        self.window = ''
+        self.window_offset = 0
+        if isinstance(self.source_code, str):
+            self.lines = LineIndex(self.source_code)
+            yield from self.scan(self.source_code, True, make)
+            return
+
+        self.lines = LineIndex()
+        for chunk in read_chunks(self.source_code, self.chunk_size):
+            self.lines.add(chunk, self.window_offset + len(self.window))
+            yield from self.scan(self.window + chunk, False, make)
+        yield from self.scan(self.window, True, make)
+
+    # Rescans a string source from a token boundary whose line and line start
+    # offset are already known, without looking at anything before it
+    def scan_from(self, make, offset, line, line_start):
+        self.window_offset = 0
+        self.lines = LineIndex(self.source_code, offset, line, line_start)
+        return self.scan(self.source_code, True, make, offset)
+
+    # Tokenizes one window of text. Unless this is the final window, a
+    # lexeme that runs into the end of the window may still continue in the
+    # next chunk, so scanning stops before it and the rest is carried over.
+    def scan(self, window, final, make, pos=0):
+        self.window = window
+        size = len(window)
+        base = self.window_offset
+        end = pos
+
+        for match in MASTER_PATTERN.finditer(window, pos):
+            kind = match.lastindex
+            start = match.start(kind)
+            end = match.end()
+            if not final and (end == size or (kind == OTHER and window[start] in '\'"')):
+                end = start
+                break
+
+            if kind == WORD:
+                lexeme = match.group(WORD)
+                yield make(WORD_KINDS.get(lexeme, TokenKind.IDENTIFIER), lexeme, base + start, end - start)
+            elif kind == DELIMITER:
+                lexeme = match.group(DELIMITER)
+                yield make(KINDS[lexeme], lexeme, base + start, 1)
+            elif kind == OPERATOR:
+                lexeme = match.group(OPERATOR)
+                yield make(KINDS.get(lexeme, TokenKind.OPERATOR), lexeme, base + start, end - start)
+            elif kind == NUMBER:
+                value = self.number_value(match.group(NUMBER), start)
+                yield make(TokenKind.NUMBER, value, base + start, end - start)
+            elif kind == STRING:
+                yield make(TokenKind.STRING, self.string_value(start, end), base + start, end - start)
+            elif kind == COMMENT:
+                pass
+            elif window[start] in '\'"':
+                self.unterminated_string(start)
+            else:
+                self.error(start)
+
+        if final:
+            yield make(TokenKind.EOF, None, base + size, 0)
+
+        self.window = window[end:]
+        self.window_offset = base + end
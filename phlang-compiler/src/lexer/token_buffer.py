@@ -0,0 +1,91 @@
+from array import array
+
+from .tokens import TokenKind, KIND_TYPES
+
+
+# Read-only view of one entry in a TokenBuffer. Views are made on access and
+# dropped by the parser as it moves on, so only the buffer itself is kept.
+class TokenView:
+    __slots__ = ('buffer', 'index', 'kind', 'type', 'value')
+
+    def __init__(self, buffer, index, kind, value):
+        self.buffer = buffer
+        self.index = index
+        self.kind = kind
+        self.type = KIND_TYPES[kind]
+        self.value = value
+
+    @property
+    def offset(self):
+        return self.buffer.starts[self.index]
+
+    @property
+    def line(self):
+        return self.buffer.line_at(self.index)
+
+    @property
+    def column(self):
+        return self.buffer.column_at(self.index)
+
+    def __repr__(self):
+        return f"Token({self.type}, '{self.value}', line={self.line}, col={self.column})"
+
+
+# Struct-of-arrays token storage: one array per field instead of one object
+# per token. Values are interned into a side table, so repeated identifiers,
+# keywords and literals are stored once. Lines and columns are not stored;
+# they are resolved from the start offsets through the source's LineIndex.
+class TokenBuffer:
+    def __init__(self, lines=None):
+        self.lines = lines
+        self.kinds = array('B')
+        self.starts = array('Q')
+        self.lengths = array('I')
+        self.value_ids = array('I')
+        self.values = []
+        self.value_table = {}
+
+    def append(self, kind, value, offset, length):
+        # 1 and 1.0 are equal dict keys, so non-string values are keyed by type too
+        key = value if value.__class__ is str else (value.__class__, value)
+        value_id = self.value_table.get(key)
+        if value_id is None:
+            value_id = self.value_table[key] = len(self.values)
+            self.values.append(value)
+
+        self.kinds.append(kind)
+        self.starts.append(offset)
+        self.lengths.append(length)
+        self.value_ids.append(value_id)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.kinds)
+        return TokenView(self, index, self.kinds[index], self.values[self.value_ids[index]])
+
+    def __iter__(self):
+        for index in range(len(self.kinds)):
+            yield self[index]
+
+    def type_at(self, index):
+        return KIND_TYPES[self.kinds[index]]
+
+    def value_at(self, index):
+        return self.values[self.value_ids[index]]
+
+    def span_at(self, index):
+        start = self.starts[index]
+        return start, start + self.lengths[index]
+
+    def line_at(self, index):
+        offset = self.starts[index]
+        if self.kinds[index] == TokenKind.STRING:
+            # Strings report the line of their closing quote, like the lexers do
+            offset += self.lengths[index] - 1
+        return self.lines.position(offset)[0]
+
+    def column_at(self, index):
+        return self.lines.position(self.starts[index])[1]
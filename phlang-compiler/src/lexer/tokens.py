@@ -1,3 +1,6 @@
+from array import array
+from bisect import bisect_right
+
 class TokenType:
     # Define token types
     IDENTIFIER = 'IDENTIFIER'
@@ -65,14 +68,120 @@ DELIMITERS = {
     ':': TokenType.DELIMITER,
 }
 
+class TokenKind:
+    # Kinds of the token types whose lexemes are open-ended
+    IDENTIFIER = 0
+    NUMBER = 1
+    STRING = 2
+    EOF = 3
+    # Fallbacks for a keyword, operator or delimiter missing from the tables
+    KEYWORD = 4
+    OPERATOR = 5
+    DELIMITER = 6
+
+# Every keyword, operator and delimiter gets its own integer kind after these,
+# so the parser can match a token with one integer comparison
+KIND_TYPES = [
+    TokenType.IDENTIFIER,
+    TokenType.NUMBER,
+    TokenType.STRING,
+    TokenType.EOF,
+    TokenType.KEYWORD,
+    TokenType.OPERATOR,
+    TokenType.DELIMITER,
+]
+KIND_VALUES = [None] * len(KIND_TYPES)
+KINDS = {}
+
+for table in (KEYWORDS, OPERATORS, DELIMITERS):
+    for lexeme, token_type in table.items():
+        KINDS[lexeme] = len(KIND_TYPES)
+        KIND_TYPES.append(token_type)
+        KIND_VALUES.append(lexeme)
+
+# Maps source offsets to (line, column). Newlines are only looked for when a
+# position is actually asked for, and only up to that position, so sources
+# whose token positions are never reported are never scanned for lines.
+# Streaming lexers, which do not keep the whole source, add() each chunk
+# as they read it instead.
+class LineIndex:
+    def __init__(self, source_code=None, offset=0, line=1, line_start=0):
+        self.source_code = source_code
+        self.first_line = line
+        self.starts = array('Q', [line_start])
+        # Newlines before this offset are already recorded
+        self.scanned = offset
+
+    def add(self, text, offset):
+        starts = self.starts
+        newline = text.find('\n')
+        while newline != -1:
+            starts.append(offset + newline + 1)
+            newline = text.find('\n', newline + 1)
+        self.scanned = offset + len(text)
+
+    def position(self, offset):
+        if offset > self.scanned and self.source_code is not None:
+            start = self.scanned
+            self.add(self.source_code[start:offset], start)
+
+        index = bisect_right(self.starts, offset) - 1
+        return self.first_line + index, offset - self.starts[index] + 1
+
+
+# The kind of a token given by its TokenType, as tokens were made before
+# they had kinds
+def kind_of(type, value):
+    kind = KINDS.get(value) if value.__class__ is str else None
+    if kind is None or KIND_TYPES[kind] != type:
+        if type not in KIND_TYPES:
+            raise TypeError(f"Hindi kilalang uri ng token: {type!r}")
+        kind = KIND_TYPES.index(type)
+    return kind
+
+
+# Token(kind, value, offset, lines): kind is one of TokenKind or KINDS, offset
+# the token's start in the source and lines the LineIndex for that source.
+#
+# The constructor as it was before tokens had kinds and offsets,
+# Token(TokenType.NUMBER, 5, line, column), still works: a TokenType string
+# in place of the kind is taken to mean that form. Such a token has no
+# offset, so the nodes parsed from it have no source position either.
 class Token:
-    def __init__(self, type, value, line, column):
-        self.type = type
+    def __init__(self, kind, value, offset, lines=None):
+        if kind.__class__ is not int:
+            if kind.__class__ is not str:
+                raise TypeError(f"Ang uri ng token ay dapat TokenKind o TokenType, hindi {kind!r}")
+            self.line = offset
+            self.column = lines
+            kind = kind_of(kind, value)
+            offset = lines = None
+        self.kind = kind
+        self.type = KIND_TYPES[kind]
         self.value = value
-        self.line = line
-        self.column = column
+        self.offset = offset
+        self.lines = lines
+    
+    # The old constructor by name, for callers that want to say so
+    @classmethod
+    def at(cls, type, value, line, column):
+        token = cls(kind_of(type, value), value, None)
+        token.line = line
+        token.column = column
+        return token
+    
+    # line and column are resolved from the offset the first time they are
+    # read; a lexer that already knows them can also assign them directly
+    def __getattr__(self, name):
+        if name == 'line':
+            self.line = self.lines.position(self.offset)[0]
+            return self.line
+        if name == 'column':
+            self.column = self.lines.position(self.offset)[1]
+            return self.column
+        raise AttributeError(name)
     
     def __repr__(self):
         return f"Token({self.type}, '{self.value}', line={self.line}, col={self.column})"
 
-__all__ = ['TokenType', 'Token', 'KEYWORDS', 'OPERATORS', 'DELIMITERS']
\ No newline at end of file
+__all__ = ['TokenType', 'TokenKind', 'Token', 'LineIndex', 'KEYWORDS', 'OPERATORS', 'DELIMITERS', 'KINDS', 'KIND_TYPES', 'KIND_VALUES']
\ No newline at end of file
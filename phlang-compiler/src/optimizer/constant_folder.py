@@ -0,0 +1,373 @@
+import operator
+
+from ..parser.ast import (
+    Program, Block, Number, String, BinaryOp, UnaryOp,
+    Assignment, VariableDeclaration, FunctionDefinition, FunctionCall,
+    ReturnStatement, IfStatement, WhileLoop, ForLoop, PrintStatement,
+    TryExcept, ArrayLiteral, ArrayIndexing, CStyleForLoop, copy_location
+)
+from ..parser.ast_walker import ASTWalker
+
+# The value of an expression that is not known until it runs
+NOT_CONSTANT = object()
+
+# Folded results bigger than these are left for the program to compute
+MAX_INT_BITS = 64
+MAX_STRING = 4096
+
+# What CodeGenerator turns each operator into, as Python functions
+BINARY_FUNCTIONS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+    '%': operator.mod,
+}
+
+UNARY_FUNCTIONS = {
+    '-': operator.neg,
+    'hindi': operator.not_,
+}
+
+
+# A literal node that generates code with the given value, or None if the
+# value has no literal form worth writing out
+def constant_node(value):
+    cls = value.__class__
+    if cls is bool:
+        return Number(value)
+    if cls is int:
+        return Number(value) if value.bit_length() <= MAX_INT_BITS else None
+    if cls is float:
+        # inf and nan have no literal, and repr() reads back exactly
+        return Number(value) if value - value == 0 else None
+    if cls is str and len(value) <= MAX_STRING:
+        return String(value)
+    return None
+
+
+def fold_binary(op, left, right, string_concat):
+    if op == 'at':
+        return left and right
+    if op == 'o':
+        return left or right
+    if string_concat:
+        return str(left) + str(right)
+    if op == '*':
+        # Refuse to build a huge string just to find it is too big
+        for text, count in ((left, right), (right, left)):
+            if text.__class__ is str and count.__class__ in (int, bool) and len(text) * count > MAX_STRING:
+                return NOT_CONSTANT
+    function = BINARY_FUNCTIONS.get(op)
+    if function is None:
+        return NOT_CONSTANT
+    return function(left, right)
+
+
+def is_negation(node):
+    return isinstance(node, UnaryOp) and node.operator == 'hindi'
+
+
+def changes_reading(original, folded, op, string_concat):
+    if is_negation(folded) and not is_negation(original):
+        return True
+    return op == '+' and not string_concat and isinstance(folded, String)
+
+
+# Rewrites the tree ahead of code generation so that the generated code does
+# less work when it runs, without changing what it does:
+#
+#   - operators on literals are worked out now, by the rules CodeGenerator
+#     gives them (a + with a string literal on either side joins the two as
+#     strings), unless that raises or the result is out of all proportion;
+#   - a name assigned exactly once in the whole program, and bound in no
+#     other way, is replaced by its constant value in the statements after
+#     the assignment in the same block and the blocks nested in them, where
+#     the assignment has certainly run;
+#   - kung with a constant condition keeps only the branch it takes, and
+#     habang or a C-style para with a false one is dropped (all but the
+#     para's init).
+#
+# The tree passed in is left as it was. Statement visitors return the list
+# of statements to put in the node's place. Expressions go through the
+# fold_<NodeClass> methods, which give the new node and its value, or
+# NOT_CONSTANT when that is only known at run time.
+class ConstantFolder(ASTWalker):
+    tables = {'visit_': {}, 'fold_': {}}
+
+    def __init__(self):
+        # Names that may be propagated -> (literal node, value), for the
+        # statements being folded
+        self.constants = {}
+        self.single_assignments = set()
+        self.function_depth = 0
+
+    def fold(self, program):
+        self.single_assignments = BindingCounter().count(program)
+        return Program(self.visit(program))
+
+    def visit_Program(self, node):
+        return (yield self.fold_statements(node.statements))
+
+    def fold_statements(self, statements):
+        constants = self.constants
+        self.constants = dict(constants)
+        folded = []
+        for statement in statements:
+            for folded_statement in (yield statement):
+                folded.append(copy_location(folded_statement, statement))
+        self.constants = constants
+        return folded
+
+    # keep_nonempty is for blocks that CodeGenerator writes no `pass` for;
+    # if all their statements go, the original block is kept instead
+    def fold_block(self, block, keep_nonempty=False):
+        statements = yield self.fold_statements(block.statements)
+        if keep_nonempty and block.statements and not statements:
+            return block
+        return Block(statements)
+
+    # Dropping code from a function body can change which of its names
+    # Python takes as local, so there only branches that bind nothing go
+    def can_drop(self, node):
+        if node is None or not self.function_depth:
+            return True
+        counter = BindingCounter()
+        counter.visit(node)
+        return not counter.assignments and not counter.other_bindings
+
+    def visit_Block(self, node):
+        return [(yield self.fold_block(node))]
+
+    def visit_VariableDeclaration(self, node):
+        initial_value = node.initial_value
+        if initial_value:
+            initial_value, value = yield self.fold_expression(initial_value)
+        return [VariableDeclaration(node.var_name, node.var_type, initial_value)]
+
+    def visit_Assignment(self, node):
+        value_node, value = yield self.fold_expression(node.value)
+        if value is not NOT_CONSTANT and node.var_name in self.single_assignments:
+            self.constants[node.var_name] = (value_node, value)
+        return [Assignment(node.var_name, value_node)]
+
+    def visit_FunctionDefinition(self, node):
+        self.function_depth += 1
+        body = yield self.fold_block(node.body)
+        self.function_depth -= 1
+        return [FunctionDefinition(node.name, node.parameters, body)]
+
+    def visit_ReturnStatement(self, node):
+        value = node.value
+        if value:
+            value, constant = yield self.fold_expression(value)
+        return [ReturnStatement(value)]
+
+    def visit_PrintStatement(self, node):
+        expression, value = yield self.fold_expression(node.expression)
+        return [PrintStatement(expression)]
+
+    def visit_IfStatement(self, node):
+        condition, value = yield self.fold_expression(node.condition)
+        if value is not NOT_CONSTANT:
+            taken, dropped = node.then_block, node.else_block
+            if not value:
+                taken, dropped = dropped, taken
+            if self.can_drop(dropped):
+                if taken is None:
+                    return []
+                if isinstance(taken, IfStatement):
+                    return (yield taken)
+                return (yield self.fold_statements(taken.statements))
+
+        then_block = yield self.fold_block(node.then_block, True)
+        else_block = node.else_block
+        if isinstance(else_block, IfStatement):
+            statements = yield else_block
+            if len(statements) == 1 and isinstance(statements[0], IfStatement):
+                else_block = statements[0]
+            else:
+                # The elif was settled; what is left of it is a plain else
+                else_block = Block(statements) if statements else None
+        elif else_block is not None:
+            else_block = yield self.fold_block(else_block, True)
+        return [IfStatement(condition, then_block, else_block)]
+
+    def visit_WhileLoop(self, node):
+        condition, value = yield self.fold_expression(node.condition)
+        if value is not NOT_CONSTANT and not value and self.can_drop(node.body):
+            return []
+        body = yield self.fold_block(node.body)
+        return [WhileLoop(condition, body)]
+
+    def visit_ForLoop(self, node):
+        iterable, value = yield self.fold_expression(node.iterable)
+        body = yield self.fold_block(node.body)
+        return [ForLoop(node.variable, iterable, body)]
+
+    # With a false condition only init runs
+    def visit_CStyleForLoop(self, node):
+        init, = yield node.init
+        condition, value = yield self.fold_expression(node.condition)
+        if value is not NOT_CONSTANT and not value:
+            if self.can_drop(node.body) and self.can_drop(node.update):
+                return [init]
+        body = yield self.fold_block(node.body)
+        # Nothing the update assigns has certainly run after the loop
+        update, = yield self.fold_statements([node.update])
+        return [CStyleForLoop(init, condition, update, body)]
+
+    def visit_TryExcept(self, node):
+        try_block = yield self.fold_block(node.try_block, True)
+        except_block = yield self.fold_block(node.except_block, True)
+        return [TryExcept(try_block, node.exception_var, except_block)]
+
+    def visit_BreakStatement(self, node):
+        return [node]
+
+    def visit_ContinueStatement(self, node):
+        return [node]
+
+    # An expression used as a statement
+    def visit_Expression(self, node):
+        expression, value = yield self.fold_expression(node)
+        return [expression]
+
+    # Yield the result to get the (node, value) pair for the expression
+    def fold_expression(self, node):
+        fold = self.tables['fold_'].get(node.__class__)
+        if fold is None:
+            fold = self.handler('fold_', node.__class__, ConstantFolder.fold_other)
+        return fold(self, node)
+
+    def fold_Number(self, node):
+        return node, node.value
+
+    def fold_String(self, node):
+        return node, node.value
+
+    def fold_Identifier(self, node):
+        return self.constants.get(node.name) or (node, NOT_CONSTANT)
+
+    def fold_BinaryOp(self, node):
+        logical = node.operator in ('at', 'o')
+        if not logical and is_negation(node.left):
+            # CodeGenerator writes hindi x as `not (x)`, and Python reads
+            # `not (x) < y` as `not (x < y)`: the value is not the one the
+            # tree gives, so only the operands are folded
+            operand, value = yield self.fold_expression(node.left.operand)
+            left, left_value = UnaryOp(node.left.operator, operand), NOT_CONSTANT
+        else:
+            left, left_value = yield self.fold_expression(node.left)
+        right, right_value = yield self.fold_expression(node.right)
+
+        if left_value is not NOT_CONSTANT and logical:
+            # Python's and/or give back one of their operands as it is
+            if bool(left_value) == (node.operator == 'o'):
+                return left, left_value
+            return right, right_value
+
+        string_concat = node.operator == '+' and (
+            isinstance(node.left, String) or isinstance(node.right, String)
+        )
+        if left_value is not NOT_CONSTANT and right_value is not NOT_CONSTANT:
+            try:
+                value = fold_binary(node.operator, left_value, right_value, string_concat)
+            except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+                value = NOT_CONSTANT
+            if value is not NOT_CONSTANT:
+                folded = constant_node(value)
+                if folded is not None:
+                    return folded, value
+
+        # An operand folded into a string literal or a hindi would change
+        # how CodeGenerator's output reads: a string literal on either side
+        # of + makes it join the operands as strings
+        if not logical:
+            if changes_reading(node.left, left, node.operator, string_concat):
+                left = node.left
+            if changes_reading(node.right, right, node.operator, string_concat):
+                right = node.right
+        return BinaryOp(left, node.operator, right), NOT_CONSTANT
+
+    def fold_UnaryOp(self, node):
+        operand, value = yield self.fold_expression(node.operand)
+        function = UNARY_FUNCTIONS.get(node.operator)
+        if value is not NOT_CONSTANT and function is not None:
+            try:
+                value = function(value)
+            except (TypeError, ValueError, OverflowError):
+                value = NOT_CONSTANT
+            if value is not NOT_CONSTANT:
+                folded = constant_node(value)
+                if folded is not None:
+                    return folded, value
+        return UnaryOp(node.operator, operand), NOT_CONSTANT
+
+    def fold_FunctionCall(self, node):
+        arguments = []
+        for argument in node.arguments:
+            argument, value = yield self.fold_expression(argument)
+            arguments.append(argument)
+        return FunctionCall(node.name, arguments), NOT_CONSTANT
+
+    def fold_ArrayLiteral(self, node):
+        elements = []
+        for element in node.elements:
+            element, value = yield self.fold_expression(element)
+            elements.append(element)
+        return ArrayLiteral(elements), NOT_CONSTANT
+
+    def fold_ArrayIndexing(self, node):
+        # The array stays a name: a literal in its place would read as a
+        # different expression, such as 5[0]
+        index, value = yield self.fold_expression(node.index)
+        return ArrayIndexing(node.array, index), NOT_CONSTANT
+
+    def fold_other(self, node):
+        return node, NOT_CONSTANT
+
+
+# The names assigned exactly once in the program and bound nowhere else:
+# not as a parameter, loop or exception variable, function or declaration
+class BindingCounter(ASTWalker):
+    def __init__(self):
+        self.assignments = {}
+        self.other_bindings = set()
+
+    def count(self, program):
+        self.visit(program)
+        return {
+            name for name, count in self.assignments.items()
+            if count == 1 and name not in self.other_bindings
+        }
+
+    def visit_Assignment(self, node):
+        self.assignments[node.var_name] = self.assignments.get(node.var_name, 0) + 1
+        yield node.value
+
+    def visit_VariableDeclaration(self, node):
+        self.other_bindings.add(node.var_name)
+        if node.initial_value:
+            yield node.initial_value
+
+    def visit_FunctionDefinition(self, node):
+        self.other_bindings.add(node.name)
+        self.other_bindings.update(node.parameters)
+        yield node.body
+
+    def visit_ForLoop(self, node):
+        self.other_bindings.add(node.variable)
+        yield node.iterable
+        yield node.body
+
+    def visit_TryExcept(self, node):
+        self.other_bindings.add(node.exception_var)
+        yield node.try_block
+        yield node.except_block
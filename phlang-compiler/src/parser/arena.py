@@ -0,0 +1,246 @@
+import marshal
+from array import array
+
+from .ast import Program, NODE_CLASSES, VALUE, NODE, NODES, node_fields
+
+# Id of a missing optional child, such as an if without an else
+NO_NODE = -1
+# Offset of a node with no literal or name anywhere in it
+NO_OFFSET = -1
+
+
+# Where each constructor argument of a node class is kept, as
+# (field kind, name, column). A plain value takes one column holding its index
+# in `values`, a node one column holding its id, and a list of nodes two:
+# where it starts in `lists` and how many ids it has.
+def column_layout(fields):
+    layout = []
+    column = 0
+    for field, name in fields:
+        layout.append((field, name, column))
+        column += 2 if field == NODES else 1
+    return tuple(layout)
+
+
+LAYOUTS = [column_layout(node_fields(cls)) for cls in NODE_CLASSES]
+NODE_CODES = {cls: code for code, cls in enumerate(NODE_CLASSES)}
+OPERAND_COLUMNS = max(layout[-1][2] + (2 if layout[-1][0] == NODES else 1) for layout in LAYOUTS if layout)
+
+
+# A whole AST in a handful of flat arrays instead of one object per node.
+# Node n is the n-th entry of each column: its class code in `kinds`, its
+# operands in `operands`, and in `offsets` the source offset of the first
+# literal or name in it, or for a statement, of its first token. Child lists are runs of ids in the shared `lists`
+# array, and plain values (names, numbers, operators) are kept once each in
+# `values`. Children are always added before their parent, so ids run in
+# postorder and `root` is the last one.
+#
+# node(id) gives a lightweight view of a node that passes for the AST class
+# it stands for, so SemanticAnalyzer and CodeGenerator walk an arena the same
+# way they walk objects. Views are made as fields are read and not kept.
+class ASTArena:
+    def __init__(self):
+        self.kinds = array('B')
+        self.operands = tuple(array('i') for _ in range(OPERAND_COLUMNS))
+        self.offsets = array('q')
+        self.lists = array('i')
+        self.values = []
+        self.value_ids = {}
+        self.root = NO_NODE
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, cls, args, offset=NO_OFFSET):
+        code = NODE_CODES[cls]
+        operands = [NO_NODE] * OPERAND_COLUMNS
+        for index, (field, name, column) in enumerate(LAYOUTS[code]):
+            # Trailing optional arguments may be left out, as with the classes
+            arg = args[index] if index < len(args) else None
+            if field == VALUE:
+                operands[column] = self.value_id(arg)
+            elif field == NODE:
+                if arg is None:
+                    continue
+                operands[column] = arg
+                if offset < 0:
+                    offset = self.offsets[arg]
+            else:
+                operands[column] = len(self.lists)
+                operands[column + 1] = len(arg)
+                self.lists.extend(arg)
+                if offset < 0 and arg:
+                    offset = self.offsets[arg[0]]
+
+        node_id = len(self.kinds)
+        self.kinds.append(code)
+        for column, operand in zip(self.operands, operands):
+            column.append(operand)
+        self.offsets.append(offset)
+        return node_id
+
+    def value_id(self, value):
+        # 1 and 1.0 are equal but must stay apart; parameter lists are
+        # looked up by their contents
+        key = (value.__class__, tuple(value) if value.__class__ is list else value)
+        index = self.value_ids.get(key)
+        if index is None:
+            index = self.value_ids[key] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def node_class(self, node_id):
+        return NODE_CLASSES[self.kinds[node_id]]
+
+    def node(self, node_id):
+        if node_id < 0:
+            return None
+        return NODE_VIEWS[self.kinds[node_id]](self, node_id)
+
+    def children(self, node_id):
+        children = []
+        for field, name, column in LAYOUTS[self.kinds[node_id]]:
+            operand = self.operands[column][node_id]
+            if field == NODE:
+                if operand != NO_NODE:
+                    children.append(operand)
+            elif field == NODES:
+                children.extend(self.lists[operand:operand + self.operands[column + 1][node_id]])
+        return children
+
+    def builder(self, parser):
+        return ArenaBuilder(self, parser)
+
+    # Moves a node's offset to where its source starts, for statements,
+    # whose first literal or name can be lines further on
+    def locate(self, node_id, offset):
+        self.offsets[node_id] = offset
+        return node_id
+
+    # The columns as raw bytes and the values in marshal format, so loading
+    # is a few array copies rather than one object per node
+    def to_bytes(self):
+        return marshal.dumps((
+            self.kinds.tobytes(),
+            [column.tobytes() for column in self.operands],
+            self.offsets.tobytes(),
+            self.lists.tobytes(),
+            self.values,
+            self.root,
+        ))
+
+
+# Raises ValueError, EOFError or TypeError if `data` is not what to_bytes()
+# wrote with this version of the node classes
+def arena_from_bytes(data):
+    kinds, operands, offsets, lists, values, root = marshal.loads(data)
+    arena = ASTArena()
+    arena.kinds.frombytes(kinds)
+    if len(operands) != OPERAND_COLUMNS:
+        raise ValueError("Hindi tugma ang bilang ng mga hanay ng arena")
+    for column, data in zip(arena.operands, operands):
+        column.frombytes(data)
+    arena.offsets.frombytes(offsets)
+    arena.lists.frombytes(lists)
+    size = len(arena.kinds)
+    if any(len(column) != size for column in arena.operands) or len(arena.offsets) != size:
+        raise ValueError("Hindi tugma ang haba ng mga hanay ng arena")
+    arena.values = values
+    arena.root = root
+    return arena
+
+
+def node_getter(column):
+    def get(self):
+        arena = self.arena
+        return arena.node(arena.operands[column][self.node_id])
+    return get
+
+
+def value_getter(column):
+    def get(self):
+        arena = self.arena
+        return arena.values[arena.operands[column][self.node_id]]
+    return get
+
+
+def list_getter(column):
+    def get(self):
+        arena = self.arena
+        start = arena.operands[column][self.node_id]
+        end = start + arena.operands[column + 1][self.node_id]
+        node = arena.node
+        return [node(child) for child in arena.lists[start:end]]
+    return get
+
+
+FIELD_GETTERS = {VALUE: value_getter, NODE: node_getter, NODES: list_getter}
+
+
+def view_init(self, arena, node_id):
+    self.arena = arena
+    self.node_id = node_id
+
+
+def view_offset(self):
+    return self.arena.offsets[self.node_id]
+
+
+# The base every view class has besides its node class, for telling a view
+# from a node object
+class ArenaView:
+    __slots__ = ()
+
+
+# A subclass of the node class with the same name, whose fields read the
+# arena instead of the instance, so isinstance() checks and visit_<NodeClass>
+# dispatch treat it like the real node
+def view_class(cls, layout):
+    namespace = {
+        '__slots__': ('arena', 'node_id'),
+        '__init__': view_init,
+        'offset': property(view_offset),
+    }
+    for field, name, column in layout:
+        namespace[name] = property(FIELD_GETTERS[field](column))
+    # A view is made afresh on every read, so it has nowhere to keep
+    # annotations such as Resolver's; they read as not filled in
+    for name in cls.annotation_fields:
+        namespace[name] = None
+    return type(cls.__name__, (cls, ArenaView), namespace)
+
+
+NODE_VIEWS = [view_class(cls, layout) for cls, layout in zip(NODE_CLASSES, LAYOUTS)]
+
+
+# Stands in for the AST classes while a Parser emits into an arena: each
+# method is called like the class of the same name, with child ids in place
+# of child nodes, and returns the new node's id.
+class ArenaBuilder:
+    def __init__(self, arena, parser):
+        self.arena = arena
+        self.parser = parser
+
+    def located(self, node_id, offset):
+        return self.arena.locate(node_id, NO_OFFSET if offset is None else offset)
+
+
+def builder_method(cls):
+    if cls.__slots__ and not cls.child_fields:
+        # A literal or a name, built right after its token was consumed
+        def build(self, *args):
+            parser = self.parser
+            offset = parser.tokens[parser.position - 1].offset
+            return self.arena.add(cls, args, NO_OFFSET if offset is None else offset)
+    else:
+        def build(self, *args):
+            node_id = self.arena.add(cls, args)
+            if cls is Program:
+                self.arena.root = node_id
+            return node_id
+    build.__name__ = cls.__name__
+    return build
+
+
+for cls in NODE_CLASSES:
+    setattr(ArenaBuilder, cls.__name__, builder_method(cls))
@@ -1,15 +1,43 @@
+# Nodes keep only their named fields, in __slots__: the constructor
+# arguments in order, then any annotation_fields that later passes fill in.
+# children is worked out from child_fields when it is asked for: the fields
+# that hold a child node, or a list of them if also in list_fields, in order,
+# leaving out optional children that are missing.
+#
+# Statements also get the source offset they start at, from located()
+# below; a node that has none, such as one a pass built, has no offset
+# attribute at all.
 class ASTNode:
-    def __init__(self, node_type, children=None):
-        self.node_type = node_type
-        self.children = children if children is not None else []
+    __slots__ = ('offset',)
+    child_fields = ()
+    list_fields = ()
+    annotation_fields = ()
+
+    @property
+    def node_type(self):
+        return self.__class__.__name__
+
+    @property
+    def children(self):
+        children = []
+        for name in self.child_fields:
+            child = getattr(self, name)
+            if child.__class__ is list:
+                children.extend(child)
+            elif child is not None:
+                children.append(child)
+        return children
 
     def __repr__(self):
         return f"{self.node_type}({', '.join(str(child) for child in self.children)})"
 
 
 class Program(ASTNode):
+    __slots__ = ('statements',)
+    child_fields = ('statements',)
+    list_fields = ('statements',)
+
     def __init__(self, statements):
-        super().__init__('Program', statements)
         self.statements = statements
 
     def __repr__(self):
@@ -17,18 +45,18 @@ class Program(ASTNode):
 
 
 class Statement(ASTNode):
-    def __init__(self, statement_type, children=None):
-        super().__init__(statement_type, children)
+    __slots__ = ()
 
 
 class Expression(ASTNode):
-    def __init__(self, expression_type, children=None):
-        super().__init__(expression_type, children)
+    __slots__ = ()
 
 
 class BinaryOp(Expression):
+    __slots__ = ('left', 'operator', 'right')
+    child_fields = ('left', 'right')
+
     def __init__(self, left, operator, right):
-        super().__init__('BinaryOp', [left, right])
         self.left = left
         self.operator = operator
         self.right = right
@@ -38,8 +66,10 @@ class BinaryOp(Expression):
 
 
 class UnaryOp(Expression):
+    __slots__ = ('operator', 'operand')
+    child_fields = ('operand',)
+
     def __init__(self, operator, operand):
-        super().__init__('UnaryOp', [operand])
         self.operator = operator
         self.operand = operand
 
@@ -48,8 +78,9 @@ class UnaryOp(Expression):
 
 
 class Number(Expression):
+    __slots__ = ('value',)
+
     def __init__(self, value):
-        super().__init__('Number', [])
         self.value = value
 
     def __repr__(self):
@@ -57,8 +88,9 @@ class Number(Expression):
 
 
 class String(Expression):
+    __slots__ = ('value',)
+
     def __init__(self, value):
-        super().__init__('String', [])
         self.value = value
 
     def __repr__(self):
@@ -66,17 +98,25 @@ class String(Expression):
 
 
 class Identifier(Expression):
+    __slots__ = ('name', 'depth', 'slot')
+    # Where the name was declared, filled in by Resolver
+    annotation_fields = ('depth', 'slot')
+
     def __init__(self, name):
-        super().__init__('Identifier', [])
         self.name = name
+        self.depth = None
+        self.slot = None
 
     def __repr__(self):
         return self.name
 
 
 class ArrayLiteral(Expression):
+    __slots__ = ('elements',)
+    child_fields = ('elements',)
+    list_fields = ('elements',)
+
     def __init__(self, elements):
-        super().__init__('ArrayLiteral', elements)
         self.elements = elements
 
     def __repr__(self):
@@ -84,8 +124,10 @@ class ArrayLiteral(Expression):
 
 
 class ArrayIndexing(Expression):
+    __slots__ = ('array', 'index')
+    child_fields = ('array', 'index')
+
     def __init__(self, array, index):
-        super().__init__('ArrayIndexing', [array, index])
         self.array = array
         self.index = index
 
@@ -94,11 +136,10 @@ class ArrayIndexing(Expression):
 
 
 class VariableDeclaration(Statement):
+    __slots__ = ('var_name', 'var_type', 'initial_value')
+    child_fields = ('initial_value',)
+
     def __init__(self, var_name, var_type, initial_value=None):
-        children = [var_name, var_type]
-        if initial_value:
-            children.append(initial_value)
-        super().__init__('VariableDeclaration', children)
         self.var_name = var_name
         self.var_type = var_type
         self.initial_value = initial_value
@@ -110,18 +151,27 @@ class VariableDeclaration(Statement):
 
 
 class Assignment(Statement):
+    __slots__ = ('var_name', 'value', 'depth', 'slot')
+    child_fields = ('value',)
+    # Where the name was declared, filled in by Resolver
+    annotation_fields = ('depth', 'slot')
+
     def __init__(self, var_name, value):
-        super().__init__('Assignment', [value])
         self.var_name = var_name
         self.value = value
+        self.depth = None
+        self.slot = None
 
     def __repr__(self):
         return f"{self.var_name} = {self.value}"
 
 
 class Block(Statement):
+    __slots__ = ('statements',)
+    child_fields = ('statements',)
+    list_fields = ('statements',)
+
     def __init__(self, statements):
-        super().__init__('Block', statements)
         self.statements = statements
 
     def __repr__(self):
@@ -129,8 +179,10 @@ class Block(Statement):
 
 
 class FunctionDefinition(Statement):
+    __slots__ = ('name', 'parameters', 'body')
+    child_fields = ('body',)
+
     def __init__(self, name, parameters, body):
-        super().__init__('FunctionDefinition', [body])
         self.name = name
         self.parameters = parameters
         self.body = body
@@ -141,10 +193,17 @@ class FunctionDefinition(Statement):
 
 
 class FunctionCall(Expression):
+    __slots__ = ('name', 'arguments', 'depth', 'slot')
+    child_fields = ('arguments',)
+    list_fields = ('arguments',)
+    # Where the name was declared, filled in by Resolver
+    annotation_fields = ('depth', 'slot')
+
     def __init__(self, name, arguments):
-        super().__init__('FunctionCall', arguments)
         self.name = name
         self.arguments = arguments
+        self.depth = None
+        self.slot = None
 
     def __repr__(self):
         args = ", ".join(str(arg) for arg in self.arguments)
@@ -152,8 +211,10 @@ class FunctionCall(Expression):
 
 
 class ReturnStatement(Statement):
+    __slots__ = ('value',)
+    child_fields = ('value',)
+
     def __init__(self, value):
-        super().__init__('ReturnStatement', [value])
         self.value = value
 
     def __repr__(self):
@@ -161,11 +222,10 @@ class ReturnStatement(Statement):
 
 
 class IfStatement(Statement):
+    __slots__ = ('condition', 'then_block', 'else_block')
+    child_fields = ('condition', 'then_block', 'else_block')
+
     def __init__(self, condition, then_block, else_block=None):
-        children = [condition, then_block]
-        if else_block:
-            children.append(else_block)
-        super().__init__('IfStatement', children)
         self.condition = condition
         self.then_block = then_block
         self.else_block = else_block
@@ -177,8 +237,10 @@ class IfStatement(Statement):
 
 
 class WhileLoop(Statement):
+    __slots__ = ('condition', 'body')
+    child_fields = ('condition', 'body')
+
     def __init__(self, condition, body):
-        super().__init__('WhileLoop', [condition, body])
         self.condition = condition
         self.body = body
 
@@ -187,8 +249,10 @@ class WhileLoop(Statement):
 
 
 class ForLoop(Statement):
+    __slots__ = ('variable', 'iterable', 'body')
+    child_fields = ('iterable', 'body')
+
     def __init__(self, variable, iterable, body):
-        super().__init__('ForLoop', [iterable, body])
         self.variable = variable
         self.iterable = iterable
         self.body = body
@@ -197,9 +261,28 @@ class ForLoop(Statement):
         return f"para {self.variable} in {self.iterable} {{ ... }}"
 
 
+# para i = 0; i < n; i = i + 1 { ... }: init runs once, then the body and
+# update run for as long as condition holds. ituloy in the body goes on to
+# the update.
+class CStyleForLoop(Statement):
+    __slots__ = ('init', 'condition', 'update', 'body')
+    child_fields = ('init', 'condition', 'update', 'body')
+
+    def __init__(self, init, condition, update, body):
+        self.init = init
+        self.condition = condition
+        self.update = update
+        self.body = body
+
+    def __repr__(self):
+        return f"para {self.init}; {self.condition}; {self.update} {{ ... }}"
+
+
 class PrintStatement(Statement):
+    __slots__ = ('expression',)
+    child_fields = ('expression',)
+
     def __init__(self, expression):
-        super().__init__('PrintStatement', [expression])
         self.expression = expression
 
     def __repr__(self):
@@ -207,27 +290,101 @@ class PrintStatement(Statement):
 
 
 class BreakStatement(Statement):
-    def __init__(self):
-        super().__init__('BreakStatement', [])
+    __slots__ = ()
 
     def __repr__(self):
         return "itigil"
 
 
 class ContinueStatement(Statement):
-    def __init__(self):
-        super().__init__('ContinueStatement', [])
+    __slots__ = ()
 
     def __repr__(self):
         return "ituloy"
 
 
 class TryExcept(Statement):
+    __slots__ = ('try_block', 'exception_var', 'except_block')
+    child_fields = ('try_block', 'except_block')
+
     def __init__(self, try_block, exception_var, except_block):
-        super().__init__('TryExcept', [try_block, except_block])
         self.try_block = try_block
         self.exception_var = exception_var
         self.except_block = except_block
 
     def __repr__(self):
-        return f"subukan {{ ... }} saluhin {self.exception_var} {{ ... }}"
\ No newline at end of file
+        return f"subukan {{ ... }} saluhin {self.exception_var} {{ ... }}"
+
+
+NODE_CLASSES = (
+    Program, BinaryOp, UnaryOp, Number, String, Identifier, ArrayLiteral,
+    ArrayIndexing, VariableDeclaration, Assignment, Block, FunctionDefinition,
+    FunctionCall, ReturnStatement, IfStatement, WhileLoop, ForLoop,
+    PrintStatement, BreakStatement, ContinueStatement, TryExcept, CStyleForLoop,
+)
+
+# What a constructor argument holds: a plain value, a node (or None), or a
+# list of nodes
+VALUE, NODE, NODES = range(3)
+
+
+def node_fields(cls):
+    fields = []
+    for name in cls.__slots__:
+        if name in cls.annotation_fields:
+            continue
+        if name in cls.list_fields:
+            fields.append((NODES, name))
+        elif name in cls.child_fields:
+            fields.append((NODE, name))
+        else:
+            fields.append((VALUE, name))
+    return tuple(fields)
+
+
+# Records the source offset `node` starts at; Parser calls it through
+# self.nodes for each statement it parses
+def located(node, offset):
+    node.offset = offset
+    return node
+
+
+# Gives `node` the offset of `original`, unless it has one of its own, for
+# passes that rebuild statements
+def copy_location(node, original):
+    offset = getattr(original, 'offset', None)
+    if offset is not None and getattr(node, 'offset', None) is None:
+        node.offset = offset
+    return node
+
+
+# A copy of the tree under `node` with every source offset moved by `shift`,
+# for a statement reused where its source now starts elsewhere. Annotations
+# are left for their passes to fill in again. Built bottom-up from a list of
+# the nodes rather than by recursion, so a deep tree copies as well.
+def relocated(node, shift):
+    nodes = []
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        nodes.append(current)
+        pending.extend(current.children)
+
+    copies = {}
+    # Every node comes after its parent in `nodes`, so in reverse its
+    # children are copied before it
+    for current in reversed(nodes):
+        args = []
+        for field, name in node_fields(current.__class__):
+            value = getattr(current, name)
+            if field == NODE:
+                value = None if value is None else copies[id(value)]
+            elif field == NODES:
+                value = [copies[id(child)] for child in value]
+            args.append(value)
+        copy = current.__class__(*args)
+        offset = getattr(current, 'offset', None)
+        if offset is not None:
+            copy.offset = offset + shift
+        copies[id(current)] = copy
+    return copies[id(node)]
@@ -0,0 +1,157 @@
+import hashlib
+import os
+import sys
+import tempfile
+
+from ..lexer.lexer import create_lexer
+from .ast import NODE_CLASSES, node_fields
+from .arena import ASTArena, arena_from_bytes
+from .stack_parser import StackParser
+
+MAGIC = b'PHAST2\n'
+SUFFIX = '.phast'
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'phlang', 'ast')
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# The packages under src/, by directory
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# A hash of the compiler's own sources in the given packages. Anything cached
+# is keyed on the sources of the code that produced it, so a change to that
+# code is never answered from the cache, version bump or not.
+def source_fingerprint(*packages):
+    digest = hashlib.sha256()
+    for package in packages:
+        directory = os.path.join(SOURCE_ROOT, package)
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith('.py'):
+                continue
+            with open(os.path.join(directory, name), 'rb') as file:
+                source = file.read()
+            digest.update(repr((package, name, len(source))).encode())
+            digest.update(source)
+    return digest.hexdigest()
+
+
+# A tree is what the lexer and parser make of the source. The columns are
+# stored in native byte order, and their meaning follows the fields of the
+# node classes, so both are part of every key too.
+CACHE_SALT = repr((
+    source_fingerprint('lexer', 'parser'),
+    sys.byteorder,
+    [(cls.__name__, node_fields(cls)) for cls in NODE_CLASSES],
+)).encode()
+
+
+# Parsed programs on disk, one ASTArena per file, named by a hash of the
+# source text and of the lexer and parser sources. A hit skips lexing and
+# parsing entirely: the arena's columns are read back as they were written.
+#
+# Files are written to a temporary name and renamed into place, so several
+# compilers can share a directory and a reader only ever sees a whole file.
+# A file's modification time is its last use; once the directory grows past
+# max_bytes, the least recently used files are removed. Anything unreadable
+# is treated as a miss.
+class ASTCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, source_code):
+        digest = hashlib.sha256(CACHE_SALT)
+        digest.update(source_code.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + SUFFIX)
+
+    # Returns the Program for `source_code`, from the cache if it is there
+    def parse(self, source_code):
+        key = self.key(source_code)
+        arena = self.get(key)
+        if arena is None:
+            arena = ASTArena()
+            StackParser(create_lexer(source_code).tokenize(), arena=arena).parse()
+            self.put(key, arena)
+        return arena.node(arena.root)
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+            if not data.startswith(MAGIC):
+                raise ValueError("Hindi kilalang anyo ng cache")
+            arena = arena_from_bytes(data[len(MAGIC):])
+        except (OSError, ValueError, EOFError, TypeError):
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return arena
+
+    def put(self, key, arena):
+        if write_atomically(self.path(key), MAGIC + arena.to_bytes()):
+            self.evict()
+
+    def evict(self):
+        evict_least_recent(self.directory, SUFFIX, self.max_bytes)
+
+
+# Writes `data` to a temporary file next to `path` and renames it into place.
+# Returns False if it could not be written, which for a cache only costs the
+# next compile time.
+def write_atomically(path, data):
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+    except OSError:
+        return False
+    return True
+
+
+# Removes the files ending in `suffix` that were used longest ago, by
+# modification time, until those left take up at most max_bytes
+def evict_least_recent(directory, suffix, max_bytes):
+    entries = []
+    total = 0
+    try:
+        with os.scandir(directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    except OSError:
+        return
+
+    entries.sort()
+    for mtime, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            # Already evicted by another compiler
+            pass
+        total -= size
@@ -0,0 +1,121 @@
+from types import GeneratorType
+
+from .ast import ASTNode
+
+
+# Base for passes over the AST that must not be limited by the recursion
+# limit. visit(node) calls visit_<NodeClass>(node); a visitor that needs the
+# result of a child yields it instead of calling visit() on it:
+#
+#     def visit_BinaryOp(self, node):
+#         left = yield node.left
+#         right = yield node.right
+#         return f"({left} + {right})"
+#
+# Yielding a node visits it and yielding a generator runs it as a sub-task;
+# either way the result is sent back. Anything else is sent straight back, so
+# a helper can return a finished result when it has nothing to visit. The
+# suspended visitors are kept on a list instead of the call stack, and a
+# visitor that has no children to visit can be an ordinary method.
+#
+# Which method handles a node class is looked up once per walker class and
+# kept in a table, so visiting is a dict probe and a call. A node class
+# without a method of its own uses the one for its nearest base class that
+# has one, else generic_visit. A pass can also plug any function taking
+# (walker, node) in for a node class with register(); it counts as a method
+# of that pass, so subclasses of the pass use it too unless they override
+# it. Other families of methods, such as CodeGenerator's
+# generate_<NodeClass>, get a table of their own by naming their prefix in
+# `tables`.
+class ASTWalker:
+    # Method prefix -> {node class: function}, filled in as nodes are met
+    tables = {'visit_': {}}
+    visitors = tables['visit_']
+    # Method prefix -> {node class: function}, as given to register()
+    registered = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Empty tables for the same prefixes, as this class's methods may differ
+        cls.tables = {prefix: {} for prefix in cls.tables}
+        cls.visitors = cls.tables['visit_']
+        cls.registered = {}
+
+    @classmethod
+    def register(cls, node_class, function, prefix='visit_'):
+        cls.registered.setdefault(prefix, {})[node_class] = function
+        # Forget what this class and its subclasses looked up before
+        pending = [cls]
+        while pending:
+            walker = pending.pop()
+            walker.tables.setdefault(prefix, {}).clear()
+            pending.extend(walker.__subclasses__())
+
+    # The <prefix><NodeClass> method for node_class, or default if there is none
+    @classmethod
+    def handler(cls, prefix, node_class, default):
+        table = cls.tables.setdefault(prefix, {})
+        function = table.get(node_class)
+        if function is None:
+            function = cls.find_handler(prefix, node_class)
+            if function is None:
+                function = default
+            table[node_class] = function
+        return function
+
+    # The nearest node class wins; for each, the most derived walker class
+    # that registered a function for it or defines the method
+    @classmethod
+    def find_handler(cls, prefix, node_class):
+        for base in node_class.__mro__:
+            name = prefix + base.__name__
+            for walker in cls.__mro__:
+                function = walker.__dict__.get('registered', {}).get(prefix, {}).get(base)
+                if function is None:
+                    function = walker.__dict__.get(name)
+                if function is not None:
+                    return function
+        return None
+
+    def visit(self, node):
+        return self.run(self.dispatch(node))
+
+    def dispatch(self, node):
+        visitor = self.visitors.get(node.__class__)
+        if visitor is None:
+            visitor = self.handler('visit_', node.__class__, self.__class__.generic_visit)
+        return visitor(self, node)
+
+    def run(self, task):
+        if task.__class__ is not GeneratorType:
+            return task
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        value = None
+        while True:
+            try:
+                step = task.send(value)
+            except StopIteration as stop:
+                if not stack:
+                    return stop.value
+                task = pop()
+                value = stop.value
+                continue
+
+            if step.__class__ is not GeneratorType:
+                if isinstance(step, ASTNode):
+                    step = self.dispatch(step)
+                if step.__class__ is not GeneratorType:
+                    value = step
+                    continue
+
+            push(task)
+            task = step
+            value = None
+
+    def generic_visit(self, node):
+        # children leaves out missing optional children already
+        for child in node.children:
+            yield child
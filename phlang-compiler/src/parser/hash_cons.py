@@ -0,0 +1,69 @@
+from .ast import (
+    ASTNode, NODE_CLASSES, BinaryOp, UnaryOp, Number, String, ArrayLiteral, ArrayIndexing
+)
+
+# Expressions whose only state is their fields, so equal ones can be one
+# node. Identifier and FunctionCall are left out: Resolver annotates each
+# occurrence of a name with where it was declared, which differs from one
+# occurrence to the next. An expression with a name anywhere in it is
+# therefore never shared either.
+SHARED_CLASSES = (BinaryOp, UnaryOp, Number, String, ArrayLiteral, ArrayIndexing)
+
+
+def key_part(arg):
+    if arg.__class__ is list:
+        return tuple(map(key_part, arg))
+    if isinstance(arg, ASTNode):
+        # Children are shared already, so equal children are the same node
+        return id(arg)
+    # 1, 1.0 and True are equal but must not share a node
+    return (arg.__class__, arg)
+
+
+# Stands in for the node classes (or an arena's builder) while a Parser
+# hash-conses: an expression equal to one built before, field for field,
+# gets that earlier node back instead of a new one. The tree becomes a DAG
+# in which two expressions are equal exactly when they are the same node.
+#
+# The table keeps every shared node alive, so the id() of a child in a key
+# cannot be reused by another node while the table exists. In an arena a
+# shared name or literal keeps the offset of its first occurrence.
+class HashConsing:
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.table = {}
+        self.shared = 0
+
+    # A statement that is a shared expression, such as a call made twice,
+    # ends up with the offset of its last occurrence
+    def located(self, node, offset):
+        return self.nodes.located(node, offset)
+
+
+def shared_method(cls):
+    name = cls.__name__
+
+    def build(self, *args):
+        key = (cls, tuple(map(key_part, args)))
+        node = self.table.get(key)
+        if node is None:
+            node = self.table[key] = getattr(self.nodes, name)(*args)
+        else:
+            self.shared += 1
+        return node
+    build.__name__ = name
+    return build
+
+
+def plain_method(cls):
+    name = cls.__name__
+
+    def build(self, *args):
+        return getattr(self.nodes, name)(*args)
+    build.__name__ = name
+    return build
+
+
+for node_class in NODE_CLASSES:
+    make = shared_method if node_class in SHARED_CLASSES else plain_method
+    setattr(HashConsing, node_class.__name__, make(node_class))
@@ -0,0 +1,163 @@
+from operator import attrgetter
+from types import GeneratorType
+
+from ..lexer.tokens import TokenKind
+from .ast import Program, relocated
+from .parser import (
+    Parser, STATEMENT_PARSERS,
+    LPAREN, RPAREN, LBRACE, RBRACE, LBRACKET, RBRACKET, SEMICOLON, ASSIGN,
+    KUNDI, EDI, KINDS,
+)
+
+OPENERS = {LPAREN, LBRACE, LBRACKET}
+CLOSERS = {RPAREN, RBRACE, RBRACKET}
+
+# 1 and 1.0 are equal values, but do not generate the same code
+TOKEN_CONTENTS = attrgetter('kind', 'value', 'value.__class__')
+
+# Statements that only end at the brace closing their last block
+BLOCK_STATEMENTS = {KINDS[keyword] for keyword in ('paraan', 'kung', 'habang', 'para', 'subukan')}
+
+
+# Reparses a changed token stream, reusing the top-level statements of the
+# previous parse that did not change. The stream is split into spans at
+# likely top-level statement boundaries and each span is fingerprinted by
+# its tokens; a span whose fingerprint was seen in the previous parse gets
+# the statement parsed from it then, and only the other spans are parsed.
+#
+# Parsing a statement only ever looks one token past its end, so a statement
+# parsed from the same tokens followed by the same token is the same
+# statement. The fingerprint therefore covers the token after the span too.
+# Boundaries are only a guess; when the parser ends a statement somewhere
+# else, the statement is simply parsed and fingerprinted as it really is.
+#
+# The nodes inside a statement keep the offsets of their own tokens, so the
+# fingerprint also covers where each token sits relative to the first. A
+# statement whose inside gained or lost a blank line or a space is parsed
+# again; one that only moved as a whole is reused and moved with it.
+#
+# IncrementalLexer keeps the Token objects outside the edited region, so a
+# span made of the very same token objects as last time is reused without
+# looking at its contents at all.
+#
+# Each statement of the last parse is reused at most once, so a program
+# never holds the same node in two places, even where two statements are
+# written the same. A reused statement whose source now starts at another
+# offset is replaced by a copy with its offsets moved to match (see
+# relocated()); the previous program keeps its own nodes as they were.
+class IncrementalParser:
+    def __init__(self, parser_class=Parser):
+        self.parser_class = parser_class
+        # Fingerprint -> statements, for the statements of the last parse
+        self.spans = {}
+        # First token -> (tokens, fingerprint, statement), same statements
+        self.starts = {}
+        self.program = None
+        self.reused = 0
+
+    # `tokens` must be a list, such as Lexer.tokenize() or IncrementalLexer.tokens
+    def parse(self, tokens):
+        parser = self.parser_class(tokens)
+        old_spans = self.spans
+        old_starts = self.starts
+        spans = {}
+        starts = {}
+        statements = []
+        reused = 0
+        # Ids of the old statements already reused in this parse
+        taken = set()
+
+        while parser.current_token is not None and parser.current_token.kind != TokenKind.EOF:
+            start = parser.position
+            first = parser.current_token
+
+            known = old_starts.get(first)
+            if known is not None:
+                old_span, key, statement = known
+                # The span's tokens plus the one after it, like the fingerprint
+                end = start + len(old_span) - 1
+                span = tokens[start:end + 1]
+                if span != old_span or id(statement) in taken:
+                    known = None
+
+            if known is None:
+                end = self.span_end(tokens, start)
+                span = tokens[start:end + 1]
+                key = self.fingerprint(span)
+                statement = None
+                for candidate in old_spans.get(key, ()):
+                    if id(candidate) not in taken:
+                        statement = candidate
+                        break
+
+            if statement is not None:
+                taken.add(id(statement))
+                statement = self.moved(statement, first.offset)
+                parser.position = end - 1
+                parser.next_token()
+                reused += 1
+            else:
+                statement = parser.statement()
+                if isinstance(statement, GeneratorType):
+                    statement = parser.run(statement)
+                statement = parser.nodes.located(statement, first.offset)
+                if parser.position != end:
+                    end = parser.position
+                    span = tokens[start:end + 1]
+                    key = self.fingerprint(span)
+
+            spans.setdefault(key, []).append(statement)
+            starts[first] = (span, key, statement)
+            statements.append(statement)
+
+        self.spans = spans
+        self.starts = starts
+        self.reused = reused
+        self.program = Program(statements)
+        return self.program
+
+    # `statement` as it is if it was parsed starting at `offset`, else a copy
+    # moved there
+    def moved(self, statement, offset):
+        old_offset = getattr(statement, 'offset', None)
+        if offset is None or old_offset is None or old_offset == offset:
+            return statement
+        return relocated(statement, offset - old_offset)
+
+    # Guesses where the statement starting at `start` ends from the bracket
+    # nesting and the tokens that can only start a statement
+    def span_end(self, tokens, start):
+        depth = 0
+        block = tokens[start].kind in BLOCK_STATEMENTS
+        index = start
+        try:
+            while True:
+                kind = tokens[index].kind
+                if kind == TokenKind.EOF:
+                    return index
+                if kind in OPENERS:
+                    depth += 1
+                elif kind in CLOSERS:
+                    depth -= 1
+                    if depth == 0 and kind == RBRACE and tokens[index + 1].kind not in (KUNDI, EDI):
+                        return index + 1
+                elif depth == 0 and not block and index > start:
+                    if kind == SEMICOLON:
+                        return index + 1
+                    if kind in STATEMENT_PARSERS:
+                        return index
+                    if kind == TokenKind.IDENTIFIER and tokens[index + 1].kind == ASSIGN:
+                        return index
+                index += 1
+        except IndexError:
+            return index
+
+    # `span` is the span's tokens plus the token after it, if there is one.
+    # Tokens without offsets, such as IncrementalLexer's, give nodes none
+    # either, so for them the contents are enough.
+    def fingerprint(self, span):
+        contents = tuple(map(TOKEN_CONTENTS, span))
+        start = span[0].offset
+        if start is None:
+            return contents
+        return contents, tuple(token.offset - start for token in span)
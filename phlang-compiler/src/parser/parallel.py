@@ -0,0 +1,190 @@
+import os
+import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from ..lexer.tokens import LineIndex, KINDS
+from ..lexer.token_buffer import TokenBuffer
+from ..lexer.regex_lexer import RegexLexer
+from .ast import Program, NODE_CLASSES, VALUE, NODE, NODES, node_fields
+from .parser import Parser, LBRACE, RBRACE
+
+# Tokens after a closing brace that continue the same statement
+CONTINUATIONS = {KINDS['kundi'], KINDS['edi'], KINDS['saluhin']}
+BRACE_PATTERN = re.compile(b'[' + re.escape(bytes([LBRACE, RBRACE])) + b']')
+
+# Chunks handed out per worker, so that one slow chunk does not hold up the rest
+CHUNKS_PER_WORKER = 4
+
+
+# Constructor arguments of each node class, in order
+NODE_FIELDS = [(cls, node_fields(cls)) for cls in NODE_CLASSES]
+NODE_CODES = {cls: code for code, (cls, fields) in enumerate(NODE_FIELDS)}
+# Stands in for a missing optional child, such as an if without an else
+NO_NODE = len(NODE_FIELDS)
+# Decoding fills in the constructor arguments from the last one back
+DECODE_FIELDS = [(cls, tuple(field for field, name in reversed(fields))) for cls, fields in NODE_FIELDS]
+
+
+# Flattens subtrees into one list in postorder: a node's children come
+# before it, then its class code and offset (None if it has none) followed
+# by its plain values and the length of each child list, last field first. Lists of numbers and strings pickle
+# far smaller and faster than node objects do.
+def encode(nodes):
+    code = []
+    # (node, expanded) pairs; a node is emitted the second time it is popped
+    stack = [(node, False) for node in reversed(nodes)]
+    while stack:
+        node, expanded = stack.pop()
+        if node is None:
+            code.append(NO_NODE)
+            continue
+
+        node_code = NODE_CODES[node.__class__]
+        fields = NODE_FIELDS[node_code][1]
+        if expanded:
+            code.append(node_code)
+            code.append(getattr(node, 'offset', None))
+            for field, name in reversed(fields):
+                if field == VALUE:
+                    code.append(getattr(node, name))
+                elif field == NODES:
+                    code.append(len(getattr(node, name)))
+            continue
+
+        stack.append((node, True))
+        children = []
+        for field, name in fields:
+            if field == NODE:
+                children.append(getattr(node, name))
+            elif field == NODES:
+                children.extend(getattr(node, name))
+        stack.extend((child, False) for child in reversed(children))
+    return code
+
+
+def decode(code):
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    position = 0
+    size = len(code)
+    while position < size:
+        node_code = code[position]
+        position += 1
+        if node_code == NO_NODE:
+            push(None)
+            continue
+
+        cls, fields = DECODE_FIELDS[node_code]
+        offset = code[position]
+        position += 1
+        args = []
+        for field in fields:
+            if field == NODE:
+                args.append(pop())
+            elif field == VALUE:
+                args.append(code[position])
+                position += 1
+            else:
+                count = code[position]
+                position += 1
+                if count:
+                    args.append(stack[-count:])
+                    del stack[-count:]
+                else:
+                    args.append([])
+        args.reverse()
+        node = cls(*args)
+        if offset is not None:
+            node.offset = offset
+        push(node)
+    return stack
+
+
+# Splits the token buffer into runs of whole top-level statements. A run
+# ends after a '}' that closes a top-level block, unless the statement goes
+# on with kundi, edi or saluhin.
+def split_chunks(buffer, count):
+    kinds = buffer.kinds
+    target = len(kinds) // count + 1
+    chunks = []
+    start = 0
+    depth = 0
+    for match in BRACE_PATTERN.finditer(kinds.tobytes()):
+        index = match.start()
+        if kinds[index] == LBRACE:
+            depth += 1
+            continue
+        depth -= 1
+        end = index + 1
+        if depth == 0 and end - start >= target and end < len(kinds) and kinds[end] not in CONTINUATIONS:
+            chunks.append((start, end))
+            start = end
+    chunks.append((start, len(kinds)))
+    return chunks
+
+
+def chunk_payload(buffer, start, end):
+    lines = buffer.lines
+    offset = buffer.starts[start]
+    end_offset = buffer.starts[end - 1] + buffer.lengths[end - 1]
+    # Only the line starts the chunk's tokens can fall on
+    first = bisect_right(lines.starts, offset) - 1
+    last = bisect_right(lines.starts, end_offset)
+    return (
+        buffer.kinds[start:end].tobytes(),
+        buffer.starts[start:end],
+        buffer.lengths[start:end],
+        [buffer.value_at(index) for index in range(start, end)],
+        lines.first_line + first,
+        lines.starts[first:last],
+        end_offset,
+    )
+
+
+def parse_chunk(payload):
+    kinds, starts, lengths, values, first_line, line_starts, end_offset = payload
+    lines = LineIndex(None, end_offset, first_line, line_starts[0])
+    lines.starts = line_starts
+    buffer = TokenBuffer(lines)
+    for index in range(len(kinds)):
+        buffer.append(kinds[index], values[index], starts[index], lengths[index])
+
+    try:
+        program = Parser(buffer).parse()
+    except Exception:
+        # The error is reported from the main process, see parse_parallel()
+        return None
+    return encode(program.statements)
+
+
+# Lexes the source and parses its top-level statements in chunks across a
+# process pool, then stitches them back into one Program. If a chunk fails,
+# the file is parsed on from the start of that chunk in this process, so the
+# error raised is exactly the one Parser would raise, with its line and
+# column in the original file.
+def parse_parallel(source_code, workers=None):
+    lexer = RegexLexer(source_code)
+    buffer = lexer.tokenize_buffer()
+    # Resolve every line up front; the chunks only get a slice of them
+    buffer.lines.position(buffer.starts[-1])
+
+    workers = workers or os.cpu_count() or 1
+    chunks = split_chunks(buffer, workers * CHUNKS_PER_WORKER)
+    if workers == 1 or len(chunks) == 1:
+        return Parser(buffer).parse()
+
+    payloads = [chunk_payload(buffer, start, end) for start, end in chunks]
+    statements = []
+    with ProcessPoolExecutor(workers) as pool:
+        for (start, end), code in zip(chunks, pool.map(parse_chunk, payloads)):
+            if code is None:
+                parser = Parser(buffer)
+                parser.position = start - 1
+                parser.next_token()
+                statements.extend(parser.program().statements)
+                break
+            statements.extend(decode(code))
+
+    return Program(statements)
@@ -1,45 +1,66 @@
-from ..lexer.tokens import TokenType, Token
-
-from .ast import (
-    Program, Statement, Expression, BinaryOp, UnaryOp,
-    Number, String, Identifier, Assignment, VariableDeclaration,
-    FunctionDefinition, FunctionCall, ReturnStatement,
-    IfStatement, WhileLoop, ForLoop, 
-    PrintStatement, BreakStatement, ContinueStatement,
-    Block, TryExcept, ArrayLiteral, ArrayIndexing
-)
+from ..lexer.tokens import TokenKind, Token, KINDS, KIND_TYPES, KIND_VALUES
+
+from . import ast
+from .hash_cons import HashConsing
+from .token_window import TokenWindow
+from ..error.error_handler import ParseError
+
+# Kinds of the tokens the parser matches on
+LPAREN, RPAREN = KINDS['('], KINDS[')']
+LBRACE, RBRACE = KINDS['{'], KINDS['}']
+LBRACKET, RBRACKET = KINDS['['], KINDS[']']
+COMMA, SEMICOLON = KINDS[','], KINDS[';']
+ASSIGN = KINDS['=']
+KUNG, KUNDI, EDI = KINDS['kung'], KINDS['kundi'], KINDS['edi']
+SA, SAKLAW, SALUHIN = KINDS['sa'], KINDS['saklaw'], KINDS['saluhin']
+# tama and mali are literals; they are kept in Number nodes, as True and
+# False are numbers in Python
+BOOLEANS = {KINDS['tama']: True, KINDS['mali']: False}
 
 class Parser:
-    def __init__(self, tokens):
+    def __init__(self, tokens, recover=False, arena=None, hash_cons=False):
+        # A plain iterator such as Lexer.iter_tokens() is parsed in streaming mode
+        if not hasattr(tokens, '__getitem__'):
+            tokens = TokenWindow(tokens)
         self.tokens = tokens
+        # Nodes are built through self.nodes: the AST classes themselves, or
+        # an ASTArena's builder, which returns node ids instead of objects
+        self.nodes = ast if arena is None else arena.builder(self)
+        # With hash_cons set, equal expressions without names in them are
+        # built once and shared
+        if hash_cons:
+            self.nodes = HashConsing(self.nodes)
         self.current_token = None
         self.position = -1
+        # With recover set, syntax errors are collected in diagnostics and
+        # parsing carries on after them instead of stopping at the first
+        self.recover = recover
+        self.diagnostics = []
         self.next_token()
 
     def next_token(self):
         self.position += 1
-        if self.position < len(self.tokens):
+        try:
             self.current_token = self.tokens[self.position]
-        else:
+        except IndexError:
             self.current_token = None
 
     def peek_token(self, n=1):
-        peek_pos = self.position + n
-        if peek_pos < len(self.tokens):
-            return self.tokens[peek_pos]
-        return None
+        try:
+            return self.tokens[self.position + n]
+        except IndexError:
+            return None
 
-    def expect(self, token_type, value=None):
-        if self.current_token is None:
-            self.error(f"Inaasahan ang {token_type} ngunit naabot na ang katapusan ng input")
-        
-        if self.current_token.type != token_type:
-            self.error(f"Inaasahan ang {token_type} ngunit nakakuha ng {self.current_token.type}")
+    def expect(self, kind):
+        token = self.current_token
+        if token is None:
+            self.error(f"Inaasahan ang {KIND_TYPES[kind]} ngunit naabot na ang katapusan ng input")
         
-        if value is not None and self.current_token.value != value:
-            self.error(f"Inaasahan ang '{value}' ngunit nakakuha ng '{self.current_token.value}'")
+        if token.kind != kind:
+            if token.type != KIND_TYPES[kind]:
+                self.error(f"Inaasahan ang {KIND_TYPES[kind]} ngunit nakakuha ng {token.type}")
+            self.error(f"Inaasahan ang '{KIND_VALUES[kind]}' ngunit nakakuha ng '{token.value}'")
         
-        token = self.current_token
         self.next_token()
         return token
 
@@ -48,365 +69,315 @@ class Parser:
 
     def program(self):
         statements = []
-        while self.current_token is not None and self.current_token.type != TokenType.EOF:
-            statements.append(self.statement())
+        while self.current_token is not None and self.current_token.kind != TokenKind.EOF:
+            start = self.position
+            token = self.current_token
+            try:
+                statements.append(self.nodes.located(self.statement(), token.offset))
+            except ParseError as error:
+                self.synchronize(error, start, False)
         
-        return Program(statements)
+        return self.nodes.Program(statements)
 
     def statement(self):
-        if self.current_token.type == TokenType.KEYWORD:
-            if self.current_token.value == 'paraan':
-                return self.function_definition()
-            elif self.current_token.value == 'kung':
-                return self.if_statement()
-            elif self.current_token.value == 'habang':
-                return self.while_loop()
-            elif self.current_token.value == 'para':
-                return self.for_loop()
-            elif self.current_token.value == 'bumalik':
-                return self.return_statement()
-            elif self.current_token.value == 'idikta':
-                return self.print_statement()
-            elif self.current_token.value == 'itigil':
-                return self.break_statement()
-            elif self.current_token.value == 'ituloy':
-                return self.continue_statement()
-            elif self.current_token.value == 'subukan':
-                return self.try_except_statement()
-        
-        if self.current_token.type == TokenType.IDENTIFIER:
-            if self.peek_token() and self.peek_token().type == TokenType.OPERATOR and self.peek_token().value == '=':
+        kind = self.current_token.kind
+        parse = STATEMENT_PARSERS.get(kind)
+        if parse is not None:
+            return parse(self)
+        
+        if kind == TokenKind.IDENTIFIER:
+            next_token = self.peek_token()
+            if next_token and next_token.kind == ASSIGN:
                 return self.assignment_statement()
         
         expr = self.expression()
         
-        if (self.current_token and self.current_token.type == TokenType.DELIMITER 
-            and self.current_token.value == ';'):
+        if self.current_token and self.current_token.kind == SEMICOLON:
             self.next_token()
         
         return expr
 
     def block(self):
-        self.expect(TokenType.DELIMITER, '{')
+        self.expect(LBRACE)
         statements = []
         
-        while self.current_token is not None and not (self.current_token.type == TokenType.DELIMITER and self.current_token.value == '}'):
-            statements.append(self.statement())
+        while self.current_token is not None and self.current_token.kind != RBRACE:
+            start = self.position
+            token = self.current_token
+            try:
+                statements.append(self.nodes.located(self.statement(), token.offset))
+            except ParseError as error:
+                self.synchronize(error, start, True)
     
-        self.expect(TokenType.DELIMITER, '}')
-        return Block(statements)
+        self.expect(RBRACE)
+        return self.nodes.Block(statements)
 
     def array_literal(self):
-        self.expect(TokenType.DELIMITER, '[')
+        self.expect(LBRACKET)
         elements = []
         
-        if self.current_token.type != TokenType.DELIMITER or self.current_token.value != ']':
+        if self.current_token.kind != RBRACKET:
             elements.append(self.expression())
             
-            while self.current_token.type == TokenType.DELIMITER and self.current_token.value == ',':
+            while self.current_token.kind == COMMA:
                 self.next_token()
                 elements.append(self.expression())
         
-        self.expect(TokenType.DELIMITER, ']')
-        return ArrayLiteral(elements)
+        self.expect(RBRACKET)
+        return self.nodes.ArrayLiteral(elements)
 
     def function_definition(self):
-        self.expect(TokenType.KEYWORD, 'paraan')
-        name = self.expect(TokenType.IDENTIFIER).value
+        self.expect(KINDS['paraan'])
+        name = self.expect(TokenKind.IDENTIFIER).value
         
-        self.expect(TokenType.DELIMITER, '(')
+        self.expect(LPAREN)
         parameters = self.parameter_list()
-        self.expect(TokenType.DELIMITER, ')')
+        self.expect(RPAREN)
         
         body = self.block()
-        return FunctionDefinition(name, parameters, body)
+        return self.nodes.FunctionDefinition(name, parameters, body)
 
     def parameter_list(self):
         parameters = []
         
-        if self.current_token.type == TokenType.DELIMITER and self.current_token.value == ')':
+        if self.current_token.kind == RPAREN:
             return parameters
         
-        parameters.append(self.expect(TokenType.IDENTIFIER).value)
+        parameters.append(self.expect(TokenKind.IDENTIFIER).value)
         
-        while self.current_token.type == TokenType.DELIMITER and self.current_token.value == ',':
+        while self.current_token.kind == COMMA:
             self.next_token()
-            parameters.append(self.expect(TokenType.IDENTIFIER).value)
+            parameters.append(self.expect(TokenKind.IDENTIFIER).value)
         
         return parameters
 
     def if_statement(self):
-        self.expect(TokenType.KEYWORD, 'kung')
+        self.expect(KUNG)
         condition = self.expression()
         then_block = self.block()
         
         else_block = None
         
-        if self.current_token and self.current_token.type == TokenType.KEYWORD and self.current_token.value == 'kundi':
+        if self.current_token and self.current_token.kind == KUNDI:
             self.next_token()
             
             elif_condition = self.expression()
             elif_block = self.block()
             
-            if self.current_token and self.current_token.type == TokenType.KEYWORD and self.current_token.value == 'edi':
+            if self.current_token and self.current_token.kind == EDI:
                 self.next_token()
                 else_block = self.block()
                 
-                elif_statement = IfStatement(elif_condition, elif_block, else_block)
-                return IfStatement(condition, then_block, elif_statement)
+                elif_statement = self.nodes.IfStatement(elif_condition, elif_block, else_block)
+                return self.nodes.IfStatement(condition, then_block, elif_statement)
             else:
-                return IfStatement(condition, then_block, IfStatement(elif_condition, elif_block, None))
+                return self.nodes.IfStatement(condition, then_block, self.nodes.IfStatement(elif_condition, elif_block, None))
         
-        elif self.current_token and self.current_token.type == TokenType.KEYWORD and self.current_token.value == 'edi':
+        elif self.current_token and self.current_token.kind == EDI:
             self.next_token()
             else_block = self.block()
         
-        return IfStatement(condition, then_block, else_block)
+        return self.nodes.IfStatement(condition, then_block, else_block)
 
     def while_loop(self):
-        self.expect(TokenType.KEYWORD, 'habang')
+        self.expect(KINDS['habang'])
         condition = self.expression()
         body = self.block()
-        return WhileLoop(condition, body)
+        return self.nodes.WhileLoop(condition, body)
 
     def for_loop(self):
-        self.expect(TokenType.KEYWORD, 'para')
+        self.expect(KINDS['para'])
         
-        if self.current_token.type == TokenType.IDENTIFIER:
-            variable = self.expect(TokenType.IDENTIFIER).value
+        if self.current_token.kind == TokenKind.IDENTIFIER:
+            variable = self.expect(TokenKind.IDENTIFIER).value
             
-            if self.current_token.type == TokenType.KEYWORD and self.current_token.value == 'sa':
-                self.next_token()
-                iterable = self.expression()
-                body = self.block()
-                return ForLoop(variable, iterable, body)
-            elif self.current_token.type == TokenType.KEYWORD and self.current_token.value == 'in':
+            if self.current_token.kind == SA:
                 self.next_token()
                 iterable = self.expression()
                 body = self.block()
-                return ForLoop(variable, iterable, body)
-            elif self.current_token.type == TokenType.OPERATOR and self.current_token.value == '=':
+                return self.nodes.ForLoop(variable, iterable, body)
+            elif self.current_token.kind == ASSIGN:
                 self.next_token()
                 init_value = self.expression()
-                init = Assignment(variable, init_value)
+                init = self.nodes.Assignment(variable, init_value)
                 
-                self.expect(TokenType.DELIMITER, ';')
+                self.expect(SEMICOLON)
                 condition = self.expression()
-                self.expect(TokenType.DELIMITER, ';')
-                update = self.expression()
+                self.expect(SEMICOLON)
+                update = self.loop_update()
                 
                 body = self.block()
-                
-                loop_body = Block(body.statements + [update])
-                return WhileLoop(condition, loop_body, init)
+                return self.nodes.CStyleForLoop(init, condition, update, body)
         
         self.error("Invalid for loop syntax")
 
+    # The update of a C-style para: an assignment such as i = i + 1, or an
+    # expression such as a call
+    def loop_update(self):
+        if self.current_token.kind == TokenKind.IDENTIFIER:
+            next_token = self.peek_token()
+            if next_token and next_token.kind == ASSIGN:
+                return self.assignment_statement()
+        return self.expression()
+
     def return_statement(self):
-        self.expect(TokenType.KEYWORD, 'bumalik')
+        self.expect(KINDS['bumalik'])
         value = self.expression()
         
-        if (self.current_token and self.current_token.type == TokenType.DELIMITER 
-            and self.current_token.value == ';'):
+        if self.current_token and self.current_token.kind == SEMICOLON:
             self.next_token()
             
-        return ReturnStatement(value)
+        return self.nodes.ReturnStatement(value)
 
     def print_statement(self):
-        self.expect(TokenType.KEYWORD, 'idikta')
+        self.expect(KINDS['idikta'])
         value = self.expression()
         
-        if (self.current_token and self.current_token.type == TokenType.DELIMITER 
-            and self.current_token.value == ';'):
+        if self.current_token and self.current_token.kind == SEMICOLON:
             self.next_token()
             
-        return PrintStatement(value)
+        return self.nodes.PrintStatement(value)
 
     def break_statement(self):
-        self.expect(TokenType.KEYWORD, 'itigil')
+        self.expect(KINDS['itigil'])
         
-        if (self.current_token and self.current_token.type == TokenType.DELIMITER 
-            and self.current_token.value == ';'):
+        if self.current_token and self.current_token.kind == SEMICOLON:
             self.next_token()
             
-        return BreakStatement()
+        return self.nodes.BreakStatement()
 
     def continue_statement(self):
-        self.expect(TokenType.KEYWORD, 'ituloy')
+        self.expect(KINDS['ituloy'])
         
-        if (self.current_token and self.current_token.type == TokenType.DELIMITER 
-            and self.current_token.value == ';'):
+        if self.current_token and self.current_token.kind == SEMICOLON:
             self.next_token()
             
-        return ContinueStatement()
+        return self.nodes.ContinueStatement()
 
     def try_except_statement(self):
-        self.expect(TokenType.KEYWORD, 'subukan')
+        self.expect(KINDS['subukan'])
         try_block = self.block()
         
-        self.expect(TokenType.KEYWORD, 'saluhin')
-        self.expect(TokenType.DELIMITER, '(')
-        exception_var = self.expect(TokenType.IDENTIFIER).value
-        self.expect(TokenType.DELIMITER, ')')
+        self.expect(SALUHIN)
+        self.expect(LPAREN)
+        exception_var = self.expect(TokenKind.IDENTIFIER).value
+        self.expect(RPAREN)
         except_block = self.block()
         
-        return TryExcept(try_block, exception_var, except_block)
+        return self.nodes.TryExcept(try_block, exception_var, except_block)
 
     def assignment_statement(self):
-        identifier = self.expect(TokenType.IDENTIFIER).value
-        self.expect(TokenType.OPERATOR, '=')
+        identifier = self.expect(TokenKind.IDENTIFIER).value
+        self.expect(ASSIGN)
         value = self.expression()
         
-        if (self.current_token and self.current_token.type == TokenType.DELIMITER 
-            and self.current_token.value == ';'):
+        if self.current_token and self.current_token.kind == SEMICOLON:
             self.next_token()
             
-        return Assignment(identifier, value)
-
-    def expression(self):
-        return self.logical_or()
-
-    def logical_or(self):
-        node = self.logical_and()
-        
-        while self.current_token is not None and self.current_token.type == TokenType.OPERATOR and self.current_token.value == 'o':
-            op = self.current_token.value
-            self.next_token()
-            right = self.logical_and()
-            node = BinaryOp(node, op, right)
-        
-        return node
-
-    def logical_and(self):
-        node = self.equality()
-        
-        while self.current_token is not None and self.current_token.type == TokenType.OPERATOR and self.current_token.value == 'at':
-            op = self.current_token.value
-            self.next_token()
-            right = self.equality()
-            node = BinaryOp(node, op, right)
-        
-        return node
-
-    def equality(self):
-        node = self.comparison()
-        
-        while (self.current_token is not None and self.current_token.type == TokenType.OPERATOR 
-              and self.current_token.value in ('==', '!=')):
-            op = self.current_token.value
+        return self.nodes.Assignment(identifier, value)
+
+    def expression(self, min_power=0):
+        node = self.prefix()
+        
+        # Fold in binary operators for as long as they bind tighter than the
+        # operator whose right operand is being parsed
+        while True:
+            token = self.current_token
+            if token is None:
+                break
+            infix = INFIX_OPERATORS.get(token.kind)
+            if infix is None or infix[0] <= min_power:
+                break
             self.next_token()
-            right = self.comparison()
-            node = BinaryOp(node, op, right)
+            node = infix[1](self, node, token.value, infix[0])
         
         return node
 
-    def comparison(self):
-        node = self.term()
-        
-        while (self.current_token is not None and self.current_token.type == TokenType.OPERATOR 
-              and self.current_token.value in ('<', '>', '<=', '>=')):
-            op = self.current_token.value
-            self.next_token()
-            right = self.term()
-            node = BinaryOp(node, op, right)
-        
-        return node
-
-    def term(self):
-        node = self.factor()
-        
-        while (self.current_token is not None and self.current_token.type == TokenType.OPERATOR 
-              and self.current_token.value in ('+', '-')):
-            op = self.current_token.value
-            self.next_token()
-            right = self.factor()
-            node = BinaryOp(node, op, right)
-        
-        return node
-
-    def factor(self):
-        node = self.unary()
-        
-        while (self.current_token is not None and self.current_token.type == TokenType.OPERATOR 
-              and self.current_token.value in ('*', '/', '%')):
-            op = self.current_token.value
-            self.next_token()
-            right = self.unary()
-            node = BinaryOp(node, op, right)
-        
-        return node
-
-    def unary(self):
-        if self.current_token is not None and self.current_token.type == TokenType.OPERATOR:
-            if self.current_token.value in ('-', 'hindi'):
-                op = self.current_token.value
+    def prefix(self):
+        token = self.current_token
+        if token is not None:
+            prefix = PREFIX_OPERATORS.get(token.kind)
+            if prefix is not None:
                 self.next_token()
-                operand = self.unary()
-                return UnaryOp(op, operand)
+                return prefix[1](self, token.value, prefix[0])
         
         return self.primary()
 
+    def binary(self, left, op, power):
+        right = self.expression(power)
+        return self.nodes.BinaryOp(left, op, right)
+
+    def unary(self, op, power):
+        operand = self.expression(power)
+        return self.nodes.UnaryOp(op, operand)
+
     def primary(self):
         token = self.current_token
+        kind = token.kind
         
-        if token.type == TokenType.NUMBER:
+        if kind == TokenKind.NUMBER:
             self.next_token()
-            return Number(token.value)
+            return self.nodes.Number(token.value)
         
-        elif token.type == TokenType.STRING:
+        elif kind == TokenKind.STRING:
             self.next_token()
-            return String(token.value)
+            return self.nodes.String(token.value)
         
-        elif token.type == TokenType.DELIMITER and token.value == '[':
+        elif kind in BOOLEANS:
+            self.next_token()
+            return self.nodes.Number(BOOLEANS[kind])
+        
+        elif kind == LBRACKET:
             return self.array_literal()
             
-        elif token.type == TokenType.IDENTIFIER:
+        elif kind == TokenKind.IDENTIFIER:
             self.next_token()
             
-            if self.current_token and self.current_token.type == TokenType.DELIMITER:
-                if self.current_token.value == '[':
+            if self.current_token:
+                if self.current_token.kind == LBRACKET:
+                    array = self.nodes.Identifier(token.value)
                     self.next_token()
                     index = self.expression()
-                    self.expect(TokenType.DELIMITER, ']')
-                    return ArrayIndexing(Identifier(token.value), index)
-                elif self.current_token.value == '(':
+                    self.expect(RBRACKET)
+                    return self.nodes.ArrayIndexing(array, index)
+                elif self.current_token.kind == LPAREN:
                     self.position -= 1
                     self.current_token = self.tokens[self.position]
                     return self.function_call()
                 
-            return Identifier(token.value)
+            return self.nodes.Identifier(token.value)
         
-        elif token.type == TokenType.KEYWORD and token.value == 'saklaw':
+        elif kind == SAKLAW:
             self.next_token() 
-            self.expect(TokenType.DELIMITER, '(')
+            self.expect(LPAREN)
             arguments = self.argument_list()
-            self.expect(TokenType.DELIMITER, ')')
-            return FunctionCall('saklaw', arguments)
+            self.expect(RPAREN)
+            return self.nodes.FunctionCall('saklaw', arguments)
         
-        elif token.type == TokenType.DELIMITER and token.value == '(':
+        elif kind == LPAREN:
             self.next_token()
             expr = self.expression()
-            self.expect(TokenType.DELIMITER, ')')
+            self.expect(RPAREN)
             return expr
         
         self.error(f"Hindi inaasahang token: {token}")
 
     def function_call(self):
-        name = self.expect(TokenType.IDENTIFIER).value
-        self.expect(TokenType.DELIMITER, '(')
+        name = self.expect(TokenKind.IDENTIFIER).value
+        self.expect(LPAREN)
         arguments = self.argument_list()
-        self.expect(TokenType.DELIMITER, ')')
-        return FunctionCall(name, arguments)
+        self.expect(RPAREN)
+        return self.nodes.FunctionCall(name, arguments)
 
     def argument_list(self):
         arguments = []
         
-        if self.current_token.type == TokenType.DELIMITER and self.current_token.value == ')':
+        if self.current_token.kind == RPAREN:
             return arguments
         
         arguments.append(self.expression())
         
-        while self.current_token.type == TokenType.DELIMITER and self.current_token.value == ',':
+        while self.current_token.kind == COMMA:
             self.next_token()
             arguments.append(self.expression())
         
@@ -415,8 +386,65 @@ class Parser:
     def error(self, message):
         token = self.current_token
         if token:
-            line = token.line
-            column = token.column
-            raise Exception(f"Mali sa pag-parse sa linya {line}, hanay {column}: {message}")
+            raise ParseError(message, token.line, token.column)
         else:
-            raise Exception(f"Mali sa pag-parse: {message}")
\ No newline at end of file
+            raise ParseError(message)
+
+    # Panic-mode recovery from an error in the statement that started at
+    # `start`: the error is recorded and tokens are skipped up to the next
+    # ';', '}' or statement keyword. Inside a block the '}' is left for the
+    # block to close on; at the top level it is skipped as well.
+    def synchronize(self, error, start, in_block):
+        if not self.recover:
+            raise error
+        self.diagnostics.append(error)
+
+        # Always make progress, or the same token would fail again
+        if self.position == start:
+            self.next_token()
+
+        while self.current_token is not None:
+            kind = self.current_token.kind
+            if kind == TokenKind.EOF or kind in STATEMENT_PARSERS or (kind == RBRACE and in_block):
+                break
+            self.next_token()
+            if kind == SEMICOLON or kind == RBRACE:
+                break
+
+
+# Parsers for the statements that are recognized by their first keyword
+STATEMENT_PARSERS = {
+    KINDS['paraan']: Parser.function_definition,
+    KINDS['kung']: Parser.if_statement,
+    KINDS['habang']: Parser.while_loop,
+    KINDS['para']: Parser.for_loop,
+    KINDS['bumalik']: Parser.return_statement,
+    KINDS['idikta']: Parser.print_statement,
+    KINDS['itigil']: Parser.break_statement,
+    KINDS['ituloy']: Parser.continue_statement,
+    KINDS['subukan']: Parser.try_except_statement,
+}
+
+# Binding power and handler of each operator; a higher power binds tighter.
+# Binary operators are left-associative, and a prefix operator's operand
+# binds tighter than any binary operator.
+INFIX_OPERATORS = {
+    KINDS['o']: (10, Parser.binary),
+    KINDS['at']: (20, Parser.binary),
+    KINDS['==']: (30, Parser.binary),
+    KINDS['!=']: (30, Parser.binary),
+    KINDS['<']: (40, Parser.binary),
+    KINDS['>']: (40, Parser.binary),
+    KINDS['<=']: (40, Parser.binary),
+    KINDS['>=']: (40, Parser.binary),
+    KINDS['+']: (50, Parser.binary),
+    KINDS['-']: (50, Parser.binary),
+    KINDS['*']: (60, Parser.binary),
+    KINDS['/']: (60, Parser.binary),
+    KINDS['%']: (60, Parser.binary),
+}
+
+PREFIX_OPERATORS = {
+    KINDS['-']: (70, Parser.unary),
+    KINDS['hindi']: (70, Parser.unary),
+}
@@ -0,0 +1,358 @@
+from types import GeneratorType
+
+from ..lexer.tokens import TokenKind, KINDS
+from ..error.error_handler import ParseError
+from .parser import (
+    Parser,
+    LPAREN, RPAREN, LBRACE, RBRACE, LBRACKET, RBRACKET, COMMA, SEMICOLON,
+    ASSIGN, KUNG, KUNDI, EDI, SA, SAKLAW, SALUHIN, BOOLEANS,
+    STATEMENT_PARSERS as RECURSIVE_STATEMENT_PARSERS,
+    INFIX_OPERATORS as RECURSIVE_INFIX_OPERATORS,
+    PREFIX_OPERATORS as RECURSIVE_PREFIX_OPERATORS,
+)
+
+
+# Parses the same grammar into the same tree as Parser, without using the
+# Python call stack for nesting. Each grammar rule is a generator that yields
+# the sub-rule it needs and is sent back the node that rule produced; run()
+# keeps the suspended rules on a list, so nesting depth is bounded by memory
+# rather than by the recursion limit.
+#
+# A rule that cannot nest, such as break_statement(), is inherited as is:
+# yielding its result instead of a generator just hands the node straight back.
+class StackParser(Parser):
+    def parse(self):
+        return self.run(self.program())
+
+    def run(self, rule):
+        stack = []
+        value = None
+        error = None
+        while True:
+            try:
+                if error is None:
+                    step = rule.send(value)
+                else:
+                    # A sub-rule failed; raise it where that rule was yielded
+                    failure, error = error, None
+                    step = rule.throw(failure)
+            except StopIteration as stop:
+                if not stack:
+                    return stop.value
+                rule = stack.pop()
+                value = stop.value
+                continue
+            except ParseError as failure:
+                if not stack:
+                    raise
+                rule = stack.pop()
+                error = failure
+                continue
+
+            if isinstance(step, GeneratorType):
+                stack.append(rule)
+                rule = step
+                value = None
+            else:
+                value = step
+
+    def program(self):
+        statements = []
+        while self.current_token is not None and self.current_token.kind != TokenKind.EOF:
+            start = self.position
+            token = self.current_token
+            try:
+                statement = yield self.statement()
+                statements.append(self.nodes.located(statement, token.offset))
+            except ParseError as error:
+                self.synchronize(error, start, False)
+
+        return self.nodes.Program(statements)
+
+    def statement(self):
+        kind = self.current_token.kind
+        parse = STATEMENT_PARSERS.get(kind)
+        if parse is not None:
+            return (yield parse(self))
+
+        if kind == TokenKind.IDENTIFIER:
+            next_token = self.peek_token()
+            if next_token and next_token.kind == ASSIGN:
+                return (yield self.assignment_statement())
+
+        expr = yield self.expression()
+
+        if self.current_token and self.current_token.kind == SEMICOLON:
+            self.next_token()
+
+        return expr
+
+    def block(self):
+        self.expect(LBRACE)
+        statements = []
+
+        while self.current_token is not None and self.current_token.kind != RBRACE:
+            start = self.position
+            token = self.current_token
+            try:
+                statement = yield self.statement()
+                statements.append(self.nodes.located(statement, token.offset))
+            except ParseError as error:
+                self.synchronize(error, start, True)
+
+        self.expect(RBRACE)
+        return self.nodes.Block(statements)
+
+    def array_literal(self):
+        self.expect(LBRACKET)
+        elements = []
+
+        if self.current_token.kind != RBRACKET:
+            elements.append((yield self.expression()))
+
+            while self.current_token.kind == COMMA:
+                self.next_token()
+                elements.append((yield self.expression()))
+
+        self.expect(RBRACKET)
+        return self.nodes.ArrayLiteral(elements)
+
+    def function_definition(self):
+        self.expect(KINDS['paraan'])
+        name = self.expect(TokenKind.IDENTIFIER).value
+
+        self.expect(LPAREN)
+        parameters = self.parameter_list()
+        self.expect(RPAREN)
+
+        body = yield self.block()
+        return self.nodes.FunctionDefinition(name, parameters, body)
+
+    def if_statement(self):
+        self.expect(KUNG)
+        condition = yield self.expression()
+        then_block = yield self.block()
+
+        else_block = None
+
+        if self.current_token and self.current_token.kind == KUNDI:
+            self.next_token()
+
+            elif_condition = yield self.expression()
+            elif_block = yield self.block()
+
+            if self.current_token and self.current_token.kind == EDI:
+                self.next_token()
+                else_block = yield self.block()
+
+                elif_statement = self.nodes.IfStatement(elif_condition, elif_block, else_block)
+                return self.nodes.IfStatement(condition, then_block, elif_statement)
+            else:
+                return self.nodes.IfStatement(condition, then_block, self.nodes.IfStatement(elif_condition, elif_block, None))
+
+        elif self.current_token and self.current_token.kind == EDI:
+            self.next_token()
+            else_block = yield self.block()
+
+        return self.nodes.IfStatement(condition, then_block, else_block)
+
+    def while_loop(self):
+        self.expect(KINDS['habang'])
+        condition = yield self.expression()
+        body = yield self.block()
+        return self.nodes.WhileLoop(condition, body)
+
+    def for_loop(self):
+        self.expect(KINDS['para'])
+
+        if self.current_token.kind == TokenKind.IDENTIFIER:
+            variable = self.expect(TokenKind.IDENTIFIER).value
+
+            if self.current_token.kind == SA:
+                self.next_token()
+                iterable = yield self.expression()
+                body = yield self.block()
+                return self.nodes.ForLoop(variable, iterable, body)
+            elif self.current_token.kind == ASSIGN:
+                self.next_token()
+                init_value = yield self.expression()
+                init = self.nodes.Assignment(variable, init_value)
+
+                self.expect(SEMICOLON)
+                condition = yield self.expression()
+                self.expect(SEMICOLON)
+                update = yield self.loop_update()
+
+                body = yield self.block()
+                return self.nodes.CStyleForLoop(init, condition, update, body)
+
+        self.error("Invalid for loop syntax")
+
+    def loop_update(self):
+        if self.current_token.kind == TokenKind.IDENTIFIER:
+            next_token = self.peek_token()
+            if next_token and next_token.kind == ASSIGN:
+                return (yield self.assignment_statement())
+        return (yield self.expression())
+
+    def return_statement(self):
+        self.expect(KINDS['bumalik'])
+        value = yield self.expression()
+
+        if self.current_token and self.current_token.kind == SEMICOLON:
+            self.next_token()
+
+        return self.nodes.ReturnStatement(value)
+
+    def print_statement(self):
+        self.expect(KINDS['idikta'])
+        value = yield self.expression()
+
+        if self.current_token and self.current_token.kind == SEMICOLON:
+            self.next_token()
+
+        return self.nodes.PrintStatement(value)
+
+    def try_except_statement(self):
+        self.expect(KINDS['subukan'])
+        try_block = yield self.block()
+
+        self.expect(SALUHIN)
+        self.expect(LPAREN)
+        exception_var = self.expect(TokenKind.IDENTIFIER).value
+        self.expect(RPAREN)
+        except_block = yield self.block()
+
+        return self.nodes.TryExcept(try_block, exception_var, except_block)
+
+    def assignment_statement(self):
+        identifier = self.expect(TokenKind.IDENTIFIER).value
+        self.expect(ASSIGN)
+        value = yield self.expression()
+
+        if self.current_token and self.current_token.kind == SEMICOLON:
+            self.next_token()
+
+        return self.nodes.Assignment(identifier, value)
+
+    def expression(self, min_power=0):
+        node = yield self.prefix()
+
+        while True:
+            token = self.current_token
+            if token is None:
+                break
+            infix = INFIX_OPERATORS.get(token.kind)
+            if infix is None or infix[0] <= min_power:
+                break
+            self.next_token()
+            node = yield infix[1](self, node, token.value, infix[0])
+
+        return node
+
+    def prefix(self):
+        token = self.current_token
+        if token is not None:
+            prefix = PREFIX_OPERATORS.get(token.kind)
+            if prefix is not None:
+                self.next_token()
+                return (yield prefix[1](self, token.value, prefix[0]))
+
+        return (yield self.primary())
+
+    def binary(self, left, op, power):
+        right = yield self.expression(power)
+        return self.nodes.BinaryOp(left, op, right)
+
+    def unary(self, op, power):
+        operand = yield self.expression(power)
+        return self.nodes.UnaryOp(op, operand)
+
+    def primary(self):
+        token = self.current_token
+        kind = token.kind
+
+        if kind == TokenKind.NUMBER:
+            self.next_token()
+            return self.nodes.Number(token.value)
+
+        elif kind == TokenKind.STRING:
+            self.next_token()
+            return self.nodes.String(token.value)
+
+        elif kind in BOOLEANS:
+            self.next_token()
+            return self.nodes.Number(BOOLEANS[kind])
+
+        elif kind == LBRACKET:
+            return (yield self.array_literal())
+
+        elif kind == TokenKind.IDENTIFIER:
+            self.next_token()
+
+            if self.current_token:
+                if self.current_token.kind == LBRACKET:
+                    array = self.nodes.Identifier(token.value)
+                    self.next_token()
+                    index = yield self.expression()
+                    self.expect(RBRACKET)
+                    return self.nodes.ArrayIndexing(array, index)
+                elif self.current_token.kind == LPAREN:
+                    self.position -= 1
+                    self.current_token = self.tokens[self.position]
+                    return (yield self.function_call())
+
+            return self.nodes.Identifier(token.value)
+
+        elif kind == SAKLAW:
+            self.next_token()
+            self.expect(LPAREN)
+            arguments = yield self.argument_list()
+            self.expect(RPAREN)
+            return self.nodes.FunctionCall('saklaw', arguments)
+
+        elif kind == LPAREN:
+            self.next_token()
+            expr = yield self.expression()
+            self.expect(RPAREN)
+            return expr
+
+        self.error(f"Hindi inaasahang token: {token}")
+
+    def function_call(self):
+        name = self.expect(TokenKind.IDENTIFIER).value
+        self.expect(LPAREN)
+        arguments = yield self.argument_list()
+        self.expect(RPAREN)
+        return self.nodes.FunctionCall(name, arguments)
+
+    def argument_list(self):
+        arguments = []
+
+        if self.current_token.kind == RPAREN:
+            return arguments
+
+        arguments.append((yield self.expression()))
+
+        while self.current_token.kind == COMMA:
+            self.next_token()
+            arguments.append((yield self.expression()))
+
+        return arguments
+
+
+# The recursive parser's tables, pointing at this parser's rules instead
+STATEMENT_PARSERS = {
+    kind: getattr(StackParser, parse.__name__)
+    for kind, parse in RECURSIVE_STATEMENT_PARSERS.items()
+}
+
+INFIX_OPERATORS = {
+    kind: (power, getattr(StackParser, handler.__name__))
+    for kind, (power, handler) in RECURSIVE_INFIX_OPERATORS.items()
+}
+
+PREFIX_OPERATORS = {
+    kind: (power, getattr(StackParser, handler.__name__))
+    for kind, (power, handler) in RECURSIVE_PREFIX_OPERATORS.items()
+}
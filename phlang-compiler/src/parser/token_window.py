@@ -0,0 +1,27 @@
+# Fixed-size ring buffer over a token iterator. Supports the indexing the
+# parser does on a token list as long as it never reaches further back than
+# `size` tokens: the current token, a peek ahead and the one-token backtrack
+# in Parser.primary().
+class TokenWindow:
+    def __init__(self, tokens, size=4):
+        self.tokens = iter(tokens)
+        self.size = size
+        self.buffer = [None] * size
+        # Absolute index of the oldest buffered token and one past the newest
+        self.start = 0
+        self.end = 0
+
+    def __getitem__(self, index):
+        if index < self.start:
+            raise LookupError(f"Ang token {index} ay wala na sa lookahead window")
+
+        while index >= self.end:
+            token = next(self.tokens, None)
+            if token is None:
+                raise IndexError(index)
+            self.buffer[self.end % self.size] = token
+            self.end += 1
+            if self.end - self.start > self.size:
+                self.start += 1
+
+        return self.buffer[index % self.size]
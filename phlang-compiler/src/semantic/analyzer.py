@@ -1,179 +1,187 @@
 from ..parser.ast import *
+from ..parser.ast_walker import ASTWalker
+from .symbol_table import SymbolTable, VariableSymbol, FunctionSymbol
 
-class SymbolTable:
-    def __init__(self, parent=None):
-        self.symbols = {}
-        self.parent = parent
-    
-    def define(self, name, symbol_type):
-        self.symbols[name] = symbol_type
-    
-    def lookup(self, name):
-        if name in self.symbols:
-            return self.symbols[name]
-        
-        if self.parent:
-            return self.parent.lookup(name)
-        
-        return None
-    
-    def is_local(self, name):
-        return name in self.symbols
-
-class Symbol:
-    def __init__(self, name, symbol_type):
-        self.name = name
-        self.type = symbol_type
+# Functions the generated code gets from Python, with the least and most
+# arguments each takes
+BUILTIN_FUNCTIONS = {
+    'saklaw': (1, 3),
+}
 
-class VariableSymbol(Symbol):
-    def __init__(self, name, var_type):
-        super().__init__(name, "variable")
-        self.var_type = var_type
-
-class FunctionSymbol(Symbol):
-    def __init__(self, name, return_type, parameters=None):
-        super().__init__(name, "function")
-        self.return_type = return_type
-        self.parameters = parameters or []
-
-class SemanticAnalyzer:
+class SemanticAnalyzer(ASTWalker):
     def __init__(self):
-        self.current_scope = SymbolTable()
+        self.symbols = SymbolTable()
         self.errors = []
         self.current_function = None
+        self.enclosing_functions = []
+        # Scope level of the body of each function being checked, the
+        # program's own scope first
+        self.function_levels = [0]
     
     def analyze(self, program):
         self.visit(program)
         return self.errors
     
     def enter_scope(self):
-        self.current_scope = SymbolTable(self.current_scope)
+        self.symbols.enter_scope()
     
     def exit_scope(self):
-        if self.current_scope.parent:
-            self.current_scope = self.current_scope.parent
+        self.symbols.exit_scope()
     
     def add_error(self, message):
         self.errors.append(message)
     
-    def visit(self, node):
-        method_name = f'visit_{type(node).__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-    
-    def generic_visit(self, node):
-        if hasattr(node, 'children'):
-            for child in node.children:
-                if child is not None:
-                    self.visit(child)
-    
     def visit_Program(self, node):
         for statement in node.statements:
-            self.visit(statement)
+            yield statement
     
-    def visit_VariableDeclaration(self, node):
+    # The checks below are shared with CheckedCodeGenerator, which runs them
+    # while generating code. Those returning a bool return False when the
+    # node's children are not to be checked any further.
+    def check_variable_declaration(self, node):
         var_name = node.var_name
         
-        if self.current_scope.is_local(var_name):
+        if self.symbols.is_local(var_name):
             self.add_error(f"Ang variable na '{var_name}' ay naideklara na sa kasalukuyang scope")
-            return
+            return False
         
         var_symbol = VariableSymbol(var_name, node.var_type)
-        self.current_scope.define(var_name, var_symbol)
-        
-        if node.initial_value:
-            self.visit(node.initial_value)
-    
-    def visit_Assignment(self, node):
+        self.symbols.define(var_name, var_symbol)
+        return True
+    
+    # PHLang needs no declarations: the first assignment to a name declares
+    # it. As in the generated Python, that declaration belongs to the whole
+    # function (or program) it is in, not to the kung or loop block, so the
+    # name can still be read after the block. Called once the value has
+    # been checked, so x = x + 1 still reports the x being read.
+    def check_assignment(self, node):
         var_name = node.var_name
         
-        symbol = self.current_scope.lookup(var_name)
-        if not symbol:
-            self.add_error(f"Ang variable na '{var_name}' ay hindi pa naideklara bago itinala")
-            return
-        
-        self.visit(node.value)
+        if not self.symbols.lookup(var_name):
+            self.symbols.define(var_name, VariableSymbol(var_name, None), self.function_levels[-1])
     
-    def visit_FunctionDefinition(self, node):
+    # Declares the function and opens its scope; end_function() closes it
+    def begin_function(self, node):
         func_name = node.name
         
-        if self.current_scope.is_local(func_name):
+        if self.symbols.is_local(func_name):
             self.add_error(f"Ang function na '{func_name}' ay nakatuklang muli")
-            return
+            return False
         
         func_symbol = FunctionSymbol(func_name, None, node.parameters)
-        self.current_scope.define(func_name, func_symbol)
+        self.symbols.define(func_name, func_symbol)
         
-        prev_function = self.current_function
+        self.enclosing_functions.append(self.current_function)
         self.current_function = func_symbol
         
         self.enter_scope()
+        self.function_levels.append(self.symbols.current_scope_level())
         
         for param in node.parameters:
             param_symbol = VariableSymbol(param, None)
-            self.current_scope.define(param, param_symbol)
-        
-        self.visit(node.body)
-        
-        self.current_function = prev_function
+            self.symbols.define(param, param_symbol)
+        return True
+    
+    def end_function(self):
+        self.current_function = self.enclosing_functions.pop()
+        self.function_levels.pop()
         self.exit_scope()
     
-    def visit_FunctionCall(self, node):
+    def check_function_call(self, node):
         func_name = node.name
         
-        symbol = self.current_scope.lookup(func_name)
+        symbol = self.symbols.lookup(func_name)
+        if not symbol and func_name in BUILTIN_FUNCTIONS:
+            least, most = BUILTIN_FUNCTIONS[func_name]
+            if not least <= len(node.arguments) <= most:
+                self.add_error(f"Ang function na '{func_name}' ay tinawag na may maling bilang ng mga argumento. Inaasahan: {least} hanggang {most}, nakuha: {len(node.arguments)}")
+            return True
+        
         if not symbol:
             self.add_error(f"Hindi naideklara ang function na '{func_name}'")
-            return
+            return False
         
         if symbol.type != "function":
             self.add_error(f"Ang '{func_name}' ay hindi isang function")
-            return
+            return False
         
         if len(node.arguments) != len(symbol.parameters):
             self.add_error(f"Ang function na '{func_name}' ay tinawag na may maling bilang ng mga argumento. Inaasahan: {len(symbol.parameters)}, nakuha: {len(node.arguments)}")
-        
-        for arg in node.arguments:
-            self.visit(arg)
+        return True
     
-    def visit_ReturnStatement(self, node):
+    def check_return(self, node):
         if not self.current_function:
             self.add_error("Hindi pinapayagan ang return statement sa labas ng function")
-            return
-        
-        if node.value:
-            self.visit(node.value)
+            return False
+        return True
+    
+    def check_identifier(self, node):
+        if not self.symbols.lookup(node.name):
+            self.add_error(f"Ang variable na '{node.name}' ay ginamit bago pa naideklara")
+    
+    def visit_VariableDeclaration(self, node):
+        if self.check_variable_declaration(node) and node.initial_value:
+            yield node.initial_value
+    
+    def visit_Assignment(self, node):
+        yield node.value
+        self.check_assignment(node)
+    
+    def visit_FunctionDefinition(self, node):
+        if self.begin_function(node):
+            yield node.body
+            self.end_function()
+    
+    def visit_FunctionCall(self, node):
+        if self.check_function_call(node):
+            for arg in node.arguments:
+                yield arg
+    
+    def visit_ReturnStatement(self, node):
+        if self.check_return(node) and node.value:
+            yield node.value
     
     def visit_IfStatement(self, node):
-        self.visit(node.condition)
+        yield node.condition
         
         self.enter_scope()
-        self.visit(node.then_block)
+        yield node.then_block
         self.exit_scope()
         
         if node.else_block:
             self.enter_scope()
-            self.visit(node.else_block)
+            yield node.else_block
             self.exit_scope()
     
     def visit_WhileLoop(self, node):
-        self.visit(node.condition)
+        yield node.condition
         
         self.enter_scope()
-        self.visit(node.body)
+        yield node.body
         self.exit_scope()
     
     def visit_ForLoop(self, node):
-        self.visit(node.iterable)
+        yield node.iterable
         
         self.enter_scope()
         
         var_symbol = VariableSymbol(node.variable, None)
-        self.current_scope.define(node.variable, var_symbol)
+        self.symbols.define(node.variable, var_symbol)
         
-        self.visit(node.body)
+        yield node.body
         self.exit_scope()
     
+    # The update runs after the body, outside the body's scope
+    def visit_CStyleForLoop(self, node):
+        yield node.init
+        yield node.condition
+        
+        self.enter_scope()
+        yield node.body
+        self.exit_scope()
+        
+        yield node.update
+    
     def visit_BreakStatement(self, node):
         pass
     
@@ -181,29 +189,29 @@ class SemanticAnalyzer:
         pass
     
     def visit_PrintStatement(self, node):
-        self.visit(node.expression)
+        yield node.expression
     
     def visit_TryExcept(self, node):
         self.enter_scope()
-        self.visit(node.try_block)
+        yield node.try_block
         self.exit_scope()
         
         self.enter_scope()
         exception_symbol = VariableSymbol(node.exception_var, None)
-        self.current_scope.define(node.exception_var, exception_symbol)
-        self.visit(node.except_block)
+        self.symbols.define(node.exception_var, exception_symbol)
+        yield node.except_block
         self.exit_scope()
     
     def visit_Block(self, node):
         for stmt in node.statements:
-            self.visit(stmt)
+            yield stmt
     
     def visit_BinaryOp(self, node):
-        self.visit(node.left)
-        self.visit(node.right)
+        yield node.left
+        yield node.right
     
     def visit_UnaryOp(self, node):
-        self.visit(node.operand)
+        yield node.operand
     
     def visit_Number(self, node):
         pass
@@ -212,5 +220,4 @@ class SemanticAnalyzer:
         pass
     
     def visit_Identifier(self, node):
-        if not self.current_scope.lookup(node.name):
-            self.add_error(f"Ang variable na '{node.name}' ay ginamit bago pa naideklara")
\ No newline at end of file
+        self.check_identifier(node)
\ No newline at end of file
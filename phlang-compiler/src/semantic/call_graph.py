@@ -0,0 +1,219 @@
+from ..parser.ast import (
+    Program, Block, FunctionDefinition, IfStatement, WhileLoop, ForLoop, TryExcept,
+    CStyleForLoop, copy_location
+)
+from ..parser.ast_walker import ASTWalker
+
+# Stands for the program's top-level code among the callers
+TOP_LEVEL = None
+
+
+# Which functions use which, by name. Calls and any other use of a name
+# (passing a function around as a value, say) both count, so a function is
+# only ever considered unused when nothing mentions it. Every `paraan` in the
+# tree is numbered in the order it is met; those numbers pick out single
+# definitions even when a name is defined more than once.
+class CallGraph(ASTWalker):
+    def __init__(self):
+        # Function name -> numbers of its definitions
+        self.definitions = {}
+        # Definition number -> its name, and how many definitions its body holds
+        self.names = []
+        self.nested = []
+        # Caller (a definition number, or TOP_LEVEL) -> names it uses
+        self.uses = {TOP_LEVEL: set()}
+        self.current = TOP_LEVEL
+
+    def build(self, program):
+        self.visit(program)
+        return self
+
+    def visit_FunctionDefinition(self, node):
+        number = len(self.names)
+        self.definitions.setdefault(node.name, []).append(number)
+        self.names.append(node.name)
+        self.nested.append(0)
+        self.uses[number] = set()
+
+        caller = self.current
+        self.current = number
+        yield node.body
+        self.current = caller
+        self.nested[number] = len(self.names) - number - 1
+
+    def visit_FunctionCall(self, node):
+        self.uses[self.current].add(node.name)
+        for arg in node.arguments:
+            yield arg
+
+    def visit_Identifier(self, node):
+        self.uses[self.current].add(node.name)
+
+    def callees(self, name):
+        names = set()
+        for number in self.definitions.get(name, ()):
+            names |= self.uses[number]
+        return names & self.definitions.keys()
+
+    # Numbers of the definitions the top-level code can end up running
+    def reachable(self):
+        reached = set()
+        seen = set()
+        pending = list(self.uses[TOP_LEVEL])
+        while pending:
+            name = pending.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            for number in self.definitions.get(name, ()):
+                reached.add(number)
+                pending.extend(self.uses[number])
+        return reached
+
+    def unreachable_functions(self):
+        reached = self.reachable()
+        return [name for number, name in enumerate(self.names) if number not in reached]
+
+    # Groups of functions that call each other round in a circle, including
+    # a function that calls itself; Tarjan's algorithm, without recursion
+    def cycles(self):
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+        for root in self.definitions:
+            if root in index:
+                continue
+            work = [(root, iter(sorted(self.callees(root))))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                name, callees = work[-1]
+                for callee in callees:
+                    if callee not in index:
+                        index[callee] = low[callee] = len(index)
+                        stack.append(callee)
+                        on_stack.add(callee)
+                        work.append((callee, iter(sorted(self.callees(callee)))))
+                        break
+                    if callee in on_stack:
+                        low[name] = min(low[name], index[callee])
+                else:
+                    work.pop()
+                    if work:
+                        caller = work[-1][0]
+                        low[caller] = min(low[caller], low[name])
+                    if low[name] == index[name]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == name:
+                                break
+                        if len(component) > 1 or name in self.callees(name):
+                            cycles.append(component[::-1])
+        return cycles
+
+    # A copy of the program without the definitions nothing reachable uses.
+    # Only the statements on the way to a dropped definition are rebuilt;
+    # the rest of the tree is shared with `program`.
+    def prune(self, program):
+        statements = FunctionPruner(self, self.reachable()).visit(program)
+        if statements is None:
+            return program
+        return Program(statements)
+
+
+# Rewrites the statements that can hold a definition, visiting them in the
+# same order as CallGraph so that definitions get the same numbers. Each
+# visitor returns the node's replacement, or None to keep the node.
+class FunctionPruner(ASTWalker):
+    def __init__(self, graph, reachable):
+        self.graph = graph
+        self.reachable = reachable
+        self.number = 0
+
+    def generic_visit(self, node):
+        return None
+
+    def prune_statements(self, statements, keep_one):
+        kept = []
+        changed = False
+        for statement in statements:
+            if isinstance(statement, FunctionDefinition) and self.number not in self.reachable:
+                self.number += self.graph.nested[self.number] + 1
+                changed = True
+                continue
+            replacement = yield statement
+            if replacement is not None:
+                statement = copy_location(replacement, statement)
+                changed = True
+            kept.append(statement)
+
+        if not changed:
+            return None
+        # Blocks of kung and subukan must not end up empty
+        if keep_one and not kept and statements:
+            return None
+        return kept
+
+    def visit_Program(self, node):
+        return (yield self.prune_statements(node.statements, False))
+
+    def visit_Block(self, node):
+        statements = yield self.prune_statements(node.statements, True)
+        if statements is None:
+            return None
+        return Block(statements)
+
+    def visit_FunctionDefinition(self, node):
+        self.number += 1
+        body = yield node.body
+        if body is None:
+            return None
+        return FunctionDefinition(node.name, node.parameters, body)
+
+    def visit_IfStatement(self, node):
+        then_block = yield node.then_block
+        else_block = None
+        if node.else_block:
+            else_block = yield node.else_block
+        if then_block is None and else_block is None:
+            return None
+        return IfStatement(
+            node.condition,
+            node.then_block if then_block is None else then_block,
+            node.else_block if else_block is None else else_block,
+        )
+
+    def visit_WhileLoop(self, node):
+        body = yield node.body
+        if body is None:
+            return None
+        return WhileLoop(node.condition, body)
+
+    def visit_ForLoop(self, node):
+        body = yield node.body
+        if body is None:
+            return None
+        return ForLoop(node.variable, node.iterable, body)
+
+    def visit_CStyleForLoop(self, node):
+        body = yield node.body
+        if body is None:
+            return None
+        return CStyleForLoop(node.init, node.condition, node.update, body)
+
+    def visit_TryExcept(self, node):
+        try_block = yield node.try_block
+        except_block = yield node.except_block
+        if try_block is None and except_block is None:
+            return None
+        return TryExcept(
+            node.try_block if try_block is None else try_block,
+            node.exception_var,
+            node.except_block if except_block is None else except_block,
+        )
@@ -0,0 +1,130 @@
+from ..parser.arena import ArenaView
+from ..parser.ast_walker import ASTWalker
+from .symbol_table import SymbolTable, VariableSymbol, FunctionSymbol
+
+
+# Works out once, before analysis or code generation, where each name in the
+# program was declared. Every Identifier, Assignment and FunctionCall gets
+#
+#     depth: how many scopes out from its own the declaration is (0 = same)
+#     slot:  the declaration's position among its scope's names
+#
+# or None for both when nothing visible declares the name. Scopes open and
+# close exactly where SemanticAnalyzer opens and closes them: one for the
+# program, one per function body, and one per block of kung, habang, para
+# and subukan/saluhin. As there, the first assignment to a name declares it
+# in the scope of the function (or program) it is in.
+#
+# The annotations live on the nodes, so the tree must not share nodes
+# between places, and arena views cannot hold them at all. resolve() raises
+# ValueError for an arena, and for a tree that turns out to have a node in
+# two places. Parsing with hash_cons never shares the nodes it annotates.
+class Resolver(ASTWalker):
+    def __init__(self):
+        self.symbols = SymbolTable()
+        # Scope level of the body of each function being resolved
+        self.function_levels = [0]
+        # Ids of the nodes annotated so far
+        self.annotated = set()
+
+    def resolve(self, program):
+        if isinstance(program, ArenaView):
+            raise ValueError("Hindi malalagyan ng Resolver ng tala ang mga node ng arena")
+        self.annotated = set()
+        self.visit(program)
+        return program
+
+    def declare(self, name, symbol_class=VariableSymbol):
+        # Declaring a name again keeps its first slot
+        if not self.symbols.is_local(name):
+            self.symbols.define(name, symbol_class(name))
+
+    def annotate(self, node, name):
+        if id(node) in self.annotated:
+            raise ValueError(f"Ang node ng '{name}' ay nasa higit sa isang lugar ng puno")
+        self.annotated.add(id(node))
+        found = self.symbols.resolve(name)
+        if found is None:
+            node.depth = node.slot = None
+        else:
+            node.depth, symbol = found
+            node.slot = symbol.slot
+
+    def visit_VariableDeclaration(self, node):
+        self.declare(node.var_name)
+        if node.initial_value:
+            yield node.initial_value
+
+    # The first assignment to a name declares it, as in SemanticAnalyzer,
+    # once the value has been resolved
+    def visit_Assignment(self, node):
+        yield node.value
+        if self.symbols.lookup(node.var_name) is None:
+            self.symbols.define(node.var_name, VariableSymbol(node.var_name), self.function_levels[-1])
+        self.annotate(node, node.var_name)
+
+    def visit_FunctionDefinition(self, node):
+        self.declare(node.name, FunctionSymbol)
+
+        self.symbols.enter_scope()
+        self.function_levels.append(self.symbols.current_scope_level())
+        for param in node.parameters:
+            self.declare(param)
+        yield node.body
+        self.function_levels.pop()
+        self.symbols.exit_scope()
+
+    def visit_FunctionCall(self, node):
+        self.annotate(node, node.name)
+        for arg in node.arguments:
+            yield arg
+
+    def visit_IfStatement(self, node):
+        yield node.condition
+
+        self.symbols.enter_scope()
+        yield node.then_block
+        self.symbols.exit_scope()
+
+        if node.else_block:
+            self.symbols.enter_scope()
+            yield node.else_block
+            self.symbols.exit_scope()
+
+    def visit_WhileLoop(self, node):
+        yield node.condition
+
+        self.symbols.enter_scope()
+        yield node.body
+        self.symbols.exit_scope()
+
+    def visit_ForLoop(self, node):
+        yield node.iterable
+
+        self.symbols.enter_scope()
+        self.declare(node.variable)
+        yield node.body
+        self.symbols.exit_scope()
+
+    def visit_CStyleForLoop(self, node):
+        yield node.init
+        yield node.condition
+
+        self.symbols.enter_scope()
+        yield node.body
+        self.symbols.exit_scope()
+
+        yield node.update
+
+    def visit_TryExcept(self, node):
+        self.symbols.enter_scope()
+        yield node.try_block
+        self.symbols.exit_scope()
+
+        self.symbols.enter_scope()
+        self.declare(node.exception_var)
+        yield node.except_block
+        self.symbols.exit_scope()
+
+    def visit_Identifier(self, node):
+        self.annotate(node, node.name)
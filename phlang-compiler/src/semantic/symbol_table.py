@@ -1,64 +1,127 @@
+# Nested scopes kept as one stack of symbols per name rather than one dict
+# per scope. The visible declaration of a name is always the top of its
+# stack, so a lookup is a single dict probe however deep the nesting is.
+# Each scope keeps the names it declared; leaving the scope pops exactly
+# those, so entering and leaving cost nothing beyond the scope's own names.
+#
+# define() records the scope level and the position within that scope on
+# the symbol itself. It declares in the innermost scope unless given the
+# level of an outer one that is still open.
 class SymbolTable:
     def __init__(self):
         self.symbols = {}
-        self.scopes = [{}]
-    
+        # Names declared in each open scope, innermost last
+        self.scopes = [[]]
+
     def enter_scope(self):
-        self.scopes.append({})
-    
+        self.scopes.append([])
+
     def exit_scope(self):
         if len(self.scopes) > 1:
-            self.scopes.pop()
-    
-    def define(self, name, symbol):
-        self.scopes[-1][name] = symbol
+            symbols = self.symbols
+            for name in self.scopes.pop():
+                stack = symbols[name]
+                stack.pop()
+                if not stack:
+                    del symbols[name]
+
+    def define(self, name, symbol, level=None):
+        if level is None:
+            level = len(self.scopes) - 1
+        symbol.level = level
+        stack = self.symbols.get(name)
+        if stack is None:
+            stack = self.symbols[name] = []
+        # Declarations of the name in scopes inside `level` stay above it
+        index = len(stack)
+        while index and stack[index - 1].level > level:
+            index -= 1
+        if index and stack[index - 1].level == level:
+            # Declared again in the same scope: replaces the old symbol
+            symbol.slot = stack[index - 1].slot
+            stack[index - 1] = symbol
+            return symbol
+
+        scope = self.scopes[level]
+        symbol.slot = len(scope)
+        scope.append(name)
+        stack.insert(index, symbol)
         return symbol
-    
+
     def lookup(self, name):
-        for scope in reversed(self.scopes):
-            if name in scope:
-                return scope[name]
-        return None
-    
+        stack = self.symbols.get(name)
+        if stack is None:
+            return None
+        return stack[-1]
+
+    # (how many scopes out, symbol) for the nearest declaration of name
+    def resolve(self, name):
+        stack = self.symbols.get(name)
+        if stack is None:
+            return None
+        symbol = stack[-1]
+        return len(self.scopes) - 1 - symbol.level, symbol
+
     def lookup_current_scope(self, name):
-        return self.scopes[-1].get(name)
-    
+        stack = self.symbols.get(name)
+        if stack is None or stack[-1].level != len(self.scopes) - 1:
+            return None
+        return stack[-1]
+
+    def is_local(self, name):
+        return self.lookup_current_scope(name) is not None
+
     def is_global_scope(self):
         return len(self.scopes) == 1
-    
+
     def current_scope_level(self):
         return len(self.scopes) - 1
-    
+
     def __str__(self):
         result = "Symbol Table:\n"
-        for i, scope in enumerate(self.scopes):
-            result += f"Scope {i}: {scope}\n"
+        for level, names in enumerate(self.scopes):
+            scope = {}
+            for name in names:
+                for symbol in self.symbols[name]:
+                    if symbol.level == level:
+                        scope[name] = symbol
+            result += f"Scope {level}: {scope}\n"
         return result
 
 class Symbol:
-    def __init__(self, name):
+    __slots__ = ('name', 'type', 'level', 'slot')
+
+    def __init__(self, name, symbol_type):
         self.name = name
+        self.type = symbol_type
+        # Filled in by SymbolTable.define()
+        self.level = None
+        self.slot = None
 
 class VariableSymbol(Symbol):
+    __slots__ = ('var_type',)
+
     def __init__(self, name, var_type=None):
-        super().__init__(name)
+        super().__init__(name, "variable")
         self.var_type = var_type
-    
+
     def __str__(self):
         return f"Variable({self.name}, {self.var_type})"
-    
+
     def __repr__(self):
         return self.__str__()
 
 class FunctionSymbol(Symbol):
-    def __init__(self, name, params=None, return_type=None):
-        super().__init__(name)
-        self.params = params or []
+    __slots__ = ('return_type', 'parameters')
+
+    def __init__(self, name, return_type=None, parameters=None):
+        super().__init__(name, "function")
         self.return_type = return_type
-    
+        self.parameters = parameters or []
+
     def __str__(self):
-        params_str = ", ".join([str(p) for p in self.params])
+        params_str = ", ".join([str(p) for p in self.parameters])
         return f"Function({self.name}, params=[{params_str}], returns={self.return_type})"
-    
+
     def __repr__(self):
-        return self.__str__()
\ No newline at end of file
+        return self.__str__()
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.semantic.analyzer import SemanticAnalyzer
+from src.codegen.checked_generator import CheckedCodeGenerator
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'examples')
+
+
+def parse(source):
+    return Parser(create_lexer(source).tokenize()).parse()
+
+
+def test_first_assignment_declares():
+    with open(os.path.join(EXAMPLES, 'whileloop.ph')) as file:
+        source = file.read()
+    assert SemanticAnalyzer().analyze(parse(source)) == []
+
+
+def test_assignment_value_is_checked_before_declaring():
+    errors = SemanticAnalyzer().analyze(parse('x = x + 1\n'))
+    assert errors == ["Ang variable na 'x' ay ginamit bago pa naideklara"]
+
+
+@pytest.mark.parametrize('source', [
+    'kung 1 {\n    y = 1\n}\nidikta(y)\n',
+    'para i = 0; i < 3; i = i + 1 {\n    z = i\n}\nidikta(z)\n',
+    'habang tama {\n    kung tama {\n        w = 1\n    }\n    itigil\n}\nidikta(w)\n',
+    'paraan f() {\n    kung tama {\n        v = 1\n    }\n    bumalik v\n}\nidikta(f())\n',
+    'para i sa saklaw(3) {\n    idikta(i)\n}\n',
+    'para i sa saklaw(1, 10, 2) {\n    idikta(i)\n}\n',
+])
+def test_valid_programs_have_no_warnings(source):
+    assert SemanticAnalyzer().analyze(parse(source)) == []
+
+
+# An assignment inside a function declares a name of that function only
+def test_assignment_in_function_stays_in_it():
+    source = 'paraan f() {\n    kung tama {\n        v = 1\n    }\n    bumalik v\n}\nidikta(v)\n'
+    errors = SemanticAnalyzer().analyze(parse(source))
+    assert errors == ["Ang variable na 'v' ay ginamit bago pa naideklara"]
+
+
+def test_builtin_argument_count():
+    errors = SemanticAnalyzer().analyze(parse('idikta(saklaw())\n'))
+    assert errors == ["Ang function na 'saklaw' ay tinawag na may maling bilang ng mga argumento. Inaasahan: 1 hanggang 3, nakuha: 0"]
+
+
+@pytest.mark.parametrize('source', [
+    'x = 10\nhabang x != 0 {\n    idikta(x)\n    x = x - 1\n}\n',
+    'x = x + 1\nidikta(y)\n',
+    'paraan f(a) {\n    b = a\n    bumalik b\n}\nidikta(f(1, 2))\nidikta(g(1))\n',
+    'bumalik 1\npara i = 0; i < 3; i = i + 1 {\n    z = i\n}\nidikta(z)\n',
+    'paraan f() {\n    kung tama {\n        v = 1\n    }\n    bumalik v\n}\nidikta(v)\npara i sa saklaw(2) {\n    idikta(saklaw())\n}\n',
+])
+def test_checked_generator_matches_analyzer(source):
+    generator = CheckedCodeGenerator(parse(source))
+    generator.generate()
+    assert generator.errors == SemanticAnalyzer().analyze(parse(source))
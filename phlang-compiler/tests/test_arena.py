@@ -0,0 +1,75 @@
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.stack_parser import StackParser
+from src.parser.arena import ASTArena, arena_from_bytes
+from src.codegen.generator import CodeGenerator
+
+SOURCE = '''paraan f(a, b) {
+    kung a > b {
+        bumalik [a, b, "c"]
+    } edi {
+        bumalik a[0] + -b
+    }
+}
+para i sa saklaw(3) {
+    idikta(f(i, 1.0) + "!")
+}
+subukan {
+    x = 1 / 0
+} saluhin (e) {
+    idikta(e)
+}
+'''
+
+
+# Every arena node has an offset, where only statements of an object tree
+# do, so offsets are compared for statements alone
+def layout(program):
+    found = []
+    pending = [program]
+    while pending:
+        node = pending.pop()
+        found.append((node.__class__.__name__, repr(node)))
+        pending.extend(reversed(node.children))
+    return found
+
+
+def statement_offsets(program):
+    return [statement.offset for statement in program.statements]
+
+
+def arena_program(parser, source):
+    arena = ASTArena()
+    parser(create_lexer(source).tokenize(), arena=arena).parse()
+    return arena
+
+
+@pytest.mark.parametrize('parser', [Parser, StackParser])
+def test_same_tree_as_objects(parser):
+    expected = Parser(create_lexer(SOURCE).tokenize()).parse()
+    arena = arena_program(parser, SOURCE)
+    program = arena.node(arena.root)
+    assert layout(program) == layout(expected)
+    assert statement_offsets(program) == statement_offsets(expected)
+    assert CodeGenerator(program).generate() == CodeGenerator(expected).generate()
+
+
+def test_bytes_round_trip():
+    arena = arena_program(Parser, SOURCE)
+    loaded = arena_from_bytes(arena.to_bytes())
+    assert len(loaded) == len(arena)
+    assert layout(loaded.node(loaded.root)) == layout(arena.node(arena.root))
+
+
+def test_one_and_one_point_zero_stay_apart():
+    arena = arena_program(Parser, 'idikta(1)\nidikta(1.0)\n')
+    values = [statement.expression.value for statement in arena.node(arena.root).statements]
+    assert [value.__class__ for value in values] == [int, float]
+
+
+def test_truncated_bytes_are_rejected():
+    data = arena_program(Parser, SOURCE).to_bytes()
+    with pytest.raises((ValueError, EOFError, TypeError)):
+        arena_from_bytes(data[:len(data) // 2])
@@ -0,0 +1,63 @@
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.ast import (
+    NODE_CLASSES, VALUE, NODE, NODES, BinaryOp, Number, Identifier, IfStatement, Block,
+    PrintStatement, FunctionCall, node_fields,
+)
+
+SOURCE = '''paraan f(a, b) {
+    kung a > b {
+        bumalik [a, b]
+    } edi {
+        bumalik a[0] + -b
+    }
+}
+subukan {
+    idikta(f(1, 2))
+} saluhin (e) {
+    idikta(e)
+}
+'''
+
+
+def parse(source):
+    return Parser(create_lexer(source).tokenize()).parse()
+
+
+def nodes(program):
+    found = []
+    pending = [program]
+    while pending:
+        node = pending.pop()
+        found.append(node)
+        pending.extend(reversed(node.children))
+    return found
+
+
+@pytest.mark.parametrize('cls', NODE_CLASSES)
+def test_fields_are_slots(cls):
+    fields = node_fields(cls)
+    assert {name for field, name in fields if field != VALUE} == set(cls.child_fields)
+    assert {name for field, name in fields if field == NODES} == set(cls.list_fields)
+    for base in cls.__mro__[:-1]:
+        assert '__slots__' in base.__dict__
+
+
+def test_nodes_have_no_dict():
+    for node in nodes(parse(SOURCE)):
+        assert not hasattr(node, '__dict__')
+        with pytest.raises(AttributeError):
+            node.not_a_field = 1
+
+
+def test_children_follow_child_fields():
+    node = BinaryOp(Number(1), '+', Identifier('x'))
+    assert node.children == [node.left, node.right]
+    call = FunctionCall('f', [Number(1), Number(2)])
+    assert call.children == call.arguments
+    # Missing optional children are left out
+    statement = IfStatement(Identifier('x'), Block([PrintStatement(Number(1))]), None)
+    assert statement.children == [statement.condition, statement.then_block]
+
@@ -0,0 +1,54 @@
+import pytest
+
+from src.parser import ast_cache
+from src.parser.ast_cache import ASTCache
+from src.parser.ast import IfStatement, Program
+from src.codegen.ast_generator import PythonASTGenerator
+from src.error.error_handler import CompilerError
+
+DEPTH = 1500
+NESTED = 'x = 1\nx = x + 1\n' + 'kung x == 2 {\n' * DEPTH + 'idikta(x)\n' + '}\n' * DEPTH
+
+
+def nesting(node):
+    depth = 0
+    while isinstance(node, IfStatement):
+        depth += 1
+        node = node.then_block.statements[0]
+    return depth
+
+
+def test_hit_gives_same_tree(tmp_path):
+    source = 'x = 1\nkung x > 0 {\n    idikta("oo")\n}\n'
+    cache = ASTCache(str(tmp_path))
+    first = cache.parse(source)
+    second = cache.parse(source)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert isinstance(second, Program)
+    assert len(second.statements) == len(first.statements) == 2
+    assert second.statements[1].offset == first.statements[1].offset
+
+
+def test_deep_nesting_parses(tmp_path):
+    program = ASTCache(str(tmp_path)).parse(NESTED)
+    assert len(program.statements) == 3
+    assert nesting(program.statements[2]) == DEPTH
+
+
+def test_deep_nesting_is_a_compiler_error(tmp_path):
+    program = ASTCache(str(tmp_path)).parse(NESTED)
+    with pytest.raises(CompilerError):
+        PythonASTGenerator(program, NESTED).compile()
+
+
+def test_key_follows_parser_sources(tmp_path, monkeypatch):
+    directory = tmp_path / 'src'
+    for package in ('lexer', 'parser'):
+        (directory / package).mkdir(parents=True)
+        (directory / package / 'module.py').write_text('x = 1\n')
+    monkeypatch.setattr(ast_cache, 'SOURCE_ROOT', str(directory))
+    before = ast_cache.source_fingerprint('lexer', 'parser')
+    assert ast_cache.source_fingerprint('lexer', 'parser') == before
+
+    (directory / 'parser' / 'module.py').write_text('x = 2\n')
+    assert ast_cache.source_fingerprint('lexer', 'parser') != before
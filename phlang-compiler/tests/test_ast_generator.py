@@ -0,0 +1,69 @@
+import contextlib
+import io
+
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.stack_parser import StackParser
+from src.codegen.generator import CodeGenerator
+from src.codegen.ast_generator import PythonASTGenerator
+
+
+def parse(source, parser_class=Parser):
+    return parser_class(create_lexer(source).tokenize()).parse()
+
+
+def run(code):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(code, {})
+    return output.getvalue()
+
+
+# The program's output under each backend, text first
+def outputs(source, parser_class=Parser):
+    text = compile(CodeGenerator(parse(source, parser_class)).generate(), '<text>', 'exec')
+    tree = PythonASTGenerator(parse(source, parser_class), source).compile()
+    return run(text), run(tree)
+
+
+PROGRAMS = [
+    'x = 3\nkung hindi x == 5 {\n    idikta("ne")\n} edi {\n    idikta("eq")\n}\n',
+    'x = 0\nkung hindi x at 1 {\n    idikta("oo")\n} edi {\n    idikta("hindi")\n}\n',
+    'x = 2\ny = hindi x < 1 o x > 5\nidikta(y)\n',
+    'x = 4\nidikta("x = " + x + "!")\nidikta("{" + (x * 2 - 1) + "}")\n',
+    'x = 1\nhabang x < 20 {\n    kung x % 3 == 0 {\n        x = x + 1\n        ituloy\n    }\n    idikta(x)\n    x = x * 2 + 1\n}\n',
+    'para i = 0; i < 5; i = i + 2 {\n    idikta(i)\n}\n',
+    'paraan f(a, b) {\n    bumalik a * b + 1\n}\nidikta(f(3, 4))\n',
+]
+
+
+@pytest.mark.parametrize('source', PROGRAMS, ids=range(len(PROGRAMS)))
+def test_backends_agree(source):
+    text, tree = outputs(source)
+    assert text == tree
+
+
+def test_hindi_reads_as_in_text_backend():
+    source = PROGRAMS[0]
+    assert outputs(source) == ("ne\n", "ne\n")
+
+
+def test_hindi_on_right_of_comparison_is_rejected_by_both():
+    source = 'x = 3\nidikta(5 == hindi x)\n'
+    with pytest.raises(SyntaxError):
+        compile(CodeGenerator(parse(source)).generate(), '<text>', 'exec')
+    with pytest.raises(SyntaxError):
+        PythonASTGenerator(parse(source), source).compile()
+
+
+@pytest.mark.parametrize('x, chain', [
+    ('1', ' - '.join(['x'] * 5000)),
+    ('"1"', ' + '.join(['"a" + x'] * 2500)),
+    ('1', ' at '.join(['x'] * 5000)),
+], ids=['difference', 'join', 'at'])
+def test_long_chains_compile(x, chain):
+    source = f'x = {x}\nidikta({chain})\n'
+    text, tree = outputs(source, StackParser)
+    assert text == tree
@@ -0,0 +1,90 @@
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.ast import Expression, BinaryOp, Number, Identifier
+from src.parser.ast_walker import ASTWalker
+from src.codegen.generator import CodeGenerator
+
+
+def parse(source):
+    return Parser(create_lexer(source).tokenize()).parse()
+
+
+# A node class no pass has a method for
+class Note(Expression):
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class Names(ASTWalker):
+    def __init__(self):
+        self.names = []
+
+    def visit_Identifier(self, node):
+        self.names.append(node.name)
+
+
+class Leaves(ASTWalker):
+    def visit_Expression(self, node):
+        return 'expression'
+
+    def visit_BinaryOp(self, node):
+        left = yield node.left
+        right = yield node.right
+        return [left, right]
+
+
+def test_generic_visit_reaches_every_node():
+    walker = Names()
+    walker.visit(parse('x = a + b\nkung c {\n    idikta(f(d))\n}\n'))
+    assert walker.names == ['a', 'b', 'c', 'd']
+
+
+def test_nearest_base_class_handles_a_node():
+    assert Leaves().visit(BinaryOp(Number(1), '+', Identifier('x'))) == ['expression', 'expression']
+    assert Leaves.visitors[Number] is Leaves.visit_Expression
+
+
+def test_deep_tree_does_not_recurse():
+    node = Number(0)
+    for _ in range(20000):
+        node = BinaryOp(node, '+', Number(1))
+    walker = Names()
+    walker.visit(node)
+    assert walker.names == []
+
+
+def test_registered_function_is_used():
+    class Pass(Names):
+        pass
+
+    walker = Pass()
+    walker.visit(BinaryOp(Note('a'), '+', Identifier('x')))
+    assert walker.names == ['x']
+
+    Pass.register(Note, lambda walker, node: walker.names.append(node.text))
+    walker = Pass()
+    walker.visit(BinaryOp(Note('a'), '+', Identifier('x')))
+    assert walker.names == ['a', 'x']
+    # The class it was registered on is left alone
+    assert Names.visitors.get(Note) is not Pass.visitors[Note]
+
+
+def test_subclasses_use_registered_functions():
+    class Generator(CodeGenerator):
+        pass
+
+    Generator.register(Note, lambda generator, node: repr(node.text), 'generate_')
+
+    class Sub(Generator):
+        pass
+
+    class Override(Generator):
+        def generate_Note(self, node):
+            return repr(node.text.upper())
+
+    for generator_class, expected in [(Generator, "print('a')"), (Sub, "print('a')"), (Override, "print('A')")]:
+        program = parse('idikta(1)\n')
+        program.statements[0].expression = Note('a')
+        assert generator_class(program).generate().strip().splitlines()[-1] == expected
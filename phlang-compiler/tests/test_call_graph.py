@@ -0,0 +1,84 @@
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.arena import ASTArena
+from src.semantic.call_graph import CallGraph
+from src.codegen.generator import CodeGenerator
+
+SOURCE = '''paraan used(n) {
+    bumalik helper(n) + 1
+}
+paraan helper(n) {
+    bumalik n
+}
+paraan unused(n) {
+    paraan inner(m) {
+        bumalik m
+    }
+    bumalik ping(n)
+}
+paraan ping(n) {
+    bumalik pong(n)
+}
+paraan pong(n) {
+    bumalik ping(n)
+}
+paraan passed(n) {
+    bumalik n
+}
+paraan twice(n) {
+    bumalik 1
+}
+paraan twice(n) {
+    bumalik 2
+}
+kung tama {
+    paraan nested(n) {
+        bumalik n
+    }
+}
+f = passed
+idikta(used(1))
+'''
+
+
+def parse(source):
+    return Parser(create_lexer(source).tokenize()).parse()
+
+
+def test_unreachable_functions():
+    graph = CallGraph().build(parse(SOURCE))
+    assert graph.unreachable_functions() == ['unused', 'inner', 'ping', 'pong', 'twice', 'twice', 'nested']
+    assert graph.callees('used') == {'helper'}
+    assert graph.callees('unused') == {'ping'}
+
+
+def test_cycles():
+    graph = CallGraph().build(parse('paraan a() {\n    bumalik a()\n}\n' + SOURCE))
+    assert sorted(sorted(cycle) for cycle in graph.cycles()) == [['a'], ['ping', 'pong']]
+
+
+def test_prune():
+    program = parse(SOURCE)
+    original = CodeGenerator(program).generate()
+    pruned = CallGraph().build(program).prune(program)
+    names = [statement.name for statement in pruned.statements if hasattr(statement, 'name')]
+    assert names == ['used', 'helper', 'passed']
+    # The original tree is left as it was, and what is kept is shared
+    assert CodeGenerator(program).generate() == original
+    assert pruned.statements[0] is program.statements[0]
+
+
+def test_nothing_to_prune():
+    program = parse('paraan f() {\n    bumalik 1\n}\nidikta(f())\n')
+    assert CallGraph().build(program).prune(program) is program
+
+
+def test_arena_tree():
+    arena = ASTArena()
+    Parser(create_lexer(SOURCE).tokenize(), arena=arena).parse()
+    program = arena.node(arena.root)
+    graph = CallGraph().build(program)
+    assert graph.unreachable_functions() == CallGraph().build(parse(SOURCE)).unreachable_functions()
+    expected = parse(SOURCE)
+    expected = CallGraph().build(expected).prune(expected)
+    assert CodeGenerator(graph.prune(program)).generate() == CodeGenerator(expected).generate()
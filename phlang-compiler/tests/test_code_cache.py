@@ -0,0 +1,20 @@
+from src.codegen.code_cache import CodeCache
+
+SOURCE = 'idikta("oo")\n'
+
+
+def test_round_trip(tmp_path):
+    cache = CodeCache(str(tmp_path))
+    code = compile('print("oo")', 'a.ph', 'exec')
+    assert cache.get('a.ph', SOURCE) is None
+    cache.put('a.ph', SOURCE, code, ['babala'])
+    assert cache.get('a.ph', SOURCE) == (code, ['babala'])
+    assert cache.get('a.ph', SOURCE + '\n') is None
+
+
+def test_pipeline_is_part_of_the_key(tmp_path):
+    code = compile('print("oo")', 'a.ph', 'exec')
+    CodeCache(str(tmp_path)).put('a.ph', SOURCE, code, [])
+    assert CodeCache(str(tmp_path), fold=False).get('a.ph', SOURCE) is None
+    assert CodeCache(str(tmp_path), check=False).get('a.ph', SOURCE) is None
+    assert CodeCache(str(tmp_path)).get('a.ph', SOURCE) is not None
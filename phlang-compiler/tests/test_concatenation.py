@@ -0,0 +1,64 @@
+import contextlib
+import io
+
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.codegen.generator import CodeGenerator
+from src.codegen.ast_generator import PythonASTGenerator
+
+
+def parse(source):
+    return Parser(create_lexer(source).tokenize()).parse()
+
+
+def expression_code(source):
+    return CodeGenerator(parse(source)).generate().strip().splitlines()[-1]
+
+
+def outputs(source):
+    results = []
+    for code in (compile(CodeGenerator(parse(source)).generate(), '<text>', 'exec'),
+                 PythonASTGenerator(parse(source), source).compile()):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            exec(code, {})
+        results.append(output.getvalue())
+    return results
+
+
+def test_chain_is_one_fstring():
+    assert expression_code('x = 1\nidikta("a" + x + "b")\n') == 'print(f"a{x!s}b")'
+    assert expression_code('x = 1\nidikta("a" + (x + "b") + "c")\n') == 'print(f"a{x!s}bc")'
+
+
+# Only a + with a String literal on one side joins; one between two other
+# operands stays an addition, even when the left one is a join
+def test_addition_after_join_is_not_a_join():
+    assert expression_code('x = 1\nidikta("a" + x + x)\n') == 'print((f"a{x!s}" + x))'
+
+
+def test_braces_in_literals_are_escaped():
+    assert expression_code('x = 1\nidikta("{" + x + "}")\n') == 'print(f"{{{x!s}}}")'
+
+
+def test_operand_with_quotes_falls_back_to_join():
+    code = expression_code('paraan f(s) {\n    bumalik s\n}\nidikta("a" + f("b") + "c")\n')
+    assert code.startswith("print(''.join(")
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('x = 1\nidikta("a" + (x + "b") + "c")\n', 'a1bc\n'),
+    ('x = "y"\nidikta("a" + x + "b" + x)\n', 'ayby\n'),
+    ('x = 2\nidikta("{" + x + "}")\n', '{2}\n'),
+    ('x = 2.5\nidikta(x + " at " + ("" + (x * 2)) + "!")\n', '2.5 at 5.0!\n'),
+    ('idikta("a" + ("b" + "c") + "d")\n', 'abcd\n'),
+    ('x = 3\nidikta("x" + (x + 1) + ("" + x))\n', 'x43\n'),
+    ('x = 1\nidikta("hindi: " + hindi x)\n', 'hindi: False\n'),
+    ('s = "q\\"uote\\\\"\nidikta("[" + s + "]" + "\\n#")\n', '[q"uote\\]\n#\n'),
+    ('paraan f(s) {\n    bumalik s + "!"\n}\nidikta("a" + f("b") + "c")\n', 'ab!c\n'),
+    ('x = [1, 2]\nidikta("x = " + x + (", x[0] = " + x[0]))\n', 'x = [1, 2], x[0] = 1\n'),
+])
+def test_output(source, expected):
+    assert outputs(source) == [expected, expected]
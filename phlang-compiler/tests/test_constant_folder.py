@@ -0,0 +1,91 @@
+import contextlib
+import io
+
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.stack_parser import StackParser
+from src.parser.ast import Number, String, IfStatement, PrintStatement, WhileLoop
+from src.optimizer.constant_folder import ConstantFolder
+from src.codegen.generator import CodeGenerator
+
+
+def parse(source, parser_class=Parser):
+    return parser_class(create_lexer(source).tokenize()).parse()
+
+
+def fold(source):
+    return ConstantFolder().fold(parse(source))
+
+
+def run(program):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(compile(CodeGenerator(program).generate(), '<phlang>', 'exec'), {})
+    return output.getvalue()
+
+
+@pytest.mark.parametrize('parser_class', [Parser, StackParser])
+def test_boolean_literals(parser_class):
+    statements = parse('x = tama\ny = mali\n', parser_class).statements
+    assert [statement.value.__class__ for statement in statements] == [Number, Number]
+    assert [statement.value.value for statement in statements] == [True, False]
+
+
+def test_arithmetic_folds():
+    statement = fold('idikta(2 * 3 + 1)\n').statements[0]
+    assert isinstance(statement.expression, Number)
+    assert statement.expression.value == 7
+
+
+def test_join_folds_to_string():
+    statement = fold('idikta("a" + 1 + "b")\n').statements[0]
+    assert isinstance(statement.expression, String)
+    assert statement.expression.value == 'a1b'
+
+
+def test_division_by_zero_is_left_for_run_time():
+    statement = fold('idikta(1 / 0)\n').statements[0]
+    assert not isinstance(statement.expression, Number)
+
+
+def test_constant_kung_keeps_the_branch_taken():
+    program = fold('kung tama {\n    idikta(1)\n} edi {\n    idikta(2)\n}\n')
+    assert not any(isinstance(statement, IfStatement) for statement in program.statements)
+    assert run(program) == '1\n'
+
+
+def test_false_habang_is_dropped():
+    program = fold('habang mali {\n    idikta(1)\n}\nidikta(2)\n')
+    assert not any(isinstance(statement, WhileLoop) for statement in program.statements)
+    assert run(program) == '2\n'
+
+
+def test_single_assignment_is_propagated():
+    program = fold('n = 7\nkung n > 5 {\n    idikta("malaki")\n} edi {\n    idikta("maliit")\n}\n')
+    assert [statement.__class__ for statement in program.statements][-1] is not IfStatement
+    assert run(program) == 'malaki\n'
+
+
+def test_reassigned_name_is_not_propagated():
+    program = fold('n = 7\nn = 1\nkung n > 5 {\n    idikta("malaki")\n}\n')
+    assert isinstance(program.statements[-1], IfStatement)
+
+
+def test_branch_binding_a_name_in_a_function_is_kept():
+    source = 'x = 1\nparaan f() {\n    kung mali {\n        x = 2\n    }\n    bumalik x\n}\nidikta(f())\n'
+    with pytest.raises(UnboundLocalError):
+        run(parse(source))
+    with pytest.raises(UnboundLocalError):
+        run(ConstantFolder().fold(parse(source)))
+
+
+@pytest.mark.parametrize('source', [
+    'x = 3\ny = x * 2\nidikta(y + x)\n',
+    'x = 0\nhabang x < 5 {\n    kung x % 2 == 0 {\n        idikta(x)\n    }\n    x = x + 1\n}\n',
+    'a = 4\nidikta("<" + (a + 2) + ">")\nidikta("<" + hindi a + ">")\n',
+    'i = 10\npara i = 0; i < 3; i = i + 1 {\n    idikta(i)\n}\nidikta(i)\n',
+])
+def test_folding_keeps_output(source):
+    assert run(fold(source)) == run(parse(source))
@@ -0,0 +1,41 @@
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.stack_parser import StackParser
+from src.parser.arena import ASTArena
+from src.codegen.generator import CodeGenerator
+
+SOURCE = 'x = [1, "a"] + -2\ny = [1, "a"] + -2\nz = [1.0, "a"] + -2\nidikta(x + f(x))\nidikta(x + f(x))\n'
+
+
+def statements(parser, **options):
+    return parser(create_lexer(SOURCE).tokenize(), **options).parse().statements
+
+
+def test_equal_expressions_are_one_node():
+    for parser in (Parser, StackParser):
+        x, y, z, first, second = statements(parser, hash_cons=True)
+        assert x.value is y.value
+        assert x.value.right is z.value.right
+        # 1 and 1.0 are equal but are not the same literal
+        assert x.value.left is not z.value.left
+        assert x is not y
+        # Names are annotated one occurrence at a time, so are never shared
+        assert first.expression is not second.expression
+        assert first.expression.left is not second.expression.left
+        assert first.expression.right is not second.expression.right
+
+
+def test_same_code_as_without():
+    program = Parser(create_lexer(SOURCE).tokenize(), hash_cons=True).parse()
+    expected = Parser(create_lexer(SOURCE).tokenize()).parse()
+    assert CodeGenerator(program).generate() == CodeGenerator(expected).generate()
+
+
+def test_arena_shares_ids():
+    arena = ASTArena()
+    parser = Parser(create_lexer(SOURCE).tokenize(), arena=arena, hash_cons=True)
+    parser.parse()
+    x, y, z, first, second = arena.node(arena.root).statements
+    assert x.value.node_id == y.value.node_id
+    assert x.value.node_id != z.value.node_id
+    assert parser.nodes.shared > 0
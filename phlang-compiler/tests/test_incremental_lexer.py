@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from src.lexer.incremental import IncrementalLexer
+from src.lexer.regex_lexer import RegexLexer
+
+SOURCE = '''x = 10
+pangalan = "Juan"
+/* mahabang
+   komento */
+kung x > 5 {
+    idikta "malaki: " + x  // dulo
+}
+s = "isa
+dalawa"
+habang x != 0 { x = x - 1 }
+'''
+
+PIECES = ['x', ' ', '\n', '1', '.5', '"', 'kung', '{', '}', '/*', '*/', '//', '+', '=', 'idikta "a"\n', '\ty = 2\n']
+
+
+def described(lexer):
+    return [(token.kind, token.value, token.value.__class__, lexer.token_offset(index), token.line, token.column)
+            for index, token in enumerate(lexer.tokens)]
+
+
+def fresh(source):
+    return [(token.kind, token.value, token.value.__class__, token.offset, token.line, token.column)
+            for token in RegexLexer(source).tokenize()]
+
+
+def test_edit_inside_a_token():
+    lexer = IncrementalLexer(SOURCE)
+    offset = SOURCE.index('Juan')
+    index, removed, added = lexer.edit(offset, 4, 'Maria')
+    # Rescanning starts at the token before the edit
+    assert (removed, added) == (2, 2)
+    assert lexer.tokens[index + 1].value == 'Maria'
+    assert described(lexer) == fresh(lexer.source_code)
+
+
+def test_tokens_outside_the_edit_are_kept():
+    lexer = IncrementalLexer(SOURCE)
+    before = list(lexer.tokens)
+    index, removed, added = lexer.edit(SOURCE.index('10'), 2, '20')
+    assert lexer.tokens[:index] == before[:index]
+    assert lexer.tokens[index + added:] == before[index + removed:]
+
+
+def test_new_line_moves_the_lines_after_it():
+    lexer = IncrementalLexer(SOURCE)
+    lexer.edit(0, 0, 'y = 1\n\n')
+    assert described(lexer) == fresh(lexer.source_code)
+
+
+def test_opening_a_comment():
+    lexer = IncrementalLexer(SOURCE)
+    lexer.edit(SOURCE.index('kung'), 0, '/* ')
+    assert described(lexer) == fresh(lexer.source_code)
+
+
+def test_edit_outside_the_source():
+    lexer = IncrementalLexer(SOURCE)
+    with pytest.raises(ValueError):
+        lexer.edit(len(SOURCE), 1, '')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_edits_match_fresh_lexing(seed):
+    generator = random.Random(seed)
+    lexer = IncrementalLexer(SOURCE)
+    source = SOURCE
+    for _ in range(30):
+        offset = generator.randrange(len(source) + 1)
+        deleted = generator.randint(0, min(4, len(source) - offset))
+        inserted = generator.choice(PIECES)
+        source = source[:offset] + inserted + source[offset + deleted:]
+        try:
+            expected = fresh(source)
+        except Exception as error:
+            with pytest.raises(Exception) as raised:
+                lexer.edit(offset, deleted, inserted)
+            assert str(raised.value) == str(error)
+            continue
+        # After an error the next edit lexes the whole source again
+        lexer.edit(offset, deleted, inserted)
+        assert described(lexer) == expected
+
+
+def test_new_lines_leave_the_tail_alone():
+    source = 'x = 1\n' * 2000
+    lexer = IncrementalLexer(source)
+    lexer.edit(10, 0, '\n')
+    tail = [(token.stored_line, token.column) for token in lexer.tokens[20:]]
+
+    # Typing further at the same place changes the line count again, but
+    # none of the tokens after the edit
+    lexer.edit(11, 0, 'y = 2\n\n')
+    lexer.edit(10, 1, '')
+    index = len(lexer.tokens) - len(tail)
+    assert [(token.stored_line, token.column) for token in lexer.tokens[index:]] == tail
+    assert described(lexer) == fresh(lexer.source_code)
@@ -0,0 +1,124 @@
+import random
+
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.lexer.incremental import IncrementalLexer
+from src.parser.parser import Parser
+from src.parser.stack_parser import StackParser
+from src.parser.incremental import IncrementalParser
+from src.codegen.generator import CodeGenerator
+
+STATEMENTS = [
+    'x = 1\n',
+    'idikta(x)\n',
+    'kung x > 1 {\n    idikta("malaki")\n} edi {\n    x = x + 1\n}\n',
+    'habang x < 3 {\n    x = x + 1\n}\n',
+    'paraan f(a) {\n    bumalik a * 2\n}\n',
+    'para i sa saklaw(3) {\n    idikta(i)\n}\n',
+    'para i = 0; i < 2; i = i + 1 {\n    idikta(i)\n}\n',
+]
+
+
+def tokens(source):
+    return create_lexer(source).tokenize()
+
+
+def nodes(program):
+    found = []
+    pending = [program]
+    while pending:
+        node = pending.pop()
+        found.append(node)
+        pending.extend(reversed(node.children))
+    return found
+
+
+def layout(program):
+    return [(node.__class__.__name__, getattr(node, 'offset', None)) for node in nodes(program)]
+
+
+def test_unchanged_statements_are_reused():
+    source = ''.join(STATEMENTS)
+    parser = IncrementalParser()
+    first = parser.parse(tokens(source))
+    second = parser.parse(tokens(source + 'idikta(2)\n'))
+    # The last statement is now followed by another, so it is parsed again
+    assert parser.reused == len(STATEMENTS) - 1
+    assert second.statements[:-2] == first.statements[:-1]
+
+
+def test_identical_statements_get_their_own_nodes():
+    source = 'x = 1\nidikta(x)\n' * 3
+    parser = IncrementalParser()
+    parser.parse(tokens(source))
+    program = parser.parse(tokens(source))
+    assert parser.reused == 6
+    found = nodes(program)
+    assert len({id(node) for node in found}) == len(found)
+
+
+def test_reused_statements_move_with_their_source():
+    source = ''.join(STATEMENTS)
+    parser = IncrementalParser()
+    old = parser.parse(tokens(source))
+    old_layout = layout(old)
+
+    edited = 'y = 2\n' + source
+    program = parser.parse(tokens(edited))
+    assert parser.reused == len(STATEMENTS)
+    assert layout(program) == layout(Parser(tokens(edited)).parse())
+    # The previous program is left as it was
+    assert layout(old) == old_layout
+
+
+@pytest.mark.parametrize('parser_class', [Parser, StackParser])
+@pytest.mark.parametrize('seed', range(5))
+def test_random_edits_match_full_parse(parser_class, seed):
+    generator = random.Random(seed)
+    parser = IncrementalParser(parser_class)
+    pieces = list(STATEMENTS)
+    for _ in range(20):
+        index = generator.randrange(len(pieces) + 1)
+        if pieces and generator.random() < 0.4:
+            del pieces[min(index, len(pieces) - 1)]
+        else:
+            pieces.insert(index, generator.choice(STATEMENTS))
+        source = ''.join(pieces)
+        program = parser.parse(tokens(source))
+        full = parser_class(tokens(source)).parse()
+        assert layout(program) == layout(full)
+        assert CodeGenerator(program).generate() == CodeGenerator(full).generate()
+
+
+def test_with_incremental_lexer():
+    source = ''.join(STATEMENTS)
+    lexer = IncrementalLexer(source)
+    parser = IncrementalParser()
+    parser.parse(lexer.tokens)
+
+    offset = source.index('bumalik a * 2') + len('bumalik a * ')
+    lexer.edit(offset, 1, '3')
+    program = parser.parse(lexer.tokens)
+    edited = source[:offset] + '3' + source[offset + 1:]
+    assert parser.reused == len(STATEMENTS) - 1
+    assert CodeGenerator(program).generate() == CodeGenerator(Parser(tokens(edited)).parse()).generate()
+
+
+@pytest.mark.parametrize('edit', [
+    ('bumalik a * 2', '\n'),
+    ('bumalik a * 2', '  '),
+    ('x = x + 1', '\n\n'),
+    ('idikta(i)', ' '),
+])
+def test_layout_changes_inside_a_statement(edit):
+    source = ''.join(STATEMENTS)
+    parser = IncrementalParser()
+    parser.parse(tokens(source))
+
+    anchor, inserted = edit
+    offset = source.index(anchor)
+    edited = source[:offset] + inserted + source[offset:]
+    program = parser.parse(tokens(edited))
+    assert parser.reused < len(STATEMENTS)
+    assert layout(program) == layout(Parser(tokens(edited)).parse())
@@ -0,0 +1,170 @@
+import glob
+import io
+import os
+
+import pytest
+
+from src.lexer.lexer import Lexer, create_lexer
+from src.lexer.regex_lexer import RegexLexer
+from src.lexer.tokens import Token, TokenType, TokenKind, KINDS
+from src.parser.parser import Parser
+from src.parser.token_window import TokenWindow
+from src.codegen.generator import CodeGenerator
+from src.error.error_handler import ParseError
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'examples')
+
+SOURCES = [
+    '',
+    'x = 1\n',
+    'pangalan = "Juan"\nidikta "Hello, " + pangalan\n',
+    'kung x >= 10 at hindi y != 2 o z <= 3 {\n\tidikta x % 2\n}\n',
+    'a = 3.25\nb = [1, 2, 3]\nidikta b[0] * a / 2\n',
+    '# komento\n// isa pa\n/* maraming\nlinya */ x = 1 // dulo\n',
+    's = "may \\"quote\\" at \\\\ at \\n"\nt = \'isa\'\n',
+    'multi = "isa\ndalawa"\nidikta multi\n',
+    'paraan f(a, b) {\n    bumalik a - b\n}\nidikta f(1, 2);\n',
+    'para i = 0; i < 3; i = i + 1 { idikta i }\n',
+    '_pribado2 = tama\nwala_rin = mali\n',
+] + sorted(glob.glob(os.path.join(EXAMPLES, '*.ph')))
+
+ERRORS = [
+    'x = 1 @ 2\n',
+    'x = 1.2.3\n',
+    'x = "hindi natapos\n',
+    'x = "masamang \\q escape"\n',
+    'x = "masama \\q at hindi natapos\n',
+]
+
+
+def source_text(source):
+    if source.endswith('.ph'):
+        with open(source) as file:
+            return file.read()
+    return source
+
+
+def described(tokens):
+    return [(token.kind, token.type, token.value, token.value.__class__, token.offset, token.line, token.column)
+            for token in tokens]
+
+
+def lex_error(lexer):
+    with pytest.raises(Exception) as error:
+        lexer.tokenize()
+    return str(error.value)
+
+
+@pytest.mark.parametrize('source', SOURCES)
+def test_engines_agree(source):
+    source = source_text(source)
+    assert described(RegexLexer(source).tokenize()) == described(Lexer(source).tokenize())
+
+
+@pytest.mark.parametrize('source', ERRORS)
+def test_engines_report_the_same_error(source):
+    assert lex_error(RegexLexer(source)) == lex_error(Lexer(source))
+
+
+def test_create_lexer():
+    assert isinstance(create_lexer('x'), RegexLexer)
+    assert isinstance(create_lexer('x', engine='char'), Lexer)
+    with pytest.raises(ValueError):
+        create_lexer('x', engine='wala')
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 64])
+@pytest.mark.parametrize('source', SOURCES)
+def test_streaming_matches_whole_source(source, chunk_size):
+    source = source_text(source)
+    expected = described(RegexLexer(source).tokenize())
+    assert described(RegexLexer(io.StringIO(source), chunk_size).iter_tokens()) == expected
+    data = io.BytesIO(source.encode('utf-8'))
+    assert described(RegexLexer(data, chunk_size).iter_tokens()) == expected
+
+
+@pytest.mark.parametrize('source', ERRORS)
+def test_streaming_reports_the_same_error(source):
+    assert lex_error(RegexLexer(io.StringIO(source), 3)) == lex_error(RegexLexer(source))
+
+
+def test_multibyte_characters_split_across_chunks():
+    source = 'pangalan = "Año ñ 日本"\nidikta pangalan\n'
+    data = io.BytesIO(source.encode('utf-8'))
+    assert described(RegexLexer(data, 1).iter_tokens()) == described(RegexLexer(source).tokenize())
+
+
+# The generated code, or the parse error
+def compiled(tokens):
+    try:
+        return CodeGenerator(Parser(tokens).parse()).generate()
+    except ParseError as error:
+        return str(error)
+
+
+@pytest.mark.parametrize('source', SOURCES)
+def test_streaming_parse_matches_batch(source):
+    source = source_text(source)
+    batch = compiled(RegexLexer(source).tokenize())
+    assert compiled(RegexLexer(io.StringIO(source), 5).iter_tokens()) == batch
+
+
+def test_token_window_keeps_only_a_few_tokens():
+    window = TokenWindow(iter(range(100)), size=4)
+    assert window[10] == 10
+    assert window[7] == 7
+    with pytest.raises(LookupError):
+        window[6]
+    with pytest.raises(IndexError):
+        window[100]
+
+
+@pytest.mark.parametrize('source', SOURCES)
+def test_token_buffer_matches_tokens(source):
+    source = source_text(source)
+    tokens = RegexLexer(source).tokenize()
+    buffer = RegexLexer(source).tokenize_buffer()
+    assert described(buffer) == described(tokens)
+    assert described([buffer[-1]]) == described(tokens[-1:])
+    assert compiled(buffer) == compiled(tokens)
+
+
+def test_token_buffer_interns_values():
+    buffer = RegexLexer('x = x + 1\ny = 1.0\n').tokenize_buffer()
+    assert len(buffer.values) < len(buffer)
+    assert [buffer.value_at(index).__class__ for index in (4, 7)] == [int, float]
+    assert buffer.span_at(2) == (4, 5)
+
+
+def test_positions_are_resolved_lazily():
+    source = 'a = 1\n' * 1000 + 'b = 2\n'
+    tokens = RegexLexer(source).tokenize()
+    lines = tokens[0].lines
+    assert lines.scanned == 0
+    assert (tokens[2].line, tokens[2].column) == (1, 5)
+    assert lines.scanned <= tokens[2].offset
+    assert (tokens[-2].line, tokens[-2].column) == (1001, 5)
+
+
+def test_token_at_keeps_the_old_constructor():
+    token = Token.at(TokenType.KEYWORD, 'kung', 3, 7)
+    assert (token.kind, token.offset, token.line, token.column) == (KINDS['kung'], None, 3, 7)
+    assert Token.at(TokenType.IDENTIFIER, 'x', 1, 1).kind == TokenKind.IDENTIFIER
+    assert Token.at(TokenType.NUMBER, 5, 1, 5).kind == TokenKind.NUMBER
+
+    tokens = [
+        Token.at(TokenType.IDENTIFIER, 'x', 1, 1),
+        Token.at(TokenType.OPERATOR, '=', 1, 3),
+        Token.at(TokenType.NUMBER, 5, 1, 5),
+        Token.at(TokenType.EOF, None, 1, 6),
+    ]
+    assert compiled(tokens) == compiled(RegexLexer('x = 5').tokenize())
+
+
+def test_old_constructor_form():
+    for args in [(TokenType.KEYWORD, 'kung', 3, 7), (TokenType.NUMBER, 5, 1, 5), (TokenType.EOF, None, 2, 1)]:
+        assert described([Token(*args)]) == described([Token.at(*args)])
+    with pytest.raises(TypeError):
+        Token('HINDI_URI', 'x', 1, 1)
+    with pytest.raises(TypeError):
+        Token(None, 'x', 1, 1)
@@ -0,0 +1,88 @@
+import contextlib
+import io
+
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.codegen import generator
+from src.codegen.generator import CodeGenerator
+from src.codegen.ast_generator import PythonASTGenerator
+
+
+def parse(source):
+    return Parser(create_lexer(source).tokenize()).parse()
+
+
+def run(code):
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        exec(code, {})
+    return output.getvalue()
+
+
+def text_output(source):
+    return run(compile(CodeGenerator(parse(source)).generate(), '<text>', 'exec'))
+
+
+def ast_output(source):
+    return run(PythonASTGenerator(parse(source), source).compile())
+
+
+# The output with every C-style para generated as a while loop
+def while_output(source, monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(generator, 'counting_range', lambda node: None)
+        return text_output(source)
+
+
+LOWERED = {
+    'up': 'para i = 0; i < 5; i = i + 1 {\n    idikta(i)\n}\n',
+    'inclusive': 'para i = 1; i <= 10; i = i + 3 {\n    idikta(i)\n}\n',
+    'down': 'para i = 10; i > 0; i = i - 4 {\n    idikta(i)\n}\n',
+    'down_inclusive': 'para i = 9; i >= 2; i = i - 2 {\n    idikta(i)\n}\n',
+    'mirrored': 'para i = 0; 4 > i; i = 1 + i {\n    idikta(i)\n}\n',
+    'float_bound': 'para i = 0; i < 2.5; i = i + 1 {\n    idikta(i)\n}\n',
+    'name_bound': 'n = 3.5\npara i = 0; i <= n; i = i + 1 {\n    idikta(i)\n}\n',
+    'never_runs': 'para i = 5; i < 3; i = i + 1 {\n    idikta(i)\n}\n',
+    'empty_body': 'para i = 0; i < 3; i = i + 1 {\n}\n',
+    'itigil': 'para i = 0; i < 10; i = i + 1 {\n    kung i == 4 {\n        itigil\n    }\n    idikta(i)\n}\n',
+    'ituloy': 'para i = 0; i < 6; i = i + 1 {\n    kung i % 2 == 0 {\n        ituloy\n    }\n    idikta(i)\n}\n',
+    'nested': ('para i = 0; i < 3; i = i + 1 {\n    para j = i; j < 3; j = j + 1 {\n'
+               '        kung j == 2 {\n            itigil\n        }\n        idikta(i * 10 + j)\n    }\n}\n'),
+    'in_function': 'paraan f(n) {\n    para i = 0; i < n; i = i + 2 {\n        idikta(i)\n    }\n    bumalik i\n}\nidikta(f(7))\n',
+}
+
+NOT_LOWERED = {
+    'body_sets_variable': 'para i = 0; i < 10; i = i + 1 {\n    i = i * 2\n    idikta(i)\n}\n',
+    'body_sets_bound': 'n = 5\npara i = 0; i < n; i = i + 1 {\n    n = n - 1\n    idikta(i)\n}\n',
+    'wrong_direction': 'para i = 0; i < 5; i = i - 1 {\n    kung i < -3 {\n        itigil\n    }\n    idikta(i)\n}\n',
+    'float_start': 'para i = 0.5; i < 3; i = i + 1 {\n    idikta(i)\n}\n',
+    'other_update': 'para i = 1; i < 50; i = i * 2 {\n    idikta(i)\n}\n',
+    'bound_is_variable': 'para i = 0; i < i; i = i + 1 {\n    idikta(i)\n}\n',
+    'ituloy_in_while': ('para i = 1; i < 50; i = i * 2 {\n    kung i == 4 {\n        ituloy\n    }\n'
+                        '    idikta(i)\n}\n'),
+}
+
+# What the loop variable ends up as is printed after every loop
+AFTER = 'idikta(i)\n'
+
+
+@pytest.mark.parametrize('name', LOWERED)
+def test_lowered_to_range(name):
+    assert 'in range(' in CodeGenerator(parse(LOWERED[name])).generate()
+
+
+@pytest.mark.parametrize('name', NOT_LOWERED)
+def test_kept_as_while(name):
+    assert 'in range(' not in CodeGenerator(parse(NOT_LOWERED[name])).generate()
+
+
+@pytest.mark.parametrize('source', [*LOWERED.values(), *NOT_LOWERED.values()],
+                         ids=[*LOWERED, *NOT_LOWERED])
+def test_runs_as_while_loop(source, monkeypatch):
+    if 'paraan' not in source:
+        source += AFTER
+    expected = while_output(source, monkeypatch)
+    assert text_output(source) == expected
+    assert ast_output(source) == expected
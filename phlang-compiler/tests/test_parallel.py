@@ -0,0 +1,73 @@
+from functools import partial
+
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.lexer.regex_lexer import RegexLexer
+from src.parser.parallel import parse_parallel, encode, decode, split_chunks
+from src.codegen.generator import CodeGenerator
+from src.error.error_handler import ParseError
+
+BLOCKS = [
+    'paraan f{n}(a) {{\n    kung a > {n} {{\n        bumalik a\n    }} edi {{\n        bumalik {n}\n    }}\n}}\n',
+    'x{n} = {n} * 2 + 1\n',
+    'kung x{n} > 3 {{\n    idikta("a{n}")\n}} kundi x{n} > 1 {{\n    idikta("b")\n}} edi {{\n    idikta("c")\n}}\n',
+    'subukan {{\n    idikta(1 / x{n})\n}} saluhin (e) {{\n    idikta(e)\n}}\n',
+    'para i sa saklaw({n}) {{\n    habang i < 2 {{\n        i = i + 1\n    }}\n}}\n',
+]
+
+
+def program_source(count):
+    return ''.join(BLOCKS[n % len(BLOCKS)].format(n=n) for n in range(count))
+
+
+def parse(source):
+    return Parser(create_lexer(source).tokenize()).parse()
+
+
+def layout(program):
+    found = []
+    pending = [program]
+    while pending:
+        node = pending.pop()
+        found.append((node.__class__.__name__, getattr(node, 'offset', None)))
+        pending.extend(reversed(node.children))
+    return found
+
+
+def parse_error(parse_function, source):
+    with pytest.raises(ParseError) as error:
+        parse_function(source)
+    return str(error.value)
+
+
+def test_source_is_split_at_top_level_statements():
+    buffer = RegexLexer(program_source(40)).tokenize_buffer()
+    chunks = split_chunks(buffer, 8)
+    assert len(chunks) > 1
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(buffer)
+    for (start, end), (next_start, next_end) in zip(chunks, chunks[1:]):
+        assert end == next_start
+
+
+def test_encode_round_trip():
+    statements = parse(program_source(10)).statements
+    decoded = decode(encode(statements))
+    assert [layout(node) for node in decoded] == [layout(node) for node in statements]
+
+
+def test_same_tree_as_parser():
+    source = program_source(200)
+    program = parse_parallel(source, workers=2)
+    expected = parse(source)
+    assert layout(program) == layout(expected)
+    assert CodeGenerator(program).generate() == CodeGenerator(expected).generate()
+
+
+@pytest.mark.parametrize('where', [0.1, 0.5, 0.95])
+def test_error_is_reported_where_parser_reports_it(where):
+    statements = [BLOCKS[n % len(BLOCKS)].format(n=n) for n in range(200)]
+    statements.insert(int(len(statements) * where), 'kung x > {\n    idikta(1)\n}\n')
+    source = ''.join(statements)
+    assert parse_error(partial(parse_parallel, workers=2), source) == parse_error(parse, source)
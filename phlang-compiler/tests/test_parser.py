@@ -0,0 +1,85 @@
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser, INFIX_OPERATORS, PREFIX_OPERATORS
+from src.parser.stack_parser import StackParser
+from src.lexer.tokens import KEYWORDS, OPERATORS, DELIMITERS, KINDS, KIND_TYPES, KIND_VALUES, TokenKind
+
+
+def expression(parser_class, source):
+    return repr(parser_class(create_lexer(f'x = {source}\n').tokenize()).parse().statements[0].value)
+
+
+@pytest.mark.parametrize('parser_class', [Parser, StackParser])
+@pytest.mark.parametrize('source, expected', [
+    # Each level binds tighter than the one before it
+    ('a o b at c', '(a o (b at c))'),
+    ('a at b == c', '(a at (b == c))'),
+    ('a == b < c', '(a == (b < c))'),
+    ('a < b + c', '(a < (b + c))'),
+    ('a + b * c', '(a + (b * c))'),
+    ('a * b % c / d', '(((a * b) % c) / d)'),
+    # Binary operators are left-associative, at every level
+    ('a - b - c', '((a - b) - c)'),
+    ('a / b / c', '((a / b) / c)'),
+    ('a == b != c', '((a == b) != c)'),
+    ('a < b >= c', '((a < b) >= c)'),
+    ('a o b o c', '((a o b) o c)'),
+    ('a at b at c', '((a at b) at c)'),
+    # Prefix operators bind tighter than any binary operator
+    ('-a * b', '(-(a) * b)'),
+    ('hindi a == b', '(hindi(a) == b)'),
+    ('- - a', '-(-(a))'),
+    ('a * -b - c', '((a * -(b)) - c)'),
+    # Parentheses, calls and indexing are operands
+    ('(a + b) * c', '((a + b) * c)'),
+    ('f(a + b, c) * d[e - 1]', '(f((a + b), c) * d[(e - 1)])'),
+])
+def test_precedence_and_associativity(parser_class, source, expected):
+    assert expression(parser_class, source) == expected
+
+
+def test_binding_powers():
+    powers = {operator: INFIX_OPERATORS[KINDS[operator]][0] for operator in
+              ['o', 'at', '==', '!=', '<', '>', '<=', '>=', '+', '-', '*', '/', '%']}
+    assert powers['o'] < powers['at'] < powers['=='] == powers['!='] < powers['<']
+    assert powers['<'] == powers['>'] == powers['<='] == powers['>='] < powers['+'] == powers['-']
+    assert powers['-'] < powers['*'] == powers['/'] == powers['%']
+    assert all(PREFIX_OPERATORS[KINDS[operator]][0] > max(powers.values()) for operator in ['-', 'hindi'])
+
+
+def test_kinds_are_distinct():
+    lexemes = {**KEYWORDS, **OPERATORS, **DELIMITERS}
+    assert len(set(KINDS.values())) == len(KINDS) == len(lexemes)
+    for lexeme, token_type in lexemes.items():
+        kind = KINDS[lexeme]
+        assert kind > TokenKind.DELIMITER
+        assert (KIND_TYPES[kind], KIND_VALUES[kind]) == (token_type, lexeme)
+
+
+def test_tokens_carry_their_kind():
+    tokens = create_lexer('kung x >= 1.5 { idikta("a") }').tokenize()
+    assert [token.kind for token in tokens] == [
+        KINDS['kung'], TokenKind.IDENTIFIER, KINDS['>='], TokenKind.NUMBER, KINDS['{'],
+        KINDS['idikta'], KINDS['('], TokenKind.STRING, KINDS[')'], KINDS['}'], TokenKind.EOF,
+    ]
+
+
+@pytest.mark.parametrize('parser_class', [Parser, StackParser])
+@pytest.mark.parametrize('source, node_class', [
+    ('paraan f() {\n}\n', 'FunctionDefinition'),
+    ('kung x {\n}\n', 'IfStatement'),
+    ('habang x {\n}\n', 'WhileLoop'),
+    ('para i sa x {\n}\n', 'ForLoop'),
+    ('para i = 0; i < 1; i = i + 1 {\n}\n', 'CStyleForLoop'),
+    ('bumalik x\n', 'ReturnStatement'),
+    ('idikta(x)\n', 'PrintStatement'),
+    ('itigil\n', 'BreakStatement'),
+    ('ituloy\n', 'ContinueStatement'),
+    ('subukan {\n} saluhin (e) {\n}\n', 'TryExcept'),
+    ('x = 1\n', 'Assignment'),
+    ('f(x)\n', 'FunctionCall'),
+])
+def test_statements_by_first_token(parser_class, source, node_class):
+    statement = parser_class(create_lexer(source).tokenize()).parse().statements[0]
+    assert statement.__class__.__name__ == node_class
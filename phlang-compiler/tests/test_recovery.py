@@ -0,0 +1,36 @@
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.stack_parser import StackParser
+from src.error.error_handler import ParseError
+
+SOURCE = 'x = (1 +\nidikta(2)\nkung x {\n    y = = 3\n    idikta(4)\n}\nz = ]\nidikta(5)\n'
+
+
+def recovered(parser_class, source):
+    parser = parser_class(create_lexer(source).tokenize(), recover=True)
+    return parser.parse(), parser.diagnostics
+
+
+@pytest.mark.parametrize('parser_class', [Parser, StackParser])
+def test_every_error_is_reported(parser_class):
+    program, diagnostics = recovered(parser_class, SOURCE)
+    assert [(error.line, error.column) for error in diagnostics] == [(2, 1), (4, 9), (7, 5)]
+    assert [repr(statement) for statement in program.statements] == ['idikta 2', 'kung x { ... }', 'idikta 5']
+    # The statement after the bad one in the block is kept too
+    assert [repr(statement) for statement in program.statements[1].then_block.statements] == ['idikta 4']
+
+
+@pytest.mark.parametrize('parser_class', [Parser, StackParser])
+def test_first_error_without_recovery(parser_class):
+    with pytest.raises(ParseError) as error:
+        parser_class(create_lexer(SOURCE).tokenize()).parse()
+    assert str(error.value) == str(recovered(parser_class, SOURCE)[1][0])
+
+
+@pytest.mark.parametrize('source', ['kung x {\n    idikta(1)\n', '}\n}\n', ')(\n', 'para\n'])
+def test_ends_on_any_input(source):
+    for parser_class in (Parser, StackParser):
+        program, diagnostics = recovered(parser_class, source)
+        assert diagnostics
@@ -0,0 +1,77 @@
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.arena import ASTArena
+from src.semantic.resolver import Resolver
+
+SOURCE = '''x = 1
+paraan f(a) {
+    b = a + x
+    bumalik b
+}
+kung x > 0 {
+    y = f(x)
+    idikta(y)
+}
+idikta(y)
+'''
+
+
+def parse(source, **options):
+    return Parser(create_lexer(source).tokenize(), **options).parse()
+
+
+def test_annotations():
+    program = Resolver().resolve(parse(SOURCE))
+    function = program.statements[1]
+    b = function.body.statements[0]
+    a, x = b.value.left, b.value.right
+    assert (b.depth, b.slot) == (0, 1)
+    assert (a.depth, a.slot) == (0, 0)
+    assert (x.depth, x.slot) == (1, 0)
+
+    # y is first assigned inside the kung block, but like a Python local it
+    # belongs to the program's scope
+    assign_y = program.statements[2].then_block.statements[0]
+    print_y = program.statements[3].expression
+    assert (assign_y.depth, assign_y.slot) == (1, 2)
+    assert (print_y.depth, print_y.slot) == (0, 2)
+
+
+def test_first_assignment_reads_before_declaring():
+    program = Resolver().resolve(parse('x = x + 1\nidikta(x)\n'))
+    assignment, print_statement = program.statements
+    assert (assignment.value.left.depth, assignment.value.left.slot) == (None, None)
+    assert (assignment.depth, assignment.slot) == (0, 0)
+    assert (print_statement.expression.depth, print_statement.expression.slot) == (0, 0)
+
+
+def test_refuses_arena():
+    arena = ASTArena()
+    parse(SOURCE, arena=arena)
+    with pytest.raises(ValueError):
+        Resolver().resolve(arena.node(arena.root))
+
+
+def test_refuses_shared_nodes():
+    program = parse('x = 1\nidikta(x)\nidikta(0)\n')
+    program.statements[2].expression = program.statements[1].expression
+    with pytest.raises(ValueError):
+        Resolver().resolve(program)
+
+
+def annotations(program):
+    found = []
+    pending = [program]
+    while pending:
+        node = pending.pop()
+        found.append((node.__class__.__name__, getattr(node, 'depth', None), getattr(node, 'slot', None)))
+        pending.extend(reversed(node.children))
+    return found
+
+
+def test_hash_consed_tree():
+    source = SOURCE + 'paraan g(x) {\n    bumalik x + 1\n}\nidikta(x + 1)\nidikta(g(1) + g(1))\n'
+    program = Resolver().resolve(parse(source, hash_cons=True))
+    assert annotations(program) == annotations(Resolver().resolve(parse(source)))
@@ -0,0 +1,56 @@
+import pytest
+
+from src.lexer.lexer import create_lexer
+from src.parser.parser import Parser
+from src.parser.stack_parser import StackParser
+from src.codegen.generator import CodeGenerator
+from src.error.error_handler import ParseError
+
+SOURCES = [
+    'x = 1 + 2 * 3 - -4 % 5\n',
+    'idikta(hindi x == y at a < b o c >= d)\n',
+    'a = [1, [2, "tatlo"], f(x, y[0])]\n',
+    'paraan f(a, b) {\n    kung a > b {\n        bumalik a\n    } kundi a == b {\n        bumalik 0\n    } edi {\n        bumalik b\n    }\n}\n',
+    'para i sa saklaw(3) {\n    habang tama {\n        itigil\n    }\n    ituloy\n}\n',
+    'para i = 0; i < 5; i = i + 1 {\n    idikta(i)\n}\n',
+    'subukan {\n    idikta(1 / 0)\n} saluhin (e) {\n    idikta(e)\n}\n',
+]
+
+
+def layout(program):
+    found = []
+    pending = [program]
+    while pending:
+        node = pending.pop()
+        found.append((node.__class__.__name__, repr(node), getattr(node, 'offset', None)))
+        pending.extend(reversed(node.children))
+    return found
+
+
+@pytest.mark.parametrize('source', SOURCES)
+def test_same_tree_as_parser(source):
+    expected = Parser(create_lexer(source).tokenize()).parse()
+    program = StackParser(create_lexer(source).tokenize()).parse()
+    assert layout(program) == layout(expected)
+    assert CodeGenerator(program).generate() == CodeGenerator(expected).generate()
+
+
+def test_deep_nesting():
+    depth = 5000
+    source = 'x = ' + '(' * depth + '1' + ')' * depth + '\n'
+    program = StackParser(create_lexer(source).tokenize()).parse()
+    assert program.statements[0].value.value == 1
+
+    source = 'kung x {\n' * depth + '}\n' * depth
+    program = StackParser(create_lexer(source).tokenize()).parse()
+    assert len(layout(program)) == 1 + 3 * depth
+
+
+@pytest.mark.parametrize('source', ['x = (1 + \n', 'kung x {\n    idikta(1)\n', 'para (i) {}\n'])
+def test_same_error_as_parser(source):
+    messages = []
+    for parser in (Parser, StackParser):
+        with pytest.raises(ParseError) as error:
+            parser(create_lexer(source).tokenize()).parse()
+        messages.append(str(error.value))
+    assert messages[0] == messages[1]
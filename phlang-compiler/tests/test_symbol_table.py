@@ -0,0 +1,64 @@
+from src.semantic.symbol_table import SymbolTable, VariableSymbol, FunctionSymbol
+
+
+def test_inner_declarations_shadow_and_end_with_their_scope():
+    table = SymbolTable()
+    outer = table.define('x', VariableSymbol('x'))
+    table.enter_scope()
+    assert table.lookup('x') is outer
+    assert not table.is_local('x')
+
+    inner = table.define('x', VariableSymbol('x'))
+    assert table.lookup('x') is inner
+    assert table.resolve('x') == (0, inner)
+    table.exit_scope()
+
+    assert table.lookup('x') is outer
+    assert table.resolve('x') == (0, outer)
+
+
+def test_levels_and_slots():
+    table = SymbolTable()
+    table.define('f', FunctionSymbol('f'))
+    table.define('x', VariableSymbol('x'))
+    table.enter_scope()
+    table.enter_scope()
+    y = table.define('y', VariableSymbol('y'))
+    assert (y.level, y.slot) == (2, 0)
+    assert table.resolve('x') == (2, table.lookup('x'))
+    assert table.lookup('x').slot == 1
+    assert table.current_scope_level() == 2
+    table.exit_scope()
+    assert table.lookup('y') is None
+    assert table.lookup_current_scope('y') is None
+
+
+def test_redeclaring_keeps_the_slot():
+    table = SymbolTable()
+    table.define('a', VariableSymbol('a'))
+    table.define('b', VariableSymbol('b'))
+    again = table.define('a', FunctionSymbol('a'))
+    assert (again.slot, table.lookup('a')) == (0, again)
+    assert table.scopes[0] == ['a', 'b']
+
+
+def test_define_in_an_outer_scope():
+    table = SymbolTable()
+    table.enter_scope()
+    inner = table.define('x', VariableSymbol('x'))
+    table.enter_scope()
+    outer = table.define('x', VariableSymbol('x'), 0)
+    # The inner declaration still shadows the outer one
+    assert table.lookup('x') is inner
+    assert (outer.level, outer.slot) == (0, 0)
+    table.exit_scope()
+    table.exit_scope()
+    assert table.lookup('x') is outer
+
+
+def test_global_scope_is_never_left():
+    table = SymbolTable()
+    table.define('x', VariableSymbol('x'))
+    table.exit_scope()
+    assert table.is_global_scope()
+    assert table.lookup('x') is not None
@@ -1,6 +1,7 @@
 import sys
 import os
 import time
+import traceback
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 from tkinter import ttk
@@ -10,10 +11,21 @@ import tempfile
 compiler_path = r"C:\Users\euzop\Downloads\proglang finals\phlang-compiler"
 sys.path.append(compiler_path)
 
-from src.lexer.lexer import Lexer
-from src.parser.parser import Parser
-from src.codegen.generator import CodeGenerator
-from src.error.error_handler import CompilerError
+from src.parser.ast_cache import ASTCache
+from src.semantic.analyzer import SemanticAnalyzer
+from src.semantic.call_graph import CallGraph
+from src.optimizer.constant_folder import ConstantFolder
+from src.codegen.ast_generator import PythonASTGenerator
+from src.codegen.code_cache import CodeCache
+from src.error.error_handler import CompilerError, ParseError
+
+# Parsed and compiled programs are kept between runs, so an unchanged file is
+# not compiled again
+ast_cache = ASTCache()
+# The semantic checks still flag some valid programs, so their warnings are
+# only worked out and shown when this is switched on
+SHOW_WARNINGS = False
+code_cache = CodeCache(prune=True, fold=True, check=SHOW_WARNINGS)
 
 def compile_and_run(filename, args=None):
     try:
@@ -22,14 +34,22 @@ def compile_and_run(filename, args=None):
         with open(filename, 'r') as file:
             source_code = file.read()
         
-        lexer = Lexer(source_code)
-        tokens = lexer.tokenize()
-        
-        parser = Parser(tokens)
-        ast = parser.parse()
-        
-        code_generator = CodeGenerator(ast)
-        python_code = code_generator.generate()
+        cached = code_cache.get(filename, source_code)
+        if cached is not None:
+            python_code, warnings = cached
+        else:
+            ast = ast_cache.parse(source_code)
+            # The checks see the program as it was written, before pruning
+            # and folding take anything out of it
+            warnings = SemanticAnalyzer().analyze(ast) if SHOW_WARNINGS else []
+            # Functions nothing reachable uses are neither generated nor run
+            ast = CallGraph().build(ast).prune(ast)
+            # Constant expressions and branches are settled before generating code
+            ast = ConstantFolder().fold(ast)
+            
+            # Builds the code object directly, with this file's line numbers
+            python_code = PythonASTGenerator(ast, source_code).compile(filename)
+            code_cache.put(filename, source_code, python_code, warnings)
         
         compile_time = time.time() - start_time
         
@@ -49,14 +69,22 @@ def compile_and_run(filename, args=None):
             exec(python_code, {})
             sys.stdout = original_stdout
             result = "".join(output_buffer) or "Matagumpay na naisagawa ang programa na walang output."
+            if warnings:
+                result += "\n\nMga babala:\n" + "\n".join(warnings)
             result += f"\n\nOras ng pagkocompile: {compile_time:.4f} segundo"
             return result
         finally:
             sys.stdout = original_stdout
             
+    except ParseError as e:
+        return f"Error: {str(e)}"
     except CompilerError as e:
         return f"Error sa pagkocompile: {str(e)}"
     except Exception as e:
+        # The innermost line of the program that was running, if it got that far
+        lines = [frame.lineno for frame in traceback.extract_tb(e.__traceback__) if frame.filename == filename]
+        if lines:
+            return f"Error sa linya {lines[-1]}: {str(e)}"
         return f"Error: {str(e)}"
 
 class LineNumbers(tk.Canvas):